@@ -1,8 +1,23 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, send_from_directory
-import requests
+from flask import Flask, render_template, request, jsonify, session, redirect, send_from_directory, g, make_response
+import asyncio
+import base64
+import hashlib
+import hmac
 import json
 import os
-from upstash_redis import Redis
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial, wraps
+import click
+import http_client
+from search_index import SearchIndex, normalize as normalize_title, tokenize as tokenize_title
+from cache import (LRUCache, acached_fetch, bump_generation, cache_namespaces, cached_fetch, cached_value, cache_stats,
+                   gather, gen_tag, get_tiered, l1_fresh, prefetch_tiered, set_tiered, l1, stats)
+from cache_backend import get_backend
+from circuit_breaker import acall as breaker_acall, breaker, call as breaker_call
+from providers import Provider, get_provider, register as register_provider
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "animeku-secret-2026")
@@ -14,7 +29,7 @@ def bypass_static():
     for bp in BYPASS_PATHS:
         if request.path.startswith(bp):
             return None
-API_BASE = "https://www.sankavollerei.com"
+API_BASE = os.environ.get("ANIME_API_BASE", "https://www.sankavollerei.com")
 
 # ── Endpoint Sources ───────────────────────────────────────────────────────────
 SOURCES = {
@@ -36,42 +51,68 @@ SOURCES = {
 }
 DEFAULT_SOURCE = "animasu"
 
-def get_active_source():
-    """Baca source aktif: cookie user → Redis cache → site_config Supabase → default."""
-    # 1. Cookie browser user (pilihan per-user, 30 hari)
-    try:
-        user_src = request.cookies.get("active_source")
-        if user_src and user_src in SOURCES:
-            return user_src
-    except Exception:
-        pass
-    # 2. Redis cache (cepat, di-set oleh admin saat switch)
+# Default source global di-cache per proses supaya tidak GET Redis / query
+# Supabase di tiap fetch()/render. Instance lain ikut berubah dalam <= TTL.
+ACTIVE_SOURCE_TTL = int(os.environ.get("ACTIVE_SOURCE_TTL", 30))
+_global_source    = {"value": None, "expires": 0.0}
+
+def _set_global_source(src):
+    _global_source["value"]   = src
+    _global_source["expires"] = time.monotonic() + ACTIVE_SOURCE_TTL
+
+def _global_active_source():
+    """Default source global: cache proses → Redis → snapshot site_config → default."""
+    if _global_source["value"] and time.monotonic() < _global_source["expires"]:
+        stats.incr("source.process_hit")
+        return _global_source["value"]
+    # 1. Redis cache (cepat, di-set oleh admin saat switch)
     try:
+        stats.incr("source.redis")
         val = redis.get("animeku:active_source")
         if val and val in SOURCES:
+            _set_global_source(val)
             return val
     except Exception:
         pass
-    # 3. Supabase site_config (source of truth untuk admin)
+    # 2. Snapshot site_config (source of truth untuk admin)
+    val = site_config().get("active_source")
+    if isinstance(val, str) and val in SOURCES:
+        # Cache ke Redis supaya instance lain tidak perlu ke Supabase
+        try:
+            redis.set("animeku:active_source", val, ex=3600)
+        except Exception:
+            pass
+        _set_global_source(val)
+        return val
+    _set_global_source(DEFAULT_SOURCE)
+    return DEFAULT_SOURCE
+
+def get_active_source():
+    """Baca source aktif: memo per request → ?source= → cookie user → default global."""
+    stats.incr("source.lookup")
     try:
-        r = requests.get(
-            f"{SUPABASE_URL}/rest/v1/site_config",
-            headers=supabase_service_headers(),
-            params={"key": "eq.active_source", "select": "value"},
-            timeout=3
-        )
-        if r.ok and r.json():
-            val = r.json()[0].get("value")
-            if isinstance(val, str) and val in SOURCES:
-                # Cache ke Redis supaya request berikutnya tidak perlu ke Supabase
-                try:
-                    redis.set("animeku:active_source", val, ex=3600)
-                except Exception:
-                    pass
-                return val
+        if "active_source" in g:
+            return g.active_source
+    except RuntimeError:
+        pass  # di luar app context (thread background)
+    src = None
+    # ?source= (API yang dipanggil dari halaman source tertentu, mis. sidebar
+    # episode di /animasu/...), cookie failover (lihat failover()), lalu cookie
+    # browser user (pilihan per-user, 30 hari)
+    try:
+        for val in (request.args.get("source"), request.cookies.get(FAILOVER_COOKIE),
+                    request.cookies.get("active_source")):
+            if val and val in SOURCES:
+                src = val
+                break
     except Exception:
         pass
-    return DEFAULT_SOURCE
+    src = src or _global_active_source()
+    try:
+        g.active_source = src
+    except RuntimeError:
+        pass
+    return src
 
 def src_prefix():
     return SOURCES[get_active_source()]["prefix"]
@@ -109,11 +150,158 @@ def supabase_service_headers():
         "Content-Type": "application/json",
     }
 
-# ── Upstash Redis Cache ────────────────────────────────────────────────────────
-redis = Redis(
-    url=os.environ["UPSTASH_REDIS_REST_URL"],
-    token=os.environ["UPSTASH_REDIS_REST_TOKEN"],
-)
+# ── Verifikasi access token Supabase ───────────────────────────────────────────
+# Token user diverifikasi lokal (HS256 pakai SUPABASE_JWT_SECRET) dan hasilnya
+# di-cache sampai `exp` token. GET /auth/v1/user hanya fallback kalau secret
+# tidak diset atau token pakai algoritma lain (asymmetric key / JWKS).
+SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET", "")
+_token_cache = LRUCache(max_bytes=int(os.environ.get("AUTH_CACHE_MAX_BYTES", 2 * 1024 * 1024)))
+
+def _b64url_decode(seg):
+    return base64.urlsafe_b64decode(seg + "=" * (-len(seg) % 4))
+
+def _jwt_claims(access_token, verify=True):
+    """Claims JWT kalau valid, False kalau jelas tidak valid, None kalau tidak bisa dicek lokal."""
+    try:
+        header_b64, payload_b64, sig_b64 = access_token.split(".")
+        header    = json.loads(_b64url_decode(header_b64))
+        claims    = json.loads(_b64url_decode(payload_b64))
+        signature = _b64url_decode(sig_b64)
+    except Exception:
+        return False
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        return False
+    if verify:
+        if header.get("alg") != "HS256" or not SUPABASE_JWT_SECRET:
+            return None
+        expected = hmac.new(SUPABASE_JWT_SECRET.encode(), f"{header_b64}.{payload_b64}".encode(),
+                            hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, signature):
+            return False
+    # Hanya token sesi user login; token anon / service_role ditolak
+    if claims.get("aud") != "authenticated" or claims.get("role") != "authenticated":
+        return False
+    if not claims.get("sub") or not isinstance(claims.get("exp"), (int, float)) or claims["exp"] <= time.time():
+        return False
+    return claims
+
+def verify_access_token(access_token):
+    """Access token → user dict ({id, email, user_metadata}) atau None kalau tidak valid."""
+    if not access_token:
+        return None
+    key  = hashlib.sha256(access_token.encode()).hexdigest()
+    user = _token_cache.get(key)
+    if user is not None:
+        stats.incr("auth.cache_hit")
+        return user
+
+    claims = _jwt_claims(access_token)
+    if claims is False:
+        stats.incr("auth.invalid")
+        return None
+    if claims:
+        stats.incr("auth.local_verify")
+        user = {"id": claims["sub"], "email": claims.get("email", ""),
+                "user_metadata": claims.get("user_metadata", {})}
+    else:
+        stats.incr("auth.remote")
+        try:
+            r = http_client.get(f"{SUPABASE_URL}/auth/v1/user", headers=supabase_headers(access_token))
+        except Exception:
+            return None
+        if not r.ok:
+            stats.incr("auth.invalid")
+            return None
+        body = r.json()
+        user = {"id": body.get("id"), "email": body.get("email", ""),
+                "user_metadata": body.get("user_metadata", {})}
+        # Token sudah dikonfirmasi Supabase → exp dari payload aman dipakai untuk TTL
+        claims = _jwt_claims(access_token, verify=False) or {}
+
+    ttl = claims.get("exp", time.time() + 60) - time.time()
+    _token_cache.set(key, user, ttl, len(access_token) + len(json.dumps(user)))
+    return user
+
+# ── Site config snapshot ───────────────────────────────────────────────────────
+# Row site_config dibaca sekali (1 query) dan disimpan di memori proses.
+# Reload setelah SITE_CONFIG_TTL, atau lebih cepat kalau versi di Redis naik
+# (dicek max tiap SITE_CONFIG_VERSION_CHECK detik). Penulisan dari server wajib
+# panggil invalidate_site_config(); penulisan dari admin panel (JS) ikut
+# terbaca setelah TTL.
+SITE_CONFIG_KEYS          = ("admin_ids", "active_source", "donation_goal", "site_settings", "popup_config")
+SITE_CONFIG_TTL           = int(os.environ.get("SITE_CONFIG_TTL", 60))
+SITE_CONFIG_VERSION_CHECK = int(os.environ.get("SITE_CONFIG_VERSION_CHECK", 5))
+SITE_CONFIG_VERSION_KEY   = "animeku:site_config:version"
+_site_config      = {"values": {}, "loaded": float("-inf"), "checked": 0.0, "version": None}
+_site_config_lock = threading.Lock()
+
+def _site_config_version():
+    try:
+        return redis.get(SITE_CONFIG_VERSION_KEY)
+    except Exception:
+        return None
+
+def _reload_site_config():
+    version = _site_config_version()
+    stats.incr("config.load")
+    now = time.monotonic()
+    try:
+        r = http_client.get(
+            f"{SUPABASE_URL}/rest/v1/site_config",
+            headers=supabase_service_headers() if SUPABASE_SERVICE_KEY else supabase_headers(),
+            params={"key": f"in.({','.join(SITE_CONFIG_KEYS)})", "select": "key,value"},
+            timeout=3
+        )
+        r.raise_for_status()
+        values = {row["key"]: row.get("value") for row in r.json()}
+    except Exception as e:
+        print(f"site_config load error: {e}")
+        # Pakai snapshot lama, coba lagi 10 detik lagi
+        _site_config["loaded"] = now - SITE_CONFIG_TTL + 10
+        return
+    _site_config.update(values=values, loaded=now, checked=now, version=version)
+
+def site_config():
+    """Snapshot site_config: dict key → value (lihat SITE_CONFIG_KEYS)."""
+    now = time.monotonic()
+    if now - _site_config["loaded"] < SITE_CONFIG_TTL:
+        if now - _site_config["checked"] < SITE_CONFIG_VERSION_CHECK:
+            stats.incr("config.hit")
+            return _site_config["values"]
+        _site_config["checked"] = now
+        if _site_config_version() == _site_config["version"]:
+            stats.incr("config.hit")
+            return _site_config["values"]
+        _site_config["loaded"] = float("-inf")   # versi berubah → reload
+    with _site_config_lock:
+        # Thread lain mungkin sudah reload selagi menunggu lock
+        if time.monotonic() - _site_config["loaded"] >= SITE_CONFIG_TTL:
+            _reload_site_config()
+    return _site_config["values"]
+
+def invalidate_site_config():
+    """Panggil setelah menulis site_config dari server → semua instance reload."""
+    try:
+        redis.incr(SITE_CONFIG_VERSION_KEY)
+    except Exception:
+        pass
+    _site_config["loaded"] = float("-inf")
+
+def admin_ids(default):
+    """Daftar admin dari site_config (list atau {"ids": [...]}), fallback `default`."""
+    val = site_config().get("admin_ids")
+    if not val:
+        return default
+    return val if isinstance(val, list) else val.get("ids", default)
+
+# ── HTTP client (keep-alive per host) ─────────────────────────────────────────
+http_client.configure_host(API_BASE, timeout=10,
+                           pool_maxsize=int(os.environ.get("API_POOL_MAXSIZE", 20)))
+http_client.configure_host(SUPABASE_URL, timeout=10,
+                           pool_maxsize=int(os.environ.get("SUPABASE_POOL_MAXSIZE", 10)))
+
+# ── Redis Cache (Upstash REST / Redis native / memory, lihat cache_backend.py) ──
+redis = get_backend()
 
 CACHE_TTL = {
     "home":300, "popular":600, "movies":600, "ongoing":300,
@@ -124,73 +312,230 @@ CACHE_TTL = {
 
 import random, time
 
-def _ttl(path):
-    base = CACHE_TTL["default"]
-    for k, v in CACHE_TTL.items():
-        if k in path:
-            base = v
-            break
+def _ttl(path, base=None):
+    # base: TTL endpoint dari provider; tanpa itu ditebak dari path
+    if base is None:
+        base = CACHE_TTL["default"]
+        for k, v in CACHE_TTL.items():
+            if k in path:
+                base = v
+                break
     # Jitter ±10% supaya cache tidak expired serentak
     return base + int(base * random.uniform(-0.1, 0.1))
 
-def fetch(path, params=None):
-    source   = get_active_source()          # "samehadaku" atau "animasu"
-    key      = f"animeku:{source}:" + path + str(sorted(params.items()) if params else "")
-    lock_key = key + ":lock"
+def fetch(path, params=None, source=None, ttl=None, fresh=False):
+    # source bisa di-pass eksplisit supaya fetch bisa jalan di luar request thread.
+    # fresh=True: raw JSON basi tidak disajikan (lihat cached_fetch), dipakai loader view
+    source   = source or get_active_source()    # "samehadaku" / "animasu" / "otakudesu"
+    key      = _raw_key(source, path, params)
+
+    def load():
+        # Breaker open → CircuitOpen, cached_fetch menyajikan data basi kalau ada.
+        # 4xx (slug salah dll) bukan tanda upstream sakit, hanya 5xx yang dihitung gagal
+        r = breaker_call(source, lambda: http_client.get(f"{API_BASE}{path}", params=params, timeout=10),
+                         ok=lambda r: r.status_code < 500)
+        r.raise_for_status()
+        return r.json()
+
+    # L1 → Redis → upstream (distributed lock + stale-while-revalidate)
+    return _note_miss(cached_fetch(redis, key, _ttl(path, ttl), load, fresh=fresh))
+
+def _gen(source, path):
+    """Tag generasi (semua, source, route family, slug) untuk path upstream."""
+    return gen_tag(redis, cache_namespaces(source, path, SOURCES[source]["prefix"]))
+
+def _raw_key(source, path, params=None):
+    return f"animeku:{source}:{_gen(source, path)}:" + path + str(sorted(params.items()) if params else "")
+
+def _note_miss(data):
+    """Tandai request ini dapat data kosong → halamannya jangan di-page-cache."""
+    if data is None:
+        try:
+            g.upstream_miss = True
+        except RuntimeError:
+            pass  # di luar request (thread fan-out / background)
+    return data
+
+# Naikkan kalau output salah satu normalizer berubah → cache view lama diabaikan
+NORMALIZER_VERSION = 2
+
+def _normalizer_name(normalize):
+    fn   = getattr(normalize, "func", normalize)    # functools.partial → fungsi aslinya
+    args = sorted(getattr(normalize, "keywords", {}).items())
+    # Argumen partial (mis. letter="A") ikut masuk key supaya tidak bentrok
+    return fn.__name__ + "".join(f":{k}={v}" for k, v in args)
+
+def _view_key(source, path, params=None, normalize=None):
+    return (f"animeku:{source}:view:v{NORMALIZER_VERSION}:{_gen(source, path)}:"
+            f"{_normalizer_name(normalize)}:" + path + str(sorted(params.items()) if params else ""))
+
+def fetch_view(path, params=None, normalize=None, ttl=None, source=None, fresh=False):
+    """Seperti fetch(), tapi yang di-cache hasil normalize(raw), bukan raw JSON.
+
+    Key: (source, normalizer + NORMALIZER_VERSION, path, params). Raw JSON
+    hanya dibaca lagi kalau cache view miss (mis. setelah versi dinaikkan).
+    Hasil None dari normalizer tidak di-cache. View dibuat dari raw JSON yang
+    fresh: kalau raw basi, loader menunggu raw di-fetch ulang, bukan
+    menormalisasi data lama lalu menyimpannya sebagai fresh selama TTL penuh.
+    fresh=True: view basi juga tidak disajikan (dipakai cache warmer).
+    """
+    source = source or get_active_source()
+    key    = _view_key(source, path, params, normalize)
 
-    # 1. Fast path — cache hit
-    try:
-        cached = redis.get(key)
-        if cached:
-            return json.loads(cached)
-    except Exception as e:
-        print(f"Redis get error: {e}")
+    def load():
+        data = normalize(fetch(path, params, source=source, ttl=ttl, fresh=True))
+        if data is None:
+            raise ValueError(f"payload kosong/tidak valid [{path}]")
+        return data
 
-    # 2. Coba acquire distributed lock (SET NX EX 10)
-    #    Hanya 1 worker/instance yang berhasil, sisanya dapat None
-    lock_acquired = False
-    try:
-        lock_acquired = redis.set(lock_key, "1", nx=True, ex=10)
-    except Exception as e:
-        print(f"Redis lock error: {e}")
+    return _note_miss(cached_fetch(redis, key, _ttl(path, ttl), load, fresh=fresh))
+
+def peek_view(path, params=None, normalize=None, ttl=None, source=None):
+    """Isi cache fetch_view() tanpa fetch ke upstream (None kalau belum di-cache)."""
+    source = source or get_active_source()
+    return cached_value(redis, _view_key(source, path, params, normalize), _ttl(path, ttl))
+
+def fetch_many(*reqs):
+    """Fetch beberapa path secara paralel, return list hasil sesuai urutan.
 
-    if lock_acquired:
-        # Worker yang dapat lock → fetch ke API
+    Tiap item boleh `path`, `(path, params)`, `(path, params, normalize)`
+    (lewat fetch_view) atau `(path, params, normalize, ttl)` dari endpoint().
+    Contoh:
+        data, sched = fetch_many(endpoint("home"), endpoint("schedule"))
+    """
+    source = get_active_source()
+    plan   = _plan_requests(source, reqs)
+    # Satu MGET untuk semua key → fan-out di bawah kebanyakan kena L1
+    prefetch_tiered(redis, [key for key, *_ in plan])
+    calls = [lambda path=path, params=params, normalize=normalize, ttl=ttl:
+             fetch_view(path, params, normalize, source=source, ttl=ttl) if normalize
+             else fetch(path, params, source=source, ttl=ttl)
+             for _, path, params, normalize, ttl in plan]
+    return [_note_miss(r) for r in gather(calls)]
+
+def _plan_requests(source, reqs):
+    """Item fetch_many() → list (cache key, path, params, normalize, ttl)."""
+    plan = []
+    for req in reqs:
+        req = (req,) if isinstance(req, str) else tuple(req)
+        path, params, normalize, ttl = req + (None,) * (4 - len(req))
+        key = _view_key(source, path, params, normalize) if normalize else _raw_key(source, path, params)
+        plan.append((key, path, params, normalize, ttl))
+    return plan
+
+
+# ── Fetch async (dipakai asgi.py) ─────────────────────────────────────────────
+# Sama dengan fetch / fetch_view / fetch_many, tapi upstream ditunggu di event
+# loop (httpx) dan operasi Redis lewat thread — termasuk menyusun key, karena
+# _gen() bisa MGET counter generasi ke Upstash. Key & cache-nya sama persis,
+# jadi view Flask yang jalan sesudahnya tinggal membaca L1. `source` harus
+# sudah di-resolve (asgi.py memanggil get_active_source() di thread).
+
+async def afetch(path, params=None, source=None, ttl=None, fresh=False):
+    source = source or get_active_source()
+    key    = await asyncio.to_thread(_raw_key, source, path, params)
+
+    async def load():
+        r = await breaker_acall(source, lambda: http_client.aget(f"{API_BASE}{path}", params=params, timeout=10),
+                                ok=lambda r: r.status_code < 500)
+        r.raise_for_status()
+        return r.json()
+
+    return _note_miss(await acached_fetch(redis, key, _ttl(path, ttl), load, fresh=fresh))
+
+async def afetch_view(path, params=None, normalize=None, ttl=None, source=None):
+    source = source or get_active_source()
+    key    = await asyncio.to_thread(_view_key, source, path, params, normalize)
+
+    async def load():
+        data = normalize(await afetch(path, params, source=source, ttl=ttl, fresh=True))
+        if data is None:
+            raise ValueError(f"payload kosong/tidak valid [{path}]")
+        return data
+
+    return _note_miss(await acached_fetch(redis, key, _ttl(path, ttl), load))
+
+async def afetch_many(*reqs):
+    source = get_active_source()
+    plan   = await asyncio.to_thread(_plan_requests, source, reqs)
+    await asyncio.to_thread(prefetch_tiered, redis, [key for key, *_ in plan])
+    return await asyncio.gather(*[
+        afetch_view(path, params, normalize, source=source, ttl=ttl) if normalize
+        else afetch(path, params, source=source, ttl=ttl)
+        for _, path, params, normalize, ttl in plan])
+
+
+# ── Prefetch halaman berikutnya (route list) ──────────────────────────────────
+# Setelah halaman N disajikan, halaman N+1 (route & source sama) di-fetch ke
+# cache di background. Dibatasi PREFETCH_BUDGET job sekaligus (jalan + antre);
+# kalau penuh, prefetch dilewati. prefetch.hit / prefetch.done = hit rate.
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", 2))
+PREFETCH_BUDGET  = int(os.environ.get("PREFETCH_BUDGET", 4))
+_prefetch_pool   = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_prefetch_slots  = threading.BoundedSemaphore(PREFETCH_BUDGET)
+_prefetched      = LRUCache(max_bytes=256 * 1024)   # key cache hasil prefetch yang belum dipakai
+
+# Request <link rel="prefetch"> dari browser (Sec-Purpose / Purpose: prefetch)
+# belum tentu dibuka user: bukan prefetch.hit dan tidak memicu prefetch N+2.
+def is_browser_prefetch():
+    try:
+        purpose = request.headers.get("Sec-Purpose") or request.headers.get("Purpose") or ""
+    except RuntimeError:
+        return False   # di luar request context
+    return purpose.split(";")[0].strip().lower() == "prefetch"
+
+def prefetch(key, load, ttl):
+    """Jalankan load() di background kalau `key` belum ada di cache & budget masih ada."""
+    if l1.get(key) is not None or _prefetched.get(key):
+        stats.incr("prefetch.cached")
+        return
+    if not _prefetch_slots.acquire(blocking=False):
+        stats.incr("prefetch.skipped")
+        return
+    stats.incr("prefetch.scheduled")
+
+    def run():
         try:
-            r = requests.get(f"{API_BASE}{path}", params=params, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            try:
-                redis.set(key, json.dumps(data), ex=_ttl(path))
-            except Exception as e:
-                print(f"Redis set error: {e}")
-            return data
+            if load() is None:
+                stats.incr("prefetch.error")
+                return
+            _prefetched.set(key, True, ttl, len(key))
+            stats.incr("prefetch.done")
         except Exception as e:
-            print(f"API error [{path}]: {e}")
-            return None
+            stats.incr("prefetch.error")
+            print(f"Prefetch error [{key}]: {e}")
         finally:
-            try:
-                redis.delete(lock_key)
-            except Exception:
-                pass
-    else:
-        # Worker lain sedang fetch → tunggu max 3 detik sampai cache terisi
-        for _ in range(6):
-            time.sleep(0.5)
-            try:
-                cached = redis.get(key)
-                if cached:
-                    return json.loads(cached)
-            except Exception:
-                pass
-        # Timeout — fallback fetch langsung (last resort)
-        try:
-            r = requests.get(f"{API_BASE}{path}", params=params, timeout=10)
-            r.raise_for_status()
-            return r.json()
-        except Exception as e:
-            print(f"API fallback error [{path}]: {e}")
-            return None
+            _prefetch_slots.release()
+
+    _prefetch_pool.submit(run)
+
+def note_prefetch_use(key):
+    """Panggil sebelum fetch halaman: hitung prefetch.hit kalau halaman ini hasil prefetch."""
+    if is_browser_prefetch():
+        stats.incr("prefetch.browser")
+        return
+    if _prefetched.get(key):
+        _prefetched.delete(key)
+        stats.incr("prefetch.hit")
+
+def _has_next(data):
+    return bool(data and (data.get("pagination") or {}).get("hasNext"))
+
+def fetch_pages(name, page, *extra, **kw):
+    """fetch_many([endpoint berhalaman `name`] + extra), lalu prefetch halaman
+    berikutnya kalau ada. Return list hasil (halaman dulu, lalu extra)."""
+    source = get_active_source()
+    req    = endpoint(name, source, page=page, **kw)
+    note_prefetch_use(_view_key(source, *req[:3]))
+    results = fetch_many(req, *extra)
+    if _has_next(results[0]) and not is_browser_prefetch():
+        nxt = get_provider(source).request(name, page=page + 1, **kw)
+        prefetch(_view_key(source, *nxt[:3]), lambda: fetch_view(*nxt, source=source), nxt[3])
+    return results
+
+def fetch_page(name, page, **kw):
+    """fetch_pages tanpa request tambahan → data halaman."""
+    return fetch_pages(name, page, **kw)[0]
 
 
 # ── Helper normalisasi ─────────────────────────────────────────────────────────
@@ -227,6 +572,62 @@ def norm_episode_item(ep):
         "slug": ep.get("episodeId", ep.get("slug", "")),
     }
 
+# ── Index episode ringkas ─────────────────────────────────────────────────────
+# View detail menyimpan daftar episode per kolom, bukan list {"name","slug"}:
+#   {"count": 1100, "n": [1100, 1099, ...],
+#    "slug": "one-piece-episode-{n}", "name": "Episode {n}"}
+# "slug" / "name" berupa template kalau semua item = template + nomor episode
+# (angka terakhir di slug), kalau tidak berupa list biasa; "n" hanya ada kalau
+# ada template. Urutan sama dengan upstream (index 0 = episode terbaru).
+EPISODE_WINDOW = int(os.environ.get("EPISODE_WINDOW", 40))    # tombol episode di sidebar
+EPISODE_PAGE_MAX = 200                                         # limit /api/anime/<slug>/episodes
+
+_EP_NUM = re.compile(r"\d+")
+
+def _esc(s):
+    return s.replace("{", "{{").replace("}", "}}")
+
+def _episode_template(values, nums):
+    """Template "…{n}…" kalau values[i] == template.format(n=nums[i]) untuk semua i."""
+    first, n0 = values[0], str(nums[0])
+    pos = first.rfind(n0)
+    if pos < 0:
+        return None
+    tpl = _esc(first[:pos]) + "{n}" + _esc(first[pos + len(n0):])
+    return tpl if all(v == tpl.format(n=n) for v, n in zip(values, nums)) else None
+
+def compact_episodes(eps):
+    """List {"name","slug"} → index episode ringkas."""
+    slugs = [e["slug"] for e in eps]
+    names = [e["name"] for e in eps]
+    nums  = []
+    for s in slugs:
+        found = _EP_NUM.findall(s)
+        if not found or str(int(found[-1])) != found[-1]:
+            nums = None     # nomor tidak bisa dibalik (mis. "01") → kolom list saja
+            break
+        nums.append(int(found[-1]))
+    slug_tpl = _episode_template(slugs, nums) if nums else None
+    name_tpl = _episode_template(names, nums) if nums else None
+    index = {"count": len(eps), "slug": slug_tpl or slugs, "name": name_tpl or names}
+    if slug_tpl or name_tpl:
+        index["n"] = nums
+    return index
+
+def _episode_col(index, col, i):
+    v = index[col]
+    return v.format(n=index["n"][i]) if isinstance(v, str) else v[i]
+
+def episode_at(index, i):
+    return {"name": _episode_col(index, "name", i), "slug": _episode_col(index, "slug", i)}
+
+def episode_slice(index, start, stop):
+    return [episode_at(index, i) for i in range(max(0, start), min(index["count"], stop))]
+
+def episode_position(index, slug):
+    """Posisi episode `slug` di index, -1 kalau tidak ada."""
+    return next((i for i in range(index["count"]) if _episode_col(index, "slug", i) == slug), -1)
+
 DAY_ID = {
     "Monday": "Senin", "Tuesday": "Selasa", "Wednesday": "Rabu",
     "Thursday": "Kamis", "Friday": "Jumat", "Saturday": "Sabtu", "Sunday": "Minggu"
@@ -277,6 +678,12 @@ def animasu_norm_paginated(raw, page):
         }
     }
 
+def animasu_norm_popular(raw):
+    """Parse animasu /popular response: {animes: [...]}."""
+    if not raw or not raw.get("animes"):
+        return None
+    return {"animes": animasu_norm_list(raw.get("animes", []))}
+
 def animasu_norm_genres(raw):
     """Parse animasu genres list."""
     if not raw or raw.get("status") != "success":
@@ -317,7 +724,7 @@ def animasu_norm_detail(raw, slug):
             "synopsis": d.get("synopsis", ""),
             "trailer":  d.get("trailer", ""),
             "genres":   genres,
-            "episodes": eps,
+            "episodes": compact_episodes(eps),
             "info": {
                 "japanese":      d.get("synonym", ""),
                 "status":        d.get("status", ""),
@@ -463,7 +870,7 @@ def otakudesu_norm_detail(raw, slug):
             "synopsis": syn,
             "trailer":  d.get("trailer", ""),
             "genres":   genres,
-            "episodes": eps,
+            "episodes": compact_episodes(eps),
             "info": {
                 "japanese":      d.get("japanese", ""),
                 "status":        d.get("status", ""),
@@ -552,6 +959,412 @@ def _norm_paginated(raw, page):
         }
     return {"animes": animes, "pagination": pag_norm}
 
+# ── Samehadaku Normalizers ────────────────────────────────────────────────────
+
+def samehadaku_norm_home(raw):
+    """GET /anime/samehadaku/home → data.recent & data.top10"""
+    if not raw or not raw.get("data"):
+        return None
+    d = raw["data"]
+    return {
+        "ongoing": norm_list(d.get("recent", {}).get("animeList", [])),
+        "recent":  norm_list(d.get("top10",  {}).get("animeList", [])),
+    }
+
+def samehadaku_norm_popular(raw):
+    if not raw or not raw.get("data"):
+        return None
+    return {"animes": norm_list(raw["data"].get("animeList", []))}
+
+def samehadaku_norm_genres(raw):
+    if not raw or not raw.get("data"):
+        return None
+    return norm_genres(raw["data"].get("genreList", []))
+
+def samehadaku_norm_detail(raw, slug):
+    """GET /anime/samehadaku/anime/:slug"""
+    if not raw or not raw.get("data"):
+        return None
+    d = raw["data"]
+    eps    = [norm_episode_item(e) for e in d.get("episodeList", [])]
+    genres = norm_genres(d.get("genreList", []))
+    score_val = ""
+    if isinstance(d.get("score"), dict):
+        score_val = d["score"].get("value", "")
+    else:
+        score_val = str(d.get("score", ""))
+    return {
+        "detail": {
+            "title":    d.get("title", ""),
+            "poster":   d.get("poster", ""),
+            "synopsis": " ".join(d.get("synopsis", {}).get("paragraphs", [])),
+            "trailer":  d.get("trailer", ""),
+            "genres":   genres,
+            "episodes": compact_episodes(eps),
+            "info": {
+                "japanese":      d.get("japanese", ""),
+                "status":        d.get("status", ""),
+                "type":          d.get("type", ""),
+                "score":         score_val,
+                "total_episode": str(d.get("episodes", "")),
+                "duration":      d.get("duration", ""),
+                "released":      d.get("aired", ""),
+                "studio":        d.get("studios", ""),
+                "season":        d.get("season", ""),
+            }
+        }
+    }
+
+def samehadaku_norm_episode(raw):
+    """GET /anime/samehadaku/episode/:slug"""
+    if not raw or not raw.get("data"):
+        return None
+    d = raw["data"]
+    streams = []
+    for quality in d.get("server", {}).get("qualities", []):
+        q_title = quality.get("title", "")
+        for srv in quality.get("serverList", []):
+            srv_name = srv.get("title", "")
+            if q_title and q_title.lower() not in srv_name.lower():
+                label = f"{srv_name} {q_title}".strip()
+            else:
+                label = srv_name
+            streams.append({
+                "name":     label,
+                "serverId": srv.get("serverId", ""),
+                "url":      "",
+            })
+    default_url = d.get("defaultStreamingUrl", "")
+    if default_url:
+        streams.insert(0, {"name": "Default Auto", "serverId": "", "url": default_url})
+    return {
+        "title":    d.get("title", ""),
+        "anime_id": d.get("animeId", ""),
+        "streams":  streams,
+        "downloads": [],
+    }
+
+def samehadaku_norm_animelist(raw):
+    """GET /anime/samehadaku/list → data.list[{startWith, animeList}]"""
+    if not raw or not raw.get("data"):
+        return None
+    anime_list = []
+    for group in raw["data"].get("list", []):
+        letter = group.get("startWith", "#")
+        animes = [{"title": a.get("title", ""), "slug": a.get("animeId", "")}
+                  for a in group.get("animeList", [])]
+        if animes:
+            anime_list.append({"letter": letter, "animes": animes})
+    return {"anime_list": anime_list}
+
+def samehadaku_norm_search(raw):
+    """GET /anime/samehadaku/search?q= → data.animeList"""
+    if not raw or not raw.get("data"):
+        return None
+    return {"animes": norm_list(raw["data"].get("animeList", []))}
+
+def norm_server(raw):
+    """GET .../server/:id → data.url (samehadaku & otakudesu)"""
+    if not raw or not raw.get("data"):
+        return None
+    return {"url": raw["data"].get("url", "")}
+
+def animasu_norm_catalogue(raw):
+    """Katalog animasu (/animelist) → item mentah [{slug, title, poster?, type?}]."""
+    return raw.get("animes", []) if raw else None
+
+def norm_catalogue(raw):
+    """Katalog ber-grup huruf (samehadaku /list, otakudesu /unlimited) → item mentah."""
+    if not raw:
+        return None
+    return [a for group in (raw.get("data") or {}).get("list", []) for a in group.get("animeList", [])]
+
+# ── Provider per source (lihat providers.py) ──────────────────────────────────
+# Semua beda endpoint / normalizer / TTL antar source dideklarasikan di sini.
+# Route cukup memanggil endpoint(nama, ...) → caching, fan-out, prefetch dan
+# metrics provider.<source>.<endpoint> otomatis berlaku untuk semua source.
+
+ENDPOINT_TTL = {
+    "home": CACHE_TTL["home"], "popular": CACHE_TTL["popular"], "popular_list": CACHE_TTL["popular"],
+    "movies": CACHE_TTL["movies"], "ongoing": CACHE_TTL["ongoing"], "completed": CACHE_TTL["completed"],
+    "schedule": CACHE_TTL["schedule"], "genres": CACHE_TTL["genres"], "genre": CACHE_TTL["genre"],
+    "catalogue": CACHE_TTL["list"], "detail": CACHE_TTL["anime"], "episode": CACHE_TTL["episode"],
+    "search": CACHE_TTL["search"], "server": CACHE_TTL["server"], "default": CACHE_TTL["default"],
+}
+
+register_provider(Provider(
+    "samehadaku", SOURCES["samehadaku"]["prefix"],
+    endpoints={
+        "home": "/home", "popular": "/popular", "schedule": "/schedule",
+        "genres": "/genres", "genre": "/genres/{slug}",
+        "ongoing": "/ongoing", "completed": "/completed", "movies": "/movies", "popular_list": "/popular",
+        "catalogue": "/list", "detail": "/anime/{slug}", "episode": "/episode/{slug}",
+        "search": "/search?q={q}", "server": "/server/{id}",
+    },
+    normalizers={
+        "home": samehadaku_norm_home, "popular": samehadaku_norm_popular, "schedule": norm_schedule,
+        "genres": samehadaku_norm_genres, "genre": _norm_paginated,
+        "ongoing": _norm_paginated, "completed": _norm_paginated, "movies": _norm_paginated,
+        "popular_list": _norm_paginated, "catalogue": norm_catalogue, "animelist": samehadaku_norm_animelist,
+        "detail": samehadaku_norm_detail, "episode": samehadaku_norm_episode,
+        "search": samehadaku_norm_search, "server": norm_server,
+    },
+    cache_ttl=ENDPOINT_TTL,
+    batch={"home": ("home", "popular", "schedule")},
+))
+
+register_provider(Provider(
+    "animasu", SOURCES["animasu"]["prefix"],
+    endpoints={
+        # populer home dari /popular ({animes: [...]}), list "Populer" dari /latest
+        "home": "/home", "popular": "/popular", "schedule": "/schedule",
+        "genres": "/genres", "genre": "/genre/{slug}",
+        "ongoing": "/ongoing", "completed": "/completed", "movies": "/movies", "popular_list": "/latest",
+        "catalogue": "/animelist", "detail": "/detail/{slug}", "episode": "/episode/{slug}",
+        "search": "/search/{q}",
+    },
+    normalizers={
+        "home": animasu_norm_home, "popular": animasu_norm_popular, "schedule": animasu_norm_schedule,
+        "genres": animasu_norm_genres, "genre": animasu_norm_paginated,
+        "ongoing": animasu_norm_paginated, "completed": animasu_norm_paginated, "movies": animasu_norm_paginated,
+        "popular_list": animasu_norm_paginated, "catalogue": animasu_norm_catalogue,
+        "animelist": animasu_norm_animelist, "detail": animasu_norm_detail, "episode": animasu_norm_episode,
+        "search": animasu_norm_search,
+    },
+    cache_ttl=ENDPOINT_TTL,
+    batch={"home": ("home", "popular", "schedule")},
+))
+
+register_provider(Provider(
+    "otakudesu", SOURCES["otakudesu"]["prefix"],
+    endpoints={
+        # tidak ada /movies & /popular: fallback ke complete-anime & ongoing-anime
+        "home": "/home", "schedule": "/schedule",
+        "genres": "/genre", "genre": "/genre/{slug}",
+        "ongoing": "/ongoing-anime", "completed": "/complete-anime", "movies": "/complete-anime",
+        "popular_list": "/ongoing-anime",
+        "catalogue": "/unlimited", "detail": "/anime/{slug}", "episode": "/episode/{slug}",
+        "search": "/search/{q}", "server": "/server/{id}",
+    },
+    normalizers={
+        "home": otakudesu_norm_home, "schedule": otakudesu_norm_schedule,
+        "genres": otakudesu_norm_genres, "genre": otakudesu_norm_paginated,
+        "ongoing": otakudesu_norm_paginated, "completed": otakudesu_norm_paginated,
+        "movies": otakudesu_norm_paginated, "popular_list": otakudesu_norm_paginated,
+        "catalogue": norm_catalogue, "animelist": otakudesu_norm_animelist,
+        "detail": otakudesu_norm_detail, "episode": otakudesu_norm_episode,
+        "search": otakudesu_norm_search, "server": norm_server,
+    },
+    cache_ttl=ENDPOINT_TTL,
+    # populer home diambil dari ongoing (lihat home())
+    batch={"home": ("home", "schedule")},
+))
+
+def endpoint(name, source=None, **kw):
+    """Item fetch_many() endpoint `name` dari provider source (default: aktif)."""
+    source = source or get_active_source()
+    stats.incr(f"provider.{source}.{name}")
+    return get_provider(source).request(name, **kw)
+
+# ── Index huruf A-Z animelist ─────────────────────────────────────────────────
+# Katalog dipecah per huruf dan tiap huruf di-cache sebagai view sendiri,
+# jadi /animelist?letter=X & /api/animelist hanya baca satu huruf, bukan
+# seluruh katalog. Versi = hash isi, berubah kalau katalog berubah.
+
+def _animelist_groups(raw, source):
+    data = get_provider(source).normalizer("animelist")(raw)
+    return data["anime_list"] if data else None
+
+def animelist_letters(raw, source):
+    """Ringkasan: {"letters": [{"letter", "count"}], "version"}."""
+    groups = _animelist_groups(raw, source)
+    if groups is None:
+        return None
+    return {
+        "letters": [{"letter": grp["letter"], "count": len(grp["animes"])} for grp in groups],
+        "version": _content_etag(groups),
+    }
+
+def animelist_letter_page(raw, source, letter):
+    """Anime untuk satu huruf: {"letter", "animes"} (kosong kalau huruf tidak ada)."""
+    groups = _animelist_groups(raw, source)
+    if groups is None:
+        return None
+    for grp in groups:
+        if grp["letter"] == letter:
+            return {"letter": letter, "animes": grp["animes"]}
+    return {"letter": letter, "animes": []}
+
+def sidebar_detail(data):
+    """Subset detail anime untuk sidebar halaman episode."""
+    if not data:
+        return None
+    return {"detail": {
+        "title":    data["detail"].get("title", ""),
+        "poster":   data["detail"].get("poster", ""),
+        "genres":   data["detail"].get("genres", []),
+    }}
+
+def episode_nav(data, slug, window=EPISODE_WINDOW):
+    """Navigasi episode dari index ringkas view detail: episode sekarang, prev/next
+    dan jendela `window` tombol di sekitar episode sekarang."""
+    index = (data or {}).get("detail", {}).get("episodes") or compact_episodes([])
+    pos   = episode_position(index, slug)
+    start = max(0, min(pos - window // 2, index["count"] - window)) if pos >= 0 else 0
+    return {
+        "current_ep": episode_at(index, pos) if pos >= 0 else None,
+        # API mengurutkan episode dari terbaru ke terlama (index 0 = episode terbaru):
+        # prev = episode lebih lama = pos+1, next = episode lebih baru = pos-1
+        "prev_ep":    episode_at(index, pos + 1) if 0 <= pos < index["count"] - 1 else None,
+        "next_ep":    episode_at(index, pos - 1) if pos > 0 else None,
+        "episodes":   episode_slice(index, start, start + window),
+        "ep_offset":  start,
+        "ep_count":   index["count"],
+    }
+
+# ── Page cache (HTML) ─────────────────────────────────────────────────────────
+# HTML halaman publik sama untuk semua user anonim per (route, query, source);
+# bagian yang spesifik user (login, premium, koleksi) diisi JS di client.
+
+# Berubah otomatis tiap isi template berubah → cache HTML deploy lama diabaikan
+TEMPLATE_VERSION = hashlib.sha1(b"".join(
+    open(os.path.join(root, f), "rb").read()
+    for root, _, files in sorted(os.walk(os.path.join(app.root_path, "templates")))
+    for f in sorted(files)
+)).hexdigest()[:10]
+
+def _content_etag(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def _not_modified(etag):
+    stats.incr("etag.304")
+    resp = make_response("", 304)
+    resp.set_etag(etag)
+    return resp
+
+def render_page(template, **context):
+    """render_template + ETag dari data halaman, source & TEMPLATE_VERSION.
+
+    Kalau If-None-Match cocok, langsung 304 tanpa render template.
+    """
+    etag = _content_etag(TEMPLATE_VERSION, template, get_active_source(), context)
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+    resp = make_response(render_template(template, **context))
+    resp.set_etag(etag)
+    return resp
+
+def json_response(payload):
+    """jsonify + ETag dari isi payload; If-None-Match cocok → 304 tanpa body."""
+    etag = _content_etag(payload)
+    if request.if_none_match.contains(etag):
+        resp = _not_modified(etag)
+    else:
+        resp = jsonify(payload)
+        resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+# Query arg yang dibaca view ber-page_cache; sisanya (utm_*, fbclid, ...) tidak
+# mengubah HTML jadi tidak boleh bikin entry baru. ?source= sudah masuk lewat source.
+PAGE_CACHE_ARGS = ("page", "letter")
+
+def page_cache_key(source):
+    """Key page cache untuk request saat ini (path + query arg di PAGE_CACHE_ARGS)."""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True))
+                     if k in PAGE_CACHE_ARGS)
+    gen   = gen_tag(redis, ["all", source, f"{source}:pages"])
+    return f"animeku:{source}:page:{TEMPLATE_VERSION}:{gen}:{request.path}?{query}"
+
+def page_cache(ttl_name):
+    """Cache hasil render halaman untuk user anonim, TTL = CACHE_TTL[ttl_name].
+
+    User login di-bypass. Response dari source default (tanpa cookie
+    active_source) boleh disimpan edge Vercel lewat s-maxage.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if session.get("user"):
+                stats.incr("page.bypass")
+                resp = make_response(view(*args, **kwargs))
+                resp.headers["Cache-Control"] = "private, no-cache"
+                return resp
+
+            ttl    = CACHE_TTL[ttl_name]
+            key    = page_cache_key(get_active_source())
+
+            entry = get_tiered(redis, key, ttl)
+            if entry is not None:
+                stats.incr("page.hit")
+                if request.if_none_match.contains(entry["etag"]):
+                    resp = _not_modified(entry["etag"])
+                else:
+                    resp = make_response(entry["html"])
+                    resp.set_etag(entry["etag"])
+            else:
+                stats.incr("page.miss")
+                resp = view(*args, **kwargs)      # render_page → 200 atau 304
+                # Jangan simpan halaman "gagal memuat" kalau upstream kosong
+                if resp.status_code == 200 and not g.get("upstream_miss") and not g.get("failover_source"):
+                    set_tiered(redis, key, {"html": resp.get_data(as_text=True),
+                                            "etag": resp.get_etag()[0]}, ttl)
+
+            if (request.cookies.get("active_source") or request.cookies.get(FAILOVER_COOKIE)
+                    or g.get("upstream_miss") or g.get("failover_source")):
+                resp.headers["Cache-Control"] = "private, max-age=0"
+            else:
+                resp.headers["Cache-Control"] = f"public, max-age=0, s-maxage={ttl}, stale-while-revalidate={ttl}"
+            resp.vary.add("Cookie")
+            return resp
+        return wrapper
+    return decorator
+
+# ── Failover source ────────────────────────────────────────────────────────────
+# Opsional (SOURCE_FAILOVER=1): halaman yang tidak terikat slug satu source
+# (home, ongoing, jadwal, search) dirender ulang pakai source berikutnya di
+# SOURCES yang breaker-nya sehat kalau payload utama halaman (primary_data)
+# kosong; bagian pelengkap yang gagal (mis. populer di home) tidak memicu
+# failover. Hasil failover tidak di-page-cache. Source pengganti disimpan di
+# cookie pendek supaya link detail/episode di halaman itu dibuka dengan source
+# yang sama (slug beda per source). Route yang source-nya dikunci lewat URL
+# (/animasu/...) tidak ikut.
+SOURCE_FAILOVER     = os.environ.get("SOURCE_FAILOVER", "0") == "1"
+FAILOVER_COOKIE     = "failover_source"
+FAILOVER_COOKIE_TTL = int(os.environ.get("SOURCE_FAILOVER_COOKIE_TTL", 600))
+
+def primary_data(data):
+    """Tandai payload utama halaman; failover hanya kalau ini None."""
+    g.primary_miss = data is None
+    return data
+
+def failover(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        resp = view(*args, **kwargs)
+        if not SOURCE_FAILOVER or g.get("source_pinned") or not g.get("primary_miss"):
+            return resp
+        primary = get_active_source()
+        for alt in SOURCES:
+            if alt == primary or not breaker(alt).healthy():
+                continue
+            g.active_source, g.primary_miss, g.upstream_miss = alt, False, False
+            alt_resp = view(*args, **kwargs)
+            if not g.get("primary_miss"):
+                stats.incr(f"failover.{primary}.{alt}")
+                g.failover_source = alt
+                resp = make_response(alt_resp)
+                resp.headers["X-Source-Failover"] = f"{primary}->{alt}"
+                resp.set_cookie(FAILOVER_COOKIE, alt, max_age=FAILOVER_COOKIE_TTL, samesite="Lax")
+                return resp
+        stats.incr(f"failover.{primary}.none")
+        g.active_source, g.primary_miss, g.upstream_miss = primary, True, True
+        return resp
+    return wrapper
+
 # ── Pages ──────────────────────────────────────────────────────────────────────
 
 @app.route("/manifest.json")
@@ -570,372 +1383,245 @@ def landing():
     return render_template("landing.html")
 
 @app.route("/home")
+@page_cache("home")
+@failover
 def home():
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-
-    if source == "animasu":
-        raw      = fetch(f"{pfx}/home")
-        pop_raw  = fetch(f"{pfx}/popular")
-        schedule = fetch(f"{pfx}/schedule")
-        data     = animasu_norm_home(raw)
-        # populer dari endpoint /popular animasu (response: {animes: [...]})
-        pop_norm = {"animes": animasu_norm_list(pop_raw.get("animes", []))} if pop_raw and pop_raw.get("animes") else None
-        sched    = animasu_norm_schedule(schedule)
-    elif source == "otakudesu":
-        raw      = fetch(f"{pfx}/home")
-        schedule = fetch(f"{pfx}/schedule")
-        data     = otakudesu_norm_home(raw)
-        # populer dari ongoing (otakudesu tidak punya endpoint popular terpisah)
-        pop_norm = {"animes": data["ongoing"][:10]} if data and data.get("ongoing") else None
-        sched    = otakudesu_norm_schedule(schedule)
+    source  = get_active_source()
+    names   = get_provider(source).batch["home"]
+    results = dict(zip(names, fetch_many(*[endpoint(name, source) for name in names])))
+    data    = primary_data(results["home"])
+    if "popular" in results:
+        pop_norm = results["popular"]
     else:
-        raw      = fetch(f"{pfx}/home")
-        popular  = fetch(f"{pfx}/popular")
-        schedule = fetch(f"{pfx}/schedule")
-        data = None
-        if raw and raw.get("data"):
-            d = raw["data"]
-            recent_list = d.get("recent", {}).get("animeList", [])
-            top10_list  = d.get("top10",  {}).get("animeList", [])
-            data = {
-                "ongoing": norm_list(recent_list),
-                "recent":  norm_list(top10_list),
-            }
-        pop_norm = None
-        if popular and popular.get("data"):
-            pop_norm = {"animes": norm_list(popular["data"].get("animeList", []))}
-        sched = norm_schedule(schedule)
+        # populer dari ongoing (source tanpa endpoint popular terpisah)
+        pop_norm = {"animes": data["ongoing"][:10]} if data and data.get("ongoing") else None
 
-    return render_template("index.html", data=data, popular=pop_norm,
-                           schedule=sched)
+    return render_page("index.html", data=data, popular=pop_norm,
+                       schedule=results["schedule"])
 
 
 @app.route("/anime/<slug>")
+@page_cache("anime")
 def detail(slug):
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-
-    if source == "animasu":
-        raw  = fetch(f"{pfx}/detail/{slug}")
-        data = animasu_norm_detail(raw, slug)
-    elif source == "otakudesu":
-        raw  = fetch(f"{pfx}/anime/{slug}")
-        data = otakudesu_norm_detail(raw, slug)
+    data = fetch_view(*endpoint("detail", slug=slug))
+    if data:
+        # salinan dengan list episode lengkap untuk template (view di cache tetap ringkas)
+        index = data["detail"]["episodes"]
+        data  = {**data, "detail": {**data["detail"], "episodes": episode_slice(index, 0, index["count"])}}
+    return render_page("detail.html", data=data, slug=slug)
+
+
+def episode_data(source, slug, anime_slug=""):
+    """(data episode, anime_slug, view detail anime) untuk halaman & player episode."""
+    req = endpoint("episode", source, slug=slug)
+    note_prefetch_use(_view_key(source, *req[:3]))
+    # Detail anime untuk sidebar pakai cache view yang sama dengan halaman detail.
+    # Kalau anime_slug sudah ada di query, episode & detail di-fetch paralel
+    if anime_slug:
+        data, adat = fetch_many(req, endpoint("detail", source, slug=anime_slug))
     else:
-        raw = fetch(f"{pfx}/anime/{slug}")
-        data = None
-        if raw and raw.get("data"):
-            d = raw["data"]
-            eps    = [norm_episode_item(e) for e in d.get("episodeList", [])]
-            genres = norm_genres(d.get("genreList", []))
-            score_val = ""
-            if isinstance(d.get("score"), dict):
-                score_val = d["score"].get("value", "")
-            else:
-                score_val = str(d.get("score", ""))
-            data = {
-                "detail": {
-                    "title":    d.get("title", ""),
-                    "poster":   d.get("poster", ""),
-                    "synopsis": " ".join(d.get("synopsis", {}).get("paragraphs", [])),
-                    "trailer":  d.get("trailer", ""),
-                    "genres":   genres,
-                    "episodes": eps,
-                    "info": {
-                        "japanese":      d.get("japanese", ""),
-                        "status":        d.get("status", ""),
-                        "type":          d.get("type", ""),
-                        "score":         score_val,
-                        "total_episode": str(d.get("episodes", "")),
-                        "duration":      d.get("duration", ""),
-                        "released":      d.get("aired", ""),
-                        "studio":        d.get("studios", ""),
-                        "season":        d.get("season", ""),
-                    }
-                }
-            }
-    return render_template("detail.html", data=data, slug=slug)
+        data, adat = fetch_view(*req, source=source), None
+
+    # animasu tidak mengembalikan anime_id di payload episode
+    if not anime_slug and data and data.get("anime_id"):
+        anime_slug = data["anime_id"]
+        adat = fetch_view(*endpoint("detail", source, slug=anime_slug), source=source)
+    return data, anime_slug, adat
 
+def default_stream_url(source, streams, resolve=False):
+    """URL stream pertama yang bisa langsung diputar.
+
+    URL serverId hanya dibaca dari cache /server (diisi prefetch_episode);
+    resolve=True baru fetch ke upstream (dipakai di background saja).
+    """
+    for s in streams:
+        if s.get("url"):
+            return s["url"]
+    p = get_provider(source)
+    first = next((s["serverId"] for s in streams if s.get("serverId")), None)
+    if first and p.has("server"):
+        req = p.request("server", id=first)
+        srv = fetch_view(*req, source=source) if resolve else peek_view(*req, source=source)
+        return (srv or {}).get("url", "")
+    return ""
+
+def prefetch_episode(source, slug):
+    """Isi cache data player episode `slug` (episode + URL server default) di background."""
+    req = get_provider(source).request("episode", slug=slug)
+
+    def load():
+        data = fetch_view(*req, source=source)
+        if data:
+            default_stream_url(source, data.get("streams") or [], resolve=True)
+        return data
+
+    prefetch(_view_key(source, *req[:3]), load, req[3])
 
 @app.route("/episode/<slug>")
 def episode(slug):
-    source     = get_active_source()
-    pfx        = SOURCES[source]["prefix"]
-    anime_slug = request.args.get("anime", "")
-
-    data = None
-    if source == "animasu":
-        raw  = fetch(f"{pfx}/episode/{slug}")
-        data = animasu_norm_episode(raw)
-        anime_data = None
-        if anime_slug:
-            araw = fetch(f"{pfx}/detail/{anime_slug}")
-            adat = animasu_norm_detail(araw, anime_slug)
-            if adat:
-                anime_data = adat
-    elif source == "otakudesu":
-        raw  = fetch(f"{pfx}/episode/{slug}")
-        data = otakudesu_norm_episode(raw)
-        if not anime_slug and data and data.get("anime_id"):
-            anime_slug = data["anime_id"]
-        anime_raw  = fetch(f"{pfx}/anime/{anime_slug}") if anime_slug else None
-        anime_data = None
-        if anime_raw:
-            adat = otakudesu_norm_detail(anime_raw, anime_slug)
-            if adat:
-                anime_data = {"detail": {
-                    "title":    adat["detail"].get("title", ""),
-                    "poster":   adat["detail"].get("poster", ""),
-                    "genres":   adat["detail"].get("genres", []),
-                    "episodes": adat["detail"].get("episodes", []),
-                }}
-    else:
-        raw        = fetch(f"{pfx}/episode/{slug}")
-        if raw and raw.get("data"):
-            d = raw["data"]
-            streams = []
-            for quality in d.get("server", {}).get("qualities", []):
-                q_title = quality.get("title", "")
-                for srv in quality.get("serverList", []):
-                    srv_name = srv.get("title", "")
-                    if q_title and q_title.lower() not in srv_name.lower():
-                        label = f"{srv_name} {q_title}".strip()
-                    else:
-                        label = srv_name
-                    streams.append({
-                        "name":     label,
-                        "serverId": srv.get("serverId", ""),
-                        "url":      "",
-                    })
-            default_url = d.get("defaultStreamingUrl", "")
-            if default_url:
-                streams.insert(0, {"name": "Default Auto", "serverId": "", "url": default_url})
-            ep_anime_id = d.get("animeId", "")
-            data = {
-                "title":    d.get("title", ""),
-                "anime_id": ep_anime_id,
-                "streams":  streams,
-                "downloads": [],
-            }
+    source = get_active_source()
+    data, anime_slug, adat = episode_data(source, slug, request.args.get("anime", ""))
+    nav = episode_nav(adat, slug)
+    if nav["next_ep"] and not is_browser_prefetch():
+        prefetch_episode(source, nav["next_ep"]["slug"])
+
+    return render_page("episode.html", data=data, slug=slug,
+                       anime_slug=anime_slug, anime_data=sidebar_detail(adat), **nav)
 
-        if not anime_slug and data and data.get("anime_id"):
-            anime_slug = data["anime_id"]
-
-        anime_raw  = fetch(f"{pfx}/anime/{anime_slug}") if anime_slug else None
-        anime_data = None
-        if anime_raw and anime_raw.get("data"):
-            d2     = anime_raw["data"]
-            eps    = [norm_episode_item(e) for e in d2.get("episodeList", [])]
-            genres = norm_genres(d2.get("genreList", []))
-            anime_data = {
-                "detail": {
-                    "title":    d2.get("title", ""),
-                    "poster":   d2.get("poster", ""),
-                    "genres":   genres,
-                    "episodes": eps,
-                }
-            }
 
-    return render_template("episode.html", data=data, slug=slug,
-                           anime_slug=anime_slug, anime_data=anime_data)
+@app.route("/api/episode/<slug>/player")
+def api_episode_player(slug):
+    """Data ringkas player: streams, URL server default, slug episode prev/next.
+
+    default_url hanya dari cache ("" kalau server default belum di-resolve →
+    player memakai /api/server/<id>). Episode berikutnya di-prefetch ke cache.
+    """
+    source = get_active_source()
+    data, anime_slug, adat = episode_data(source, slug, request.args.get("anime", ""))
+    if not data:
+        return jsonify({"error": "Episode tidak ditemukan"}), 404
+    nav     = episode_nav(adat, slug, window=0)
+    streams = data.get("streams") or []
+    if nav["next_ep"] and not is_browser_prefetch():
+        prefetch_episode(source, nav["next_ep"]["slug"])
+    return json_response({
+        "slug":        slug,
+        "title":       data.get("title", ""),
+        "anime_slug":  anime_slug,
+        "streams":     streams,
+        "default_url": default_stream_url(source, streams),
+        "prev":        nav["prev_ep"]["slug"] if nav["prev_ep"] else None,
+        "next":        nav["next_ep"]["slug"] if nav["next_ep"] else None,
+    })
+
+
+@app.route("/api/anime/<slug>/episodes")
+def api_anime_episodes(slug):
+    """Potongan daftar episode untuk sidebar: ?source=&offset=0&limit=100 (urutan upstream).
+
+    Halaman episode selalu mengirim ?source= miliknya, jadi hasilnya tidak
+    bergantung cookie (halaman /animasu/... tetap baca detail animasu).
+    """
+    source = get_active_source()
+    data   = fetch_view(*endpoint("detail", source, slug=slug), source=source)
+    if not data:
+        return jsonify({"error": "Anime tidak ditemukan"}), 404
+    index  = data["detail"]["episodes"]
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit  = max(1, min(request.args.get("limit", EPISODE_WINDOW, type=int), EPISODE_PAGE_MAX))
+    return json_response({"total": index["count"], "offset": offset,
+                          "episodes": episode_slice(index, offset, offset + limit)})
 
 
 @app.route("/api/server/<server_id>")
 def api_server(server_id):
     source = get_active_source()
-    if source == "samehadaku":
-        raw = fetch(f"/anime/samehadaku/server/{server_id}")
-        if raw and raw.get("data"):
-            return jsonify({"url": raw["data"].get("url", "")})
-    elif source == "otakudesu":
-        raw = fetch(f"/anime/server/{server_id}")
-        if raw and raw.get("data"):
-            return jsonify({"url": raw["data"].get("url", "")})
+    if get_provider(source).has("server"):
+        data = fetch_view(*endpoint("server", source, id=server_id))
+        if data:
+            return jsonify(data)
     return jsonify({"url": ""}), 404
 
 
 @app.route("/genre/<slug>")
 def genre(slug):
-    page   = request.args.get("page", 1)
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-
-    if source == "animasu":
-        raw        = fetch(f"{pfx}/genre/{slug}", {"page": page})
-        genres_raw = fetch(f"{pfx}/genres")
-        data       = animasu_norm_paginated(raw, int(page)) if raw else None
-        genres     = {"genres": animasu_norm_genres(genres_raw)} if genres_raw else None
-    elif source == "otakudesu":
-        raw        = fetch(f"{pfx}/genre/{slug}", {"page": page})
-        genres_raw = fetch(f"{pfx}/genre")
-        data = None
-        if raw and raw.get("data"):
-            pag      = raw.get("pagination") or {}
-            pag_norm = {"hasNext": pag.get("hasNextPage", False), "hasPrev": pag.get("hasPrevPage", False), "currentPage": pag.get("currentPage", 1)} if pag else None
-            data     = {"animes": otakudesu_norm_list(raw["data"].get("animeList", [])), "pagination": pag_norm}
-        genres = {"genres": otakudesu_norm_genres(genres_raw)} if genres_raw else None
-    else:
-        raw        = fetch(f"{pfx}/genres/{slug}", {"page": page})
-        genres_raw = fetch(f"{pfx}/genres")
-        data = None
-        if raw and raw.get("data"):
-            animes   = norm_list(raw["data"].get("animeList", []))
-            pagination = raw.get("pagination")
-            pag_norm = None
-            if pagination:
-                pag_norm = {
-                    "hasNext":    pagination.get("hasNextPage", False),
-                    "hasPrev":    pagination.get("hasPrevPage", False),
-                    "currentPage": pagination.get("currentPage", 1),
-                }
-            data = {"animes": animes, "pagination": pag_norm}
-        genres = None
-        if genres_raw and genres_raw.get("data"):
-            genres = {"genres": norm_genres(genres_raw["data"].get("genreList", []))}
-
-    return render_template("genre.html", data=data, slug=slug, genres=genres, page=int(page))
+    page = request.args.get("page", 1, type=int)
+    data, genre_list = fetch_pages("genre", page, endpoint("genres"), slug=slug)
+    genres = {"genres": genre_list} if genre_list is not None else None
+    return render_page("genre.html", data=data, slug=slug, genres=genres, page=page)
 
 
 @app.route("/genres")
+@page_cache("genres")
 def genres():
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    # otakudesu pakai /anime/genre (tanpa s)
-    if source == "otakudesu":
-        raw = fetch(f"{pfx}/genre")
-    else:
-        raw = fetch(f"{pfx}/genres")
-    data   = None
-    if source == "animasu":
-        if raw:
-            data = {"genres": animasu_norm_genres(raw)}
-    elif source == "otakudesu":
-        if raw:
-            data = {"genres": otakudesu_norm_genres(raw)}
-    else:
-        if raw and raw.get("data"):
-            data = {"genres": norm_genres(raw["data"].get("genreList", []))}
-    return render_template("genres.html", data=data)
+    genre_list = fetch_view(*endpoint("genres"))
+    data = {"genres": genre_list} if genre_list is not None else None
+    return render_page("genres.html", data=data)
 
 
 @app.route("/jadwal")
+@page_cache("schedule")
+@failover
 def schedule():
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    raw    = fetch(f"{pfx}/schedule")
-    if source == "animasu":
-        sched = animasu_norm_schedule(raw)
-    elif source == "otakudesu":
-        sched = otakudesu_norm_schedule(raw)
-    else:
-        sched = norm_schedule(raw)
-    return render_template("schedule.html", data=sched)
+    sched = primary_data(fetch_view(*endpoint("schedule")))
+    return render_page("schedule.html", data=sched)
 
 
 @app.route("/movies")
 def movies():
-    page   = request.args.get("page", 1)
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    if source == "animasu":
-        data = animasu_norm_paginated(fetch(f"{pfx}/movies", {"page": page}), int(page))
-    elif source == "otakudesu":
-        # otakudesu tidak punya endpoint /movies, fallback ke complete-anime
-        data = otakudesu_norm_paginated(fetch(f"{pfx}/complete-anime", {"page": page}), int(page))
-    else:
-        data = _norm_paginated(fetch(f"{pfx}/movies", {"page": page}), int(page))
-    return render_template("list.html", data=data, title="Movie", page=int(page), base_url="/movies")
+    page = request.args.get("page", 1, type=int)
+    data = fetch_page("movies", page)
+    return render_page("list.html", data=data, title="Movie", page=page, base_url=request.path)
 
 
 @app.route("/ongoing")
+@page_cache("ongoing")
+@failover
 def ongoing():
-    page   = request.args.get("page", 1)
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    if source == "animasu":
-        data = animasu_norm_paginated(fetch(f"{pfx}/ongoing", {"page": page}), int(page))
-    elif source == "otakudesu":
-        data = otakudesu_norm_paginated(fetch(f"{pfx}/ongoing-anime", {"page": page}), int(page))
-    else:
-        data = _norm_paginated(fetch(f"{pfx}/ongoing", {"page": page}), int(page))
-    return render_template("list.html", data=data, title="Ongoing", page=int(page), base_url="/ongoing")
+    page = request.args.get("page", 1, type=int)
+    data = primary_data(fetch_page("ongoing", page))
+    return render_page("list.html", data=data, title="Ongoing", page=page, base_url=request.path)
 
 
 @app.route("/completed")
+@page_cache("completed")
 def completed():
-    page   = request.args.get("page", 1)
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    if source == "animasu":
-        data = animasu_norm_paginated(fetch(f"{pfx}/completed", {"page": page}), int(page))
-    elif source == "otakudesu":
-        data = otakudesu_norm_paginated(fetch(f"{pfx}/complete-anime", {"page": page}), int(page))
-    else:
-        data = _norm_paginated(fetch(f"{pfx}/completed", {"page": page}), int(page))
-    return render_template("list.html", data=data, title="Completed", page=int(page), base_url="/completed")
+    page = request.args.get("page", 1, type=int)
+    data = fetch_page("completed", page)
+    return render_page("list.html", data=data, title="Completed", page=page, base_url=request.path)
 
 
 @app.route("/popular")
 def popular():
-    page   = request.args.get("page", 1)
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    if source == "animasu":
-        data = animasu_norm_paginated(fetch(f"{pfx}/latest", {"page": page}), int(page))
-    elif source == "otakudesu":
-        # otakudesu tidak punya endpoint /popular, fallback ke ongoing-anime
-        data = otakudesu_norm_paginated(fetch(f"{pfx}/ongoing-anime", {"page": page}), int(page))
-    else:
-        data = _norm_paginated(fetch(f"{pfx}/popular", {"page": page}), int(page))
-    return render_template("list.html", data=data, title="Populer", page=int(page), base_url="/popular")
+    page = request.args.get("page", 1, type=int)
+    data = fetch_page("popular_list", page)
+    return render_page("list.html", data=data, title="Populer", page=page, base_url=request.path)
 
 
 @app.route("/animelist")
+@page_cache("list")
 def animelist():
+    source  = get_active_source()
+    index   = _letter_index(source)
+    letters = index["letters"] if index else []
+    letter  = request.args.get("letter", "").strip().upper()
+    if letters and letter not in {l["letter"] for l in letters}:
+        letter = letters[0]["letter"]
+    page    = _letter_page(source, letter) if letters else None
+    return render_page("animelist.html", letters=letters, letter=letter,
+                       animes=page["animes"] if page else [],
+                       version=index["version"] if index else None)
+
+def _letter_index(source):
+    return fetch_view(*endpoint("catalogue", source, normalize=partial(animelist_letters, source=source)),
+                      source=source)
+
+def _letter_page(source, letter):
+    norm = partial(animelist_letter_page, source=source, letter=letter)
+    return fetch_view(*endpoint("catalogue", source, normalize=norm), source=source)
+
+@app.route("/api/animelist")
+def api_animelist():
+    """Tanpa ?letter → daftar huruf + jumlah; dengan ?letter=X → anime huruf X."""
     source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    if source == "animasu":
-        raw  = fetch(f"{pfx}/animelist")
-        data = animasu_norm_animelist(raw)
-    elif source == "otakudesu":
-        # otakudesu animelist ada di /anime/unlimited
-        raw  = fetch(f"{pfx}/unlimited")
-        data = otakudesu_norm_animelist(raw)
-    else:
-        raw  = fetch(f"{pfx}/list")
-        data = None
-        if raw and raw.get("data"):
-            list_data = raw["data"].get("list", [])
-            anime_list = []
-            for group in list_data:
-                letter = group.get("startWith", "#")
-                animes = [{"title": a.get("title", ""), "slug": a.get("animeId", "")}
-                          for a in group.get("animeList", [])]
-                if animes:
-                    anime_list.append({"letter": letter, "animes": animes})
-            data = {"anime_list": anime_list}
-    return render_template("animelist.html", data=data)
+    index  = _letter_index(source)
+    if not index:
+        return jsonify({"error": "Gagal memuat daftar anime"}), 502
+    letter = request.args.get("letter", "").strip().upper()
+    if not letter:
+        return json_response(index)
+    if letter not in {l["letter"] for l in index["letters"]}:
+        return jsonify({"error": "Huruf tidak ditemukan"}), 404
+    page = _letter_page(source, letter)
+    return json_response({**(page or {"letter": letter, "animes": []}), "version": index["version"]})
 
 
 @app.route("/search")
+@failover
 def search():
-    q      = request.args.get("q", "")
-    source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    data   = None
-    if q:
-        if source == "animasu":
-            raw  = fetch(f"{pfx}/search/{q}")
-            data = animasu_norm_search(raw)
-        elif source == "otakudesu":
-            raw  = fetch(f"{pfx}/search/{q}")
-            data = otakudesu_norm_search(raw)
-        else:
-            raw  = fetch(f"{pfx}/search", {"q": q})
-            if raw and raw.get("data"):
-                data = {"animes": norm_list(raw["data"].get("animeList", []))}
-    return render_template("search.html", data=data, query=q)
+    q    = request.args.get("q", "")
+    data = primary_data(fetch_view(*endpoint("search", q=q))) if q else None
+    return render_page("search.html", data=data, query=q)
 
 
 @app.route("/koleksi")
@@ -980,7 +1666,7 @@ def mylist_save():
         return jsonify({"error": "Username wajib diisi"}), 400
     if not anime_list:
         return jsonify({"error": "Pilih minimal 1 anime"}), 400
-    r = requests.post(
+    r = http_client.post(
         f"{SUPABASE_URL}/rest/v1/anime_lists",
         headers={**supabase_headers(), "Prefer": "return=representation"},
         json={"username": username, "anime_list": anime_list},
@@ -995,7 +1681,7 @@ def mylist_get_lists():
     page   = int(request.args.get("page", 1))
     limit  = 12
     offset = (page - 1) * limit
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/anime_lists?select=*&order=created_at.desc&limit={limit}&offset={offset}",
         headers=supabase_headers(), timeout=10
     )
@@ -1003,7 +1689,7 @@ def mylist_get_lists():
 
 @app.route("/api/mylist/list/<list_id>")
 def mylist_get_list(list_id):
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/anime_lists?id=eq.{list_id}&select=*",
         headers=supabase_headers(), timeout=10
     )
@@ -1024,13 +1710,13 @@ def mylist_draft_create():
     pin = ""
     for _ in range(5):
         pin = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        chk = requests.get(
+        chk = http_client.get(
             f"{SUPABASE_URL}/rest/v1/anime_drafts?pin=eq.{pin}&select=id",
             headers=supabase_headers(), timeout=10
         )
         if not chk.json():
             break
-    r = requests.post(
+    r = http_client.post(
         f"{SUPABASE_URL}/rest/v1/anime_drafts",
         headers={**supabase_headers(), "Prefer": "return=representation"},
         json={"username": username, "anime_list": anime_list, "title": title, "pin": pin},
@@ -1045,7 +1731,7 @@ def mylist_draft_list():
     pin = request.args.get("pin", "").strip().upper()
     if not pin:
         return jsonify({"error": "PIN wajib"}), 400
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/anime_drafts?pin=eq.{pin}&select=*&order=updated_at.desc",
         headers=supabase_headers(), timeout=10
     )
@@ -1058,14 +1744,14 @@ def mylist_draft_update(draft_id):
     pin  = (body.get("pin") or "").strip().upper()
     if not pin:
         return jsonify({"error": "PIN wajib"}), 400
-    chk = requests.get(
+    chk = http_client.get(
         f"{SUPABASE_URL}/rest/v1/anime_drafts?id=eq.{draft_id}&pin=eq.{pin}&select=id",
         headers=supabase_headers(), timeout=10
     )
     if not chk.json():
         return jsonify({"error": "PIN salah"}), 403
     update_data = {k: body[k] for k in ["anime_list", "username", "title"] if k in body}
-    r = requests.patch(
+    r = http_client.patch(
         f"{SUPABASE_URL}/rest/v1/anime_drafts?id=eq.{draft_id}",
         headers=supabase_headers(), json=update_data, timeout=10
     )
@@ -1076,13 +1762,13 @@ def mylist_draft_delete(draft_id):
     pin = request.args.get("pin", "").strip().upper()
     if not pin:
         return jsonify({"error": "PIN wajib"}), 400
-    chk = requests.get(
+    chk = http_client.get(
         f"{SUPABASE_URL}/rest/v1/anime_drafts?id=eq.{draft_id}&pin=eq.{pin}&select=id",
         headers=supabase_headers(), timeout=10
     )
     if not chk.json():
         return jsonify({"error": "PIN salah"}), 403
-    r = requests.delete(
+    r = http_client.delete(
         f"{SUPABASE_URL}/rest/v1/anime_drafts?id=eq.{draft_id}",
         headers=supabase_headers(), timeout=10
     )
@@ -1094,7 +1780,7 @@ def mylist_draft_publish(draft_id):
     pin  = (body.get("pin") or "").strip().upper()
     if not pin:
         return jsonify({"error": "PIN wajib"}), 400
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/anime_drafts?id=eq.{draft_id}&pin=eq.{pin}&select=*",
         headers=supabase_headers(), timeout=10
     )
@@ -1102,7 +1788,7 @@ def mylist_draft_publish(draft_id):
     if not drafts:
         return jsonify({"error": "PIN salah"}), 403
     d  = drafts[0]
-    r2 = requests.post(
+    r2 = http_client.post(
         f"{SUPABASE_URL}/rest/v1/anime_lists",
         headers={**supabase_headers(), "Prefer": "return=representation"},
         json={"username": d["username"], "anime_list": d["anime_list"]},
@@ -1124,20 +1810,97 @@ def admin():
 
 @app.route("/api/admin/cache/flush", methods=["POST"])
 def admin_flush_cache():
-    """Hapus semua cache Redis animeku. Admin only."""
+    """Invalidate semua cache data (semua source + animasu extension). Admin only.
+
+    Cukup 1 INCR generasi "all" — key lama tidak dibaca lagi & expired sendiri.
+    """
     auth_header = request.headers.get("Authorization", "")
     access_token = auth_header.replace("Bearer ", "").strip()
     if not _is_admin(access_token):
         return jsonify({"error": "Forbidden"}), 403
     try:
-        keys = redis.keys("animeku:*")
-        if keys:
-            for k in keys:
-                redis.delete(k)
-        return jsonify({"ok": True, "deleted": len(keys) if keys else 0})
+        gens = bump_generation(redis, "all")
+        l1.clear()
+        return jsonify({"ok": True, "generations": gens})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
+@app.route("/api/admin/cache/invalidate", methods=["POST"])
+def admin_invalidate_cache():
+    """Invalidate sebagian cache. Admin only.
+
+    JSON: {"source": "animasu", "family": "anime", "slug": "one-piece"} — semua opsional.
+      - kosong             → semua cache (sama dengan /flush)
+      - source             → semua cache source tsb
+      - family / slug      → route family (segmen path pertama, mis. "anime",
+                             "episode", "ongoing") / slug tertentu, di source
+                             tsb atau semua source kalau source kosong.
+    Halaman HTML yang di-cache untuk source tsb ikut di-invalidate.
+    """
+    auth_header = request.headers.get("Authorization", "")
+    access_token = auth_header.replace("Bearer ", "").strip()
+    if not _is_admin(access_token):
+        return jsonify({"error": "Forbidden"}), 403
+
+    data   = request.get_json(silent=True) or {}
+    source = (data.get("source") or "").strip()
+    family = (data.get("family") or "").strip().strip("/")
+    slug   = (data.get("slug") or "").strip().strip("/")
+    if source and source not in SOURCES:
+        return jsonify({"error": f"Source tidak dikenal: {source}"}), 400
+
+    if not (source or family or slug):
+        namespaces = ["all"]
+    elif not (family or slug):
+        namespaces = [source]
+    else:
+        namespaces = []
+        for src in ([source] if source else SOURCES):
+            if family:
+                namespaces.append(f"{src}:family:{family}")
+            if slug:
+                namespaces.append(f"{src}:slug:{slug}")
+            namespaces.append(f"{src}:pages")
+    try:
+        return jsonify({"ok": True, "generations": bump_generation(redis, *namespaces)})
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@app.route("/api/admin/cache/stats")
+def admin_cache_stats():
+    """Counter hit/miss cache per tier (L1 in-process & L2 Redis) untuk worker ini. Admin only."""
+    auth_header = request.headers.get("Authorization", "")
+    access_token = auth_header.replace("Bearer ", "").strip()
+    if not _is_admin(access_token):
+        return jsonify({"error": "Forbidden"}), 403
+    result = cache_stats()
+    c      = result["counters"]
+    result["prefetch_hit_rate"] = round(c.get("prefetch.hit", 0) / c["prefetch.done"], 3) if c.get("prefetch.done") else None
+    return jsonify(result)
+
+@app.route("/api/admin/http/stats")
+def admin_http_stats():
+    """Counter request keluar per host (latency, error, retry, reuse koneksi). Admin only."""
+    auth_header = request.headers.get("Authorization", "")
+    access_token = auth_header.replace("Bearer ", "").strip()
+    if not _is_admin(access_token):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(http_client.stats())
+
+@app.route("/api/admin/sources/health")
+def admin_sources_health():
+    """State circuit breaker per source (error rate, latency, reject) untuk worker ini. Admin only."""
+    auth_header = request.headers.get("Authorization", "")
+    access_token = auth_header.replace("Bearer ", "").strip()
+    if not _is_admin(access_token):
+        return jsonify({"error": "Forbidden"}), 403
+    counters = cache_stats()["counters"]
+    return jsonify({
+        "failover": SOURCE_FAILOVER,
+        "sources":  {src: breaker(src).snapshot() for src in SOURCES},
+        "failovers": {k: v for k, v in counters.items() if k.startswith("failover.")},
+    })
+
 @app.route("/premium")
 def premium():
     return render_template("premium.html")
@@ -1147,24 +1910,246 @@ def profile():
     return render_template("profile.html")
 
 
+# ── Search index (katalog animelist) ──────────────────────────────────────────
+# Live search dijawab in-process dari index judul (search_index.py); upstream
+# /search hanya fallback kalau index belum ada atau tidak ketemu apa-apa.
+# Isi index (docs) disimpan di Redis + nomor versi; job terjadwal
+# (/api/cron/search-index) membandingkan katalog terbaru dengan docs lama
+# dan hanya menulis kalau ada perubahan. Tiap proses cek versi max tiap
+# SEARCH_INDEX_CHECK detik lalu menerapkan selisihnya (add/remove).
+# Katalog samehadaku/otakudesu tidak membawa poster: poster diambil dari view
+# list yang sudah di-cache (home, ongoing, ...) dan dari docs lama.
+SEARCH_INDEX_CHECK  = int(os.environ.get("SEARCH_INDEX_CHECK", 60))
+SEARCH_INDEX_TTL    = 7 * 86400
+SEARCH_LIMIT        = 20
+SEARCH_POSTER_PAGES = 5      # halaman ongoing/completed yang dibaca untuk poster
+_search_indexes    = {}      # source -> {"index", "version", "checked"}
+_search_lock       = threading.Lock()
+_search_building   = set()
+
+def _search_keys(source):
+    return f"animeku:{source}:search:docs", f"animeku:{source}:search:version"
+
+def _catalogue_entries(source):
+    """Katalog lengkap source → [{"slug", "title", "poster"?, "type"?}]. None kalau gagal."""
+    path, params, _, ttl = endpoint("catalogue", source)
+    items = get_provider(source).normalizer("catalogue")(fetch(path, params, source=source, ttl=ttl))
+    if items is None:
+        return None
+    entries = []
+    for a in items:
+        slug = a.get("slug") or a.get("animeId")
+        if not slug or not a.get("title"):
+            continue
+        e = {"slug": slug, "title": a["title"]}
+        for field in ("poster", "type"):
+            if a.get(field):
+                e[field] = a[field]
+        entries.append(e)
+    return entries
+
+def _collect_posters(data, found):
+    """slug → poster dari view apa pun (list anime bersarang di dict/list)."""
+    if isinstance(data, dict):
+        if data.get("slug") and data.get("poster"):
+            found.setdefault(data["slug"], data["poster"])
+        for v in data.values():
+            _collect_posters(v, found)
+    elif isinstance(data, list):
+        for v in data:
+            _collect_posters(v, found)
+    return found
+
+def _cached_posters(source):
+    """Poster dari view list source yang sudah ada di cache (1 MGET, tanpa upstream)."""
+    plan, _, _ = _warm_plan(source, SEARCH_POSTER_PAGES)
+    prefetch_tiered(redis, [_view_key(source, *e[:3]) for e in plan])
+    found = {}
+    for e in plan:
+        _collect_posters(peek_view(*e, source=source), found)
+    return found
+
+def rebuild_search_index(source):
+    """Perbarui docs index di Redis dari katalog terbaru (incremental). Return ringkasan."""
+    docs_key, version_key = _search_keys(source)
+    entries = _catalogue_entries(source)
+    if not entries:
+        return {"ok": False, "error": "katalog kosong / upstream gagal"}
+    old     = {e["slug"]: e for e in (get_tiered(redis, docs_key, SEARCH_INDEX_TTL, skip_l1=True) or [])}
+    posters = _cached_posters(source)
+    for e in entries:
+        poster = e.get("poster") or posters.get(e["slug"]) or old.get(e["slug"], {}).get("poster")
+        if poster:
+            e["poster"] = poster
+    new     = {e["slug"]: e for e in entries}
+    added   = [s for s in new if s not in old]
+    removed = [s for s in old if s not in new]
+    updated = [s for s in new if s in old and old[s] != new[s]]
+    if not (added or removed or updated):
+        return {"ok": True, "changed": False, "total": len(new)}
+    set_tiered(redis, docs_key, entries, SEARCH_INDEX_TTL)
+    version = redis.incr(version_key)
+    return {"ok": True, "changed": True, "version": int(version), "total": len(new),
+            "added": len(added), "removed": len(removed), "updated": len(updated)}
+
+def _build_in_background(source):
+    """Index belum pernah dibangun → bangun sekali di background, request ini pakai upstream."""
+    with _search_lock:
+        if source in _search_building:
+            return
+        _search_building.add(source)
+
+    def run():
+        try:
+            print(f"[search] build index {source}: {rebuild_search_index(source)}")
+        except Exception as e:
+            print(f"[search] build index {source} error: {e}")
+        finally:
+            with _search_lock:
+                _search_building.discard(source)
+
+    threading.Thread(target=run, name=f"search-index-{source}", daemon=True).start()
+
+def search_index_for(source):
+    """Index in-process untuk source, disinkronkan ke versi di Redis. None kalau belum ada."""
+    now   = time.monotonic()
+    state = _search_indexes.get(source)
+    if state and now - state["checked"] < SEARCH_INDEX_CHECK:
+        return state["index"]
+
+    docs_key, version_key = _search_keys(source)
+    try:
+        version = redis.get(version_key)
+    except Exception as e:
+        print(f"[search] Redis error: {e}")
+        return state["index"] if state else None
+    if version is None:
+        _build_in_background(source)
+        return state["index"] if state else None
+    if state and state["version"] == version:
+        state["checked"] = now
+        return state["index"]
+
+    docs = get_tiered(redis, docs_key, SEARCH_INDEX_TTL, skip_l1=True)
+    if not docs:
+        _build_in_background(source)
+        return state["index"] if state else None
+    with _search_lock:
+        state = _search_indexes.get(source)
+        if state and state["version"] == version:
+            return state["index"]
+        # Index dibangun ke object baru lalu ditukar → pembaca lain tidak lihat index setengah jadi
+        index = state["index"].copy() if state else SearchIndex()
+        new = {e["slug"] for e in docs}
+        index.remove([s for s in index.docs if s not in new])
+        changed = index.add(docs)
+        stats.incr("search.index_sync")
+        print(f"[search] index {source} v{version}: {len(index)} judul, {changed} berubah")
+        _search_indexes[source] = {"index": index, "version": version, "checked": now}
+    return index
+
+def search_local(source, query, limit=SEARCH_LIMIT):
+    """{"animes", "complete"} dari index lokal, atau None kalau harus fallback ke upstream.
+
+    complete hanya untuk hasil persis/prefix yang tidak terpotong limit maupun
+    MAX_EXPAND; hasil typo cuma perkiraan, jadi client tidak boleh menyaring
+    query berikutnya dari situ.
+    """
+    if len(query.strip()) < 2:
+        return None
+    index = search_index_for(source)
+    if index is None:
+        stats.incr("search.no_index")
+        return None
+    hits, fuzzy, truncated = index.match(query, limit)
+    stats.incr("search.local" if hits else "search.local_empty")
+    if not hits:
+        return None
+    return {"animes": hits, "complete": not (fuzzy or truncated) and len(hits) < limit}
+
+# Hasil upstream yang lengkap (tidak terpotong di SEARCH_PAGE_SIZE) disimpan per
+# prefix; query yang lebih panjang cukup difilter dari situ ("naru" → "naruto").
+SEARCH_PAGE_SIZE = int(os.environ.get("SEARCH_PAGE_SIZE", 20))
+_search_prefix   = LRUCache(max_bytes=int(os.environ.get("SEARCH_PREFIX_CACHE_BYTES", 4 * 1024 * 1024)))
+
+def _title_matches(tokens, title):
+    """Semantik SearchIndex: tiap token query = prefix salah satu token judul."""
+    words = tokenize_title(title)
+    return all(any(w.startswith(t) for w in words) for t in tokens)
+
+def _search_prefix_hits(source, query):
+    q      = normalize_title(query).strip()
+    tokens = tokenize_title(q)
+    if not tokens:
+        return []
+    for n in range(len(q) - 1, 1, -1):
+        animes = _search_prefix.get(f"{source}:{q[:n]}")
+        if animes is None:
+            continue
+        # prefix terpanjang kosong → bisa jadi typo, tanya upstream
+        return [a for a in animes if _title_matches(tokens, a.get("title", ""))]
+    return []
+
+def _search_prefix_lookup(source, query):
+    hits = _search_prefix_hits(source, query)
+    if hits:
+        stats.incr("search.prefix_hit")
+        return {"animes": hits, "complete": True}
+    return None
+
+def search_needs_upstream(source, query):
+    """True kalau api_search() akan bertanya ke upstream (tanpa menaikkan counter)."""
+    index = search_index_for(source) if len(query.strip()) >= 2 else None
+    if index is not None and index.search(query, SEARCH_LIMIT):
+        return False
+    return not _search_prefix_hits(source, query)
+
+def _search_prefix_store(source, query, data):
+    animes = (data or {}).get("animes") or []
+    if 0 < len(animes) < SEARCH_PAGE_SIZE:
+        key = f"{source}:{normalize_title(query).strip()}"
+        _search_prefix.set(key, animes, CACHE_TTL["search"], len(json.dumps(animes)))
+
+@app.route("/api/cron/search-index", methods=["GET", "POST"])
+def cron_search_index():
+    """
+    Endpoint untuk cron-job.org — perbarui index pencarian dari katalog animelist.
+    Query: sources (comma separated). Amankan dengan CRON_SECRET di env var.
+    """
+    cron_secret = os.environ.get("CRON_SECRET", "")
+    req_secret = request.headers.get("X-Cron-Secret", "") or request.args.get("secret", "")
+    if cron_secret and req_secret != cron_secret:
+        return jsonify({"error": "Unauthorized"}), 401
+    sources = [x for x in request.args.get("sources", "").split(",") if x in SOURCES] or list(SOURCES)
+    return jsonify({src: rebuild_search_index(src) for src in sources})
+
+@app.cli.command("search-index")
+@click.option("--source", "sources", multiple=True, type=click.Choice(list(SOURCES)), help="Batasi source (bisa diulang).")
+def search_index_command(sources):
+    """Perbarui index pencarian dari katalog animelist semua source."""
+    print(json.dumps({src: rebuild_search_index(src) for src in (sources or SOURCES)}, indent=2))
+
+
 # ── API Proxy ──────────────────────────────────────────────────────────────────
 
 @app.route("/api/search/<keyword>")
+@failover
 def api_search(keyword):
     source = get_active_source()
-    pfx    = SOURCES[source]["prefix"]
-    data   = None
-    if source == "animasu":
-        raw  = fetch(f"{pfx}/search/{keyword}")
-        data = animasu_norm_search(raw)
-    elif source == "otakudesu":
-        raw  = fetch(f"{pfx}/search/{keyword}")
-        data = otakudesu_norm_search(raw)
-    else:
-        raw  = fetch(f"{pfx}/search", {"q": keyword})
-        if raw and raw.get("data"):
-            data = {"animes": norm_list(raw["data"].get("animeList", []))}
-    return jsonify(data)
+    stats.incr("search.requests")
+    local  = search_local(source, keyword)
+    if local:
+        return json_response(local)
+    cached = _search_prefix_lookup(source, keyword)
+    if cached:
+        return json_response(cached)
+    stats.incr("search.upstream")
+    data = primary_data(fetch_view(*endpoint("search", source, q=keyword)))
+    if data:
+        # salinan: objek view bisa jadi milik L1
+        data = {**data, "complete": len(data.get("animes") or []) < SEARCH_PAGE_SIZE}
+        _search_prefix_store(source, keyword, data)
+    return json_response(data)
 
 
 # ── Endpoint Switcher API ──────────────────────────────────────────────────────
@@ -1176,7 +2161,7 @@ def api_get_source():
     return jsonify({
         "active": active,
         "label":  SOURCES[active]["label"],
-        "sources": [{"key": k, "label": v["label"]} for k, v in SOURCES.items()]
+        "sources": [{"key": k, "label": v["label"], "healthy": breaker(k).healthy()} for k, v in SOURCES.items()]
     })
 
 @app.route("/api/source/switch", methods=["POST"])
@@ -1190,27 +2175,14 @@ def api_switch_source():
     # Simpan ke cookie browser user (30 hari) — tidak butuh session/Redis
     resp = jsonify({"ok": True, "active": source, "label": SOURCES[source]["label"]})
     resp.set_cookie("active_source", source, max_age=30*24*3600, samesite="Lax")
+    resp.delete_cookie(FAILOVER_COOKIE)     # pilihan user menggantikan source failover
 
     # Kalau admin → juga update Redis global sebagai default semua user
     user = session.get("user")
-    ADMIN_IDS = ["1a2c72de-e85c-4430-8e27-8c1c1fd0b8f1"]
-    try:
-        r_cfg = requests.get(
-            f"{SUPABASE_URL}/rest/v1/site_config",
-            headers=supabase_service_headers(),
-            params={"key": "eq.admin_ids", "select": "value"}
-        )
-        if r_cfg.ok and r_cfg.json():
-            val = r_cfg.json()[0].get("value")
-            if val:
-                ADMIN_IDS = val if isinstance(val, list) else val.get("ids", ADMIN_IDS)
-    except Exception:
-        pass
-
-    if user and user.get("id") in ADMIN_IDS:
+    if user and user.get("id") in admin_ids(["1a2c72de-e85c-4430-8e27-8c1c1fd0b8f1"]):
         # Admin: update Supabase site_config sebagai default global semua user
         try:
-            requests.post(
+            http_client.post(
                 f"{SUPABASE_URL}/rest/v1/site_config",
                 headers={**supabase_service_headers(), "Prefer": "resolution=merge-duplicates"},
                 json={"key": "active_source", "value": source},
@@ -1223,6 +2195,8 @@ def api_switch_source():
             redis.set("animeku:active_source", source, ex=86400 * 365)
         except Exception:
             pass
+        _set_global_source(source)
+        invalidate_site_config()
 
     return resp
 
@@ -1265,59 +2239,221 @@ def api_me():
 
 FREE_EPISODE_COUNT = 2  # Episode 1 & 2 gratis
 
-@app.route("/api/premium/status")
-def premium_status():
-    """Cek apakah user yang sedang login punya akses premium."""
-    from datetime import datetime, timezone
+# Row user_premium per user di-cache: L1 (per proses, singkat) → Redis → Supabase.
+# TTL di Redis tidak pernah melewati expires_at, dan setiap jalur yang menulis
+# user_premium wajib memanggil invalidate_user_perks(). L1 instance lain bisa
+# tertinggal paling lama PERKS_L1_TTL detik.
+PERKS_CACHE_TTL = int(os.environ.get("PERKS_CACHE_TTL", 300))
+PERKS_L1_TTL    = int(os.environ.get("PERKS_L1_TTL", 15))
+PERKS_BATCH_MAX = 100
+_perks_l1       = LRUCache(max_bytes=int(os.environ.get("PERKS_CACHE_MAX_BYTES", 1024 * 1024)))
+_UUID_RE        = re.compile(r"^[0-9a-fA-F-]{36}$")
+
+def _perks_key(user_id):
+    return f"animeku:perks:{user_id}"
+
+def _parse_expiry(exp_str):
+    """expires_at → datetime, None kalau kosong / tidak bisa di-parse."""
+    if not exp_str:
+        return None
+    try:
+        return datetime.fromisoformat(exp_str.replace("Z", "+00:00"))
+    except Exception:
+        return None
 
-    # Ambil user_id: coba dari Authorization header dulu, fallback ke session
-    user_id = None
+def _perks_ttl(row):
+    """TTL cache untuk satu row: dipotong sampai expires_at kalau premium masih jalan."""
+    ttl = PERKS_CACHE_TTL
+    exp = _parse_expiry(row.get("expires_at"))
+    if row.get("is_active") and exp:
+        try:
+            left = int((exp - datetime.now(timezone.utc)).total_seconds())
+        except TypeError:
+            return ttl
+        if 0 < left < ttl:
+            ttl = left
+    return ttl
+
+def _cache_premium_row(user_id, row):
+    ttl = _perks_ttl(row)
+    raw = json.dumps(row, separators=(",", ":"))
+    _perks_l1.set(user_id, row, min(ttl, PERKS_L1_TTL), len(user_id) + len(raw))
+    try:
+        redis.set(_perks_key(user_id), raw, ex=ttl)
+    except Exception as e:
+        print(f"Perks cache set error: {e}")
+
+def _premium_query(user_ids):
+    return dict(url=f"{SUPABASE_URL}/rest/v1/user_premium", headers=supabase_service_headers(),
+                params={"user_id": f"in.({','.join(user_ids)})",
+                        "select": "user_id,is_active,expires_at,noads_active"})
+
+def _fetch_premium_rows(user_ids):
+    """Satu query untuk banyak user. None kalau Supabase gagal (jangan di-cache)."""
+    try:
+        r = http_client.get(**_premium_query(user_ids))
+        if not r.ok:
+            return None
+        return {row.pop("user_id"): row for row in r.json()}
+    except Exception as e:
+        print(f"Perks fetch error: {e}")
+        return None
+
+def _premium_rows(user_ids):
+    """Row user_premium (tanpa user_id) per user; {} kalau user tidak punya row.
+
+    L1 → Redis (satu MGET) → satu query Supabase untuk sisanya.
+    """
+    rows, missing = {}, []
+    for uid in dict.fromkeys(u for u in user_ids if u):
+        row = _perks_l1.get(uid)
+        if row is None:
+            missing.append(uid)
+        else:
+            stats.incr("perks.l1_hit")
+            rows[uid] = row
+    if not missing:
+        return rows
+
+    try:
+        cached = redis.mget(*[_perks_key(u) for u in missing])
+    except Exception:
+        cached = [None] * len(missing)
+    to_load = _premium_rows_from_redis(missing, cached, rows)
+    if to_load:
+        stats.incr("perks.load")
+        _premium_rows_loaded(to_load, _fetch_premium_rows(to_load), rows)
+    return rows
+
+def _premium_rows_from_redis(user_ids, cached, rows):
+    """Isi `rows` dari hasil MGET Redis; return user_id yang belum ada di cache."""
+    to_load = []
+    for uid, raw in zip(user_ids, cached):
+        try:
+            row = json.loads(raw) if raw else None
+        except Exception:
+            row = None
+        if row is None:
+            to_load.append(uid)
+            continue
+        stats.incr("perks.redis_hit")
+        rows[uid] = row
+        _perks_l1.set(uid, row, PERKS_L1_TTL, len(uid) + len(raw))
+    return to_load
+
+def _premium_rows_loaded(user_ids, fetched, rows):
+    for uid in user_ids:
+        if fetched is None:
+            rows[uid] = {}
+            continue
+        rows[uid] = fetched.get(uid, {})
+        _cache_premium_row(uid, rows[uid])
+
+async def aprime_premium_rows(user_ids):
+    """Versi async _premium_rows() untuk asgi.py: query Supabase ditunggu di event loop."""
+    missing = [u for u in dict.fromkeys(u for u in user_ids if u) if _perks_l1.get(u) is None]
+    if not missing:
+        return
+    try:
+        cached = await asyncio.to_thread(redis.mget, *[_perks_key(u) for u in missing])
+    except Exception:
+        cached = [None] * len(missing)
+    to_load = _premium_rows_from_redis(missing, cached, {})
+    if not to_load:
+        return
+    stats.incr("perks.load")
+    fetched = None
+    try:
+        r = await http_client.aget(**_premium_query(to_load))
+        if r.ok:
+            fetched = {row.pop("user_id"): row for row in r.json()}
+    except Exception as e:
+        print(f"Perks fetch error: {e}")
+    await asyncio.to_thread(_premium_rows_loaded, to_load, fetched, {})
+
+def _perks_from_row(row):
+    noads   = bool(row.get("noads_active", False))
+    exp_str = row.get("expires_at")
+    prem    = False
+    if row.get("is_active"):
+        exp = _parse_expiry(exp_str)
+        try:
+            prem = exp is None or exp > datetime.now(timezone.utc)
+        except TypeError:
+            prem = True
+    return {"noads": noads, "premium": prem, "expires_at": exp_str}
+
+def invalidate_user_perks(*user_ids):
+    """Hapus cache perks (L1 lokal + Redis). Panggil setelah menulis user_premium."""
+    user_ids = [u for u in user_ids if u]
+    if not user_ids:
+        return
+    for uid in user_ids:
+        _perks_l1.delete(uid)
+    stats.incr("perks.invalidate", len(user_ids))
+    try:
+        redis.delete(*[_perks_key(u) for u in user_ids])
+    except Exception as e:
+        print(f"Perks cache invalidate error: {e}")
+
+def premium_user_id():
+    """user_id dari Authorization header, fallback ke session (login server-side)."""
     auth_header = request.headers.get("Authorization", "")
     access_token = auth_header.replace("Bearer ", "").strip() if auth_header else ""
-
     if access_token:
-        # Verifikasi token ke Supabase untuk dapat user_id
-        r_user = requests.get(
-            f"{SUPABASE_URL}/auth/v1/user",
-            headers=supabase_headers(access_token)
-        )
-        if r_user.ok:
-            user_id = r_user.json().get("id")
-
-    # Fallback ke session (untuk login server-side)
-    if not user_id:
-        user = session.get("user")
-        if not user:
-            return jsonify({"premium": False, "reason": "not_logged_in"})
-        user_id = user.get("id")
+        # Verifikasi token (lokal / cache, fallback ke Supabase) untuk dapat user_id
+        token_user = verify_access_token(access_token)
+        if token_user:
+            return token_user["id"]
+    return (session.get("user") or {}).get("id")
 
+@app.route("/api/premium/status")
+def premium_status():
+    """Cek apakah user yang sedang login punya akses premium."""
+    user_id = premium_user_id()
     if not user_id:
         return jsonify({"premium": False, "reason": "not_logged_in"})
 
-    # Pakai service key agar tidak kena RLS
-    r = requests.get(
-        f"{SUPABASE_URL}/rest/v1/user_premium",
-        headers=supabase_service_headers(),
-        params={"user_id": f"eq.{user_id}", "select": "is_active,noads_active,expires_at"}
-    )
-    if r.ok and r.json():
-        row = r.json()[0]
-        expires_at = row.get("expires_at")
-        if row.get("noads_active"):
+    row = _premium_rows([user_id]).get(user_id) or {}
+    expires_at = row.get("expires_at")
+    if row.get("noads_active"):
+        return jsonify({"premium": True})
+    if row.get("is_active"):
+        exp = _parse_expiry(expires_at)
+        if exp is None:
             return jsonify({"premium": True})
-        if row.get("is_active"):
-            if not expires_at:
-                return jsonify({"premium": True})
-            try:
-                exp = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
-                if exp > datetime.now(timezone.utc):
-                    return jsonify({"premium": True, "expires_at": expires_at})
-                else:
-                    return jsonify({"premium": False, "reason": "expired"})
-            except Exception:
-                return jsonify({"premium": True})
+        if exp > datetime.now(timezone.utc):
+            return jsonify({"premium": True, "expires_at": expires_at})
+        return jsonify({"premium": False, "reason": "expired"})
     return jsonify({"premium": False, "reason": "no_subscription"})
 
+def perks_request_ids():
+    if request.method == "POST":
+        ids = (request.get_json(silent=True) or {}).get("user_ids") or []
+    else:
+        ids = request.args.get("ids", "").split(",")
+    return [i.strip() for i in ids if isinstance(i, str) and _UUID_RE.match(i.strip())]
+
+@app.route("/api/premium/perks", methods=["GET", "POST"])
+def premium_perks_batch():
+    """Perks banyak user sekaligus (satu query). ?ids=a,b,c atau JSON {"user_ids": [...]}.
+
+    expires_at hanya dikirim ke admin.
+    """
+    ids = perks_request_ids()
+    if len(ids) > PERKS_BATCH_MAX:
+        return jsonify({"error": f"Maksimal {PERKS_BATCH_MAX} user per request"}), 400
+
+    auth_header = request.headers.get("Authorization", "")
+    is_admin = bool(auth_header) and _is_admin(auth_header.replace("Bearer ", "").strip())
+    perks = {}
+    for uid, row in _premium_rows(ids).items():
+        p = _perks_from_row(row)
+        if not is_admin:
+            p.pop("expires_at")
+        perks[uid] = p
+    return jsonify({"perks": perks})
+
 @app.route("/api/premium/grant", methods=["POST"])
 def premium_grant():
     """Admin grant/revoke premium untuk user tertentu."""
@@ -1329,44 +2465,30 @@ def premium_grant():
     action = data.get("action", "grant")  # grant / revoke
     expires_at = data.get("expires_at")  # optional ISO string
 
-    # Cek admin
-    ADMIN_IDS = [
-        "1a2c72de-e85c-4430-8e27-8c1c1fd0b8f1",
-    ]
-    r_user = requests.get(f"{SUPABASE_URL}/auth/v1/user",
-                          headers=supabase_headers(session.get("access_token")))
-    if not r_user.ok:
+    if not verify_access_token(session.get("access_token")):
         return jsonify({"error": "Unauthorized"}), 401
 
     # Cek admin dari site_config
-    cfg = requests.get(f"{SUPABASE_URL}/rest/v1/site_config",
-                       headers=supabase_headers(),
-                       params={"key": "eq.admin_ids", "select": "value"})
-    if cfg.ok and cfg.json():
-        try:
-            val = cfg.json()[0]["value"]
-            ADMIN_IDS = val if isinstance(val, list) else val.get("ids", ADMIN_IDS)
-        except Exception:
-            pass
-    if user.get("id") not in ADMIN_IDS:
+    if user.get("id") not in admin_ids(["1a2c72de-e85c-4430-8e27-8c1c1fd0b8f1"]):
         return jsonify({"error": "Forbidden"}), 403
 
     if action == "grant":
         payload = {"user_id": target_user_id, "is_active": True}
         if expires_at:
             payload["expires_at"] = expires_at
-        r = requests.post(
+        r = http_client.post(
             f"{SUPABASE_URL}/rest/v1/user_premium",
             headers={**supabase_headers(), "Prefer": "resolution=merge-duplicates,return=representation"},
             json=payload
         )
     else:  # revoke
-        r = requests.patch(
+        r = http_client.patch(
             f"{SUPABASE_URL}/rest/v1/user_premium",
             headers={**supabase_headers(), "Prefer": "return=representation"},
             params={"user_id": f"eq.{target_user_id}"},
             json={"is_active": False}
         )
+    invalidate_user_perks(target_user_id)
     return jsonify({"ok": r.ok, "detail": r.text})
 
 @app.route("/api/premium/list")
@@ -1375,7 +2497,7 @@ def premium_list():
     user = session.get("user")
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/user_premium",
         headers=supabase_headers(),
         params={"select": "*", "order": "created_at.desc"}
@@ -1385,14 +2507,15 @@ def premium_list():
 
 # ── Comments ───────────────────────────────────────────────────────────────────
 
+def comments_query(anime_slug):
+    """Argumen request Supabase untuk daftar komentar (dipakai juga asgi.py)."""
+    return dict(url=f"{SUPABASE_URL}/rest/v1/anime_comments", headers=supabase_headers(),
+                params={"anime_slug": f"eq.{anime_slug}", "order": "created_at.desc", "select": "*"})
+
 @app.route("/api/comments/<anime_slug>")
 def get_comments(anime_slug):
-    r = requests.get(
-        f"{SUPABASE_URL}/rest/v1/anime_comments",
-        headers=supabase_headers(),
-        params={"anime_slug": f"eq.{anime_slug}", "order": "created_at.desc", "select": "*"}
-    )
-    return jsonify(r.json() if r.ok else [])
+    r = http_client.get(**comments_query(anime_slug))
+    return json_response(r.json() if r.ok else [])
 
 @app.route("/api/comments", methods=["POST"])
 def post_comment():
@@ -1400,10 +2523,9 @@ def post_comment():
     access_token = auth_header.replace("Bearer ", "").strip()
     if not access_token:
         return jsonify({"error": "Login dulu ya!"}), 401
-    user_resp = requests.get(f"{SUPABASE_URL}/auth/v1/user", headers=supabase_headers(access_token))
-    if not user_resp.ok:
+    user_data = verify_access_token(access_token)
+    if not user_data:
         return jsonify({"error": "Login dulu ya!"}), 401
-    user_data = user_resp.json()
     user = {
         "id":     user_data.get("id"),
         "name":   user_data.get("user_metadata", {}).get("full_name", "User"),
@@ -1416,7 +2538,7 @@ def post_comment():
         return jsonify({"error": "Komentar terlalu pendek"}), 400
     payload = {"anime_slug": anime_slug, "user_id": user["id"],
                "user_name": user["name"], "user_avatar": user["avatar"], "content": content}
-    r = requests.post(f"{SUPABASE_URL}/rest/v1/anime_comments",
+    r = http_client.post(f"{SUPABASE_URL}/rest/v1/anime_comments",
                       headers={**supabase_headers(access_token), "Prefer": "return=representation"},
                       json=payload)
     if r.ok:
@@ -1429,11 +2551,11 @@ def delete_comment(comment_id):
     access_token = auth_header.replace("Bearer ", "").strip()
     if not access_token:
         return jsonify({"error": "Unauthorized"}), 401
-    user_resp = requests.get(f"{SUPABASE_URL}/auth/v1/user", headers=supabase_headers(access_token))
-    if not user_resp.ok:
+    token_user = verify_access_token(access_token)
+    if not token_user:
         return jsonify({"error": "Unauthorized"}), 401
-    user_id = user_resp.json().get("id")
-    r = requests.delete(f"{SUPABASE_URL}/rest/v1/anime_comments",
+    user_id = token_user["id"]
+    r = http_client.delete(f"{SUPABASE_URL}/rest/v1/anime_comments",
                         headers=supabase_headers(access_token),
                         params={"id": f"eq.{comment_id}", "user_id": f"eq.{user_id}"})
     return jsonify({"ok": r.ok})
@@ -1468,7 +2590,7 @@ def sociabuzz_webhook():
             "message":      message,
             "supporter_id": supporter_id,
         }
-        r = requests.post(
+        r = http_client.post(
             f"{SUPABASE_URL}/rest/v1/donations",
             headers={**supabase_headers(), "Prefer": "return=representation"},
             json=payload,
@@ -1502,11 +2624,12 @@ def sociabuzz_webhook():
                     "is_active":  True,
                     "expires_at": expires_at,
                 }
-                rp = requests.post(
+                rp = http_client.post(
                     f"{SUPABASE_URL}/rest/v1/user_premium",
                     headers={**supabase_service_headers(), "Prefer": "resolution=merge-duplicates,return=representation"},
                     json=prem_payload,
                 )
+                invalidate_user_perks(premium_user_id)
                 if rp.ok:
                     premium_granted = True
                     print(f"[Sociabuzz] ✅ Premium granted untuk user {premium_user_id} hingga {expires_at}")
@@ -1527,7 +2650,7 @@ def sociabuzz_webhook():
         if message and not premium_granted:
             chat_content += f' 💬 "{message}"'
 
-        r2 = requests.post(
+        r2 = http_client.post(
             f"{SUPABASE_URL}/rest/v1/chat_messages",
             headers={**supabase_headers(), "Prefer": "return=representation"},
             json={
@@ -1564,18 +2687,12 @@ def api_donations():
     # Ambil donation goal dari site_config
     goal = 300000
     try:
-        cfg = requests.get(
-            f"{SUPABASE_URL}/rest/v1/site_config",
-            headers=supabase_headers(),
-            params={"key": "eq.donation_goal", "select": "value"}
-        )
-        if cfg.ok and cfg.json():
-            goal = cfg.json()[0]["value"].get("monthly_target", 300000)
+        goal = (site_config().get("donation_goal") or {}).get("monthly_target", 300000)
     except Exception:
         pass
 
     # Ambil 50 donasi terbaru
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/donations",
         headers=supabase_headers(),
         params={"order": "created_at.desc", "limit": "50", "select": "*"}
@@ -1597,7 +2714,7 @@ def api_donations():
         key=lambda x: x["total"], reverse=True
     )[:5]
 
-    return jsonify({
+    return json_response({
         "donations":      donations[:20],
         "monthly_total":  total,
         "monthly_target": goal,
@@ -1609,34 +2726,10 @@ def api_donations():
 # ── Voucher System ─────────────────────────────────────────────────────────────
 
 def _get_user_perks(user_id):
-    """Ambil status premium + noads user dari Supabase."""
-    empty = {"noads": False, "premium": False, "expires_at": None}
+    """Status premium + noads user (lewat cache perks)."""
     if not user_id:
-        return empty
-    try:
-        r = requests.get(
-            f"{SUPABASE_URL}/rest/v1/user_premium",
-            headers=supabase_service_headers(),
-            params={"user_id": f"eq.{user_id}", "select": "is_active,expires_at,noads_active"}
-        )
-        if not r.ok or not r.json():
-            return empty
-        row     = r.json()[0]
-        noads   = bool(row.get("noads_active", False))
-        exp_str = row.get("expires_at")
-        prem    = False
-        if row.get("is_active"):
-            if not exp_str:
-                prem = True
-            else:
-                try:
-                    exp_dt = datetime.fromisoformat(exp_str.replace("Z", "+00:00"))
-                    prem   = exp_dt > datetime.now(timezone.utc)
-                except Exception:
-                    prem = True
-        return {"noads": noads, "premium": prem, "expires_at": exp_str}
-    except Exception:
-        return empty
+        return {"noads": False, "premium": False, "expires_at": None}
+    return _perks_from_row(_premium_rows([user_id]).get(user_id) or {})
 
 
 @app.route("/premium/redeem", methods=["POST"])
@@ -1647,12 +2740,9 @@ def premium_redeem():
     auth_header = request.headers.get("Authorization", "")
     access_token = auth_header.replace("Bearer ", "").strip() if auth_header else ""
     if access_token:
-        r_user = requests.get(
-            f"{SUPABASE_URL}/auth/v1/user",
-            headers=supabase_headers(access_token)
-        )
-        if r_user.ok:
-            user_id = r_user.json().get("id")
+        token_user = verify_access_token(access_token)
+        if token_user:
+            user_id = token_user["id"]
 
     # 2. Fallback ke Flask session
     if not user_id:
@@ -1671,7 +2761,7 @@ def premium_redeem():
         from datetime import datetime, timezone, timedelta
         now = datetime.now(timezone.utc)
 
-        r_v = requests.get(
+        r_v = http_client.get(
             f"{SUPABASE_URL}/rest/v1/vouchers",
             headers=supabase_service_headers(),
             params={"kode": f"eq.{kode}", "select": "*"}
@@ -1685,7 +2775,7 @@ def premium_redeem():
         tipe        = v.get("tipe", "noads")
         durasi_hari = v.get("durasi_hari") or 30
 
-        r_up     = requests.get(
+        r_up     = http_client.get(
             f"{SUPABASE_URL}/rest/v1/user_premium",
             headers=supabase_service_headers(),
             params={"user_id": f"eq.{user_id}", "select": "*"}
@@ -1712,7 +2802,7 @@ def premium_redeem():
             result_extra = {"tipe": "premium", "expires_at": new_exp[:10]}
 
         if existing:
-            requests.patch(
+            http_client.patch(
                 f"{SUPABASE_URL}/rest/v1/user_premium",
                 headers={**supabase_service_headers(), "Prefer": "return=representation"},
                 params={"user_id": f"eq.{user_id}"},
@@ -1720,13 +2810,14 @@ def premium_redeem():
             )
         else:
             upsert_data["user_id"] = user_id
-            requests.post(
+            http_client.post(
                 f"{SUPABASE_URL}/rest/v1/user_premium",
                 headers={**supabase_service_headers(), "Prefer": "return=representation"},
                 json=upsert_data
             )
+        invalidate_user_perks(user_id)
 
-        requests.patch(
+        http_client.patch(
             f"{SUPABASE_URL}/rest/v1/vouchers",
             headers={**supabase_service_headers(), "Prefer": "return=representation"},
             params={"id": f"eq.{v['id']}"},
@@ -1756,7 +2847,7 @@ def api_vouchers():
     access_token = request.headers.get("Authorization", "").replace("Bearer ", "").strip()
     if not _is_admin(access_token):
         return jsonify({"error": "Forbidden"}), 403
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/vouchers",
         headers=supabase_service_headers(),
         params={"order": "created_at.desc", "select": "*"}
@@ -1780,7 +2871,7 @@ def admin_voucher_generate():
     generated = []
     for _ in range(jumlah):
         kode = prefix + "-" + "".join(secrets.choice(alpha) for _ in range(8))
-        r = requests.post(
+        r = http_client.post(
             f"{SUPABASE_URL}/rest/v1/vouchers",
             headers={**supabase_service_headers(), "Prefer": "return=representation"},
             json={"kode": kode, "tipe": tipe, "durasi_hari": durasi_hari, "used": False}
@@ -1796,7 +2887,7 @@ def admin_voucher_delete(vid):
     access_token = session.get("access_token", "") or request.headers.get("Authorization", "").replace("Bearer ", "").strip()
     if not _is_admin(access_token):
         return jsonify({"error": "Forbidden"}), 403
-    requests.delete(
+    http_client.delete(
         f"{SUPABASE_URL}/rest/v1/vouchers",
         headers=supabase_service_headers(),
         params={"id": f"eq.{vid}"}
@@ -1810,21 +2901,11 @@ def _is_admin(access_token):
     """Cek apakah token milik admin."""
     if not access_token:
         return False
-    ADMIN_IDS = ["c5ec3983-dbec-4e23-b6f6-2196fb4d5265"]
-    # Cek dari site_config dulu
-    try:
-        cfg = requests.get(f"{SUPABASE_URL}/rest/v1/site_config",
-                           headers=supabase_headers(),
-                           params={"key": "eq.admin_ids", "select": "value"})
-        if cfg.ok and cfg.json():
-            val = cfg.json()[0]["value"]
-            ADMIN_IDS = val if isinstance(val, list) else val.get("ids", ADMIN_IDS)
-    except Exception:
-        pass
-    user_resp = requests.get(f"{SUPABASE_URL}/auth/v1/user", headers=supabase_headers(access_token))
-    if not user_resp.ok:
+    token_user = verify_access_token(access_token)
+    if not token_user:
         return False
-    return user_resp.json().get("id") in ADMIN_IDS
+    # Cek dari site_config (snapshot)
+    return token_user["id"] in admin_ids(["c5ec3983-dbec-4e23-b6f6-2196fb4d5265"])
 
 @app.route("/api/admin/users")
 def admin_users():
@@ -1838,7 +2919,7 @@ def admin_users():
         return jsonify({"error": "Service key tidak dikonfigurasi"}), 500
 
     # Ambil semua user dari Supabase Auth
-    users_resp = requests.get(
+    users_resp = http_client.get(
         f"{SUPABASE_URL}/auth/v1/admin/users",
         headers=supabase_service_headers(),
         params={"per_page": 200}
@@ -1849,7 +2930,7 @@ def admin_users():
     users_data = users_resp.json().get("users", [])
 
     # Ambil semua data premium
-    prem_resp = requests.get(
+    prem_resp = http_client.get(
         f"{SUPABASE_URL}/rest/v1/user_premium",
         headers=supabase_service_headers(),
         params={"select": "user_id,is_active,expires_at"}
@@ -1921,18 +3002,19 @@ def admin_toggle_premium():
     if action == "grant":
         expires_at = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
         payload = {"user_id": target_id, "is_active": True, "expires_at": expires_at}
-        r = requests.post(
+        r = http_client.post(
             f"{SUPABASE_URL}/rest/v1/user_premium",
             headers={**supabase_service_headers(), "Prefer": "resolution=merge-duplicates,return=representation"},
             json=payload
         )
     else:
-        r = requests.patch(
+        r = http_client.patch(
             f"{SUPABASE_URL}/rest/v1/user_premium",
             headers={**supabase_service_headers(), "Prefer": "return=representation"},
             params={"user_id": f"eq.{target_id}"},
             json={"is_active": False}
         )
+    invalidate_user_perks(target_id)
 
     return jsonify({"ok": r.ok, "detail": r.text})
 
@@ -1952,7 +3034,7 @@ def admin_extend_premium():
     from datetime import datetime, timezone, timedelta
 
     # Cek apakah sudah punya premium aktif — kalau iya, extend dari expires_at
-    existing = requests.get(
+    existing = http_client.get(
         f"{SUPABASE_URL}/rest/v1/user_premium",
         headers=supabase_service_headers(),
         params={"user_id": f"eq.{target_id}", "select": "is_active,expires_at"}
@@ -1971,11 +3053,12 @@ def admin_extend_premium():
 
     expires_at = (base + timedelta(days=days)).isoformat()
     payload = {"user_id": target_id, "is_active": True, "expires_at": expires_at}
-    r = requests.post(
+    r = http_client.post(
         f"{SUPABASE_URL}/rest/v1/user_premium",
         headers={**supabase_service_headers(), "Prefer": "resolution=merge-duplicates,return=representation"},
         json=payload
     )
+    invalidate_user_perks(target_id)
     return jsonify({"ok": r.ok, "expires_at": expires_at, "days_added": days})
 
 
@@ -1998,7 +3081,7 @@ def cron_premium_reminder():
     in_3_days = now + timedelta(days=3)
 
     # Ambil semua premium yang aktif dan expired dalam 3 hari
-    r = requests.get(
+    r = http_client.get(
         f"{SUPABASE_URL}/rest/v1/user_premium",
         headers=supabase_service_headers(),
         params={
@@ -2031,7 +3114,7 @@ def cron_premium_reminder():
 
             # Cek apakah sudah pernah dinotif hari ini (simpan di notif_sent table)
             notif_key = f"{uid}:{exp_dt.strftime('%Y-%m-%d')}"
-            check = requests.get(
+            check = http_client.get(
                 f"{SUPABASE_URL}/rest/v1/notif_sent",
                 headers=supabase_service_headers(),
                 params={"key": f"eq.{notif_key}", "select": "key"}
@@ -2040,7 +3123,7 @@ def cron_premium_reminder():
                 continue  # sudah dinotif, skip
 
             # Ambil info user
-            user_resp = requests.get(
+            user_resp = http_client.get(
                 f"{SUPABASE_URL}/auth/v1/admin/users/{uid}",
                 headers=supabase_service_headers()
             )
@@ -2051,7 +3134,7 @@ def cron_premium_reminder():
 
             # Kirim notif ke live chat
             msg = f"⏰ Reminder: Premium @{user_name} akan berakhir dalam {time_label}! Perpanjang sebelum akses terkunci."
-            requests.post(
+            http_client.post(
                 f"{SUPABASE_URL}/rest/v1/chat_messages",
                 headers={**supabase_service_headers(), "Prefer": "return=representation"},
                 json={
@@ -2066,7 +3149,7 @@ def cron_premium_reminder():
             )
 
             # Catat sudah dinotif
-            requests.post(
+            http_client.post(
                 f"{SUPABASE_URL}/rest/v1/notif_sent",
                 headers={**supabase_service_headers(), "Prefer": "resolution=merge-duplicates"},
                 json={"key": notif_key, "sent_at": now.isoformat()}
@@ -2087,6 +3170,117 @@ def cron_premium_reminder():
 
 
 
+# ── Cache warmer ───────────────────────────────────────────────────────────────
+# Isi cache Redis untuk path populer semua source, supaya setelah flush / TTL
+# habis user tidak kena cold fetch. Jalankan via cron endpoint atau CLI:
+#     flask --app app warm-cache --pages 2
+
+WARM_CONCURRENCY = int(os.environ.get("WARM_CONCURRENCY", 4))
+WARM_RATE        = float(os.environ.get("WARM_RATE", 5))    # max request per detik ke upstream
+
+class _RateLimiter:
+    """Batasi laju call (rate per detik) dari beberapa thread sekaligus."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._next    = 0.0
+        self._lock    = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now        = time.monotonic()
+            at         = max(now, self._next)
+            self._next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+def _warm_plan(source, pages):
+    """(list entry, fungsi detail) yang di-warm untuk satu source — sama dengan route."""
+    p       = get_provider(source)
+    entries = [p.request(name) for name in (*p.batch["home"], "genres")]
+    entries.append(p.request("catalogue", normalize=partial(animelist_letters, source=source)))
+    lists   = [p.request(name, page=n) for name in ("ongoing", "completed") for n in range(1, pages + 1)]
+    return entries + lists, len(entries), lambda slug: p.request("detail", slug=slug)
+
+def warm_cache(sources=None, pages=1, details=True):
+    """Warm cache view + raw untuk tiap source. Return ringkasan hasil."""
+    started = time.time()
+    limiter = _RateLimiter(WARM_RATE)
+    report  = {}
+
+    def warm_one(source, entry):
+        """(data, jumlah key yang ditulis). Hanya fetch ke upstream yang kena rate limit."""
+        view_key = _view_key(source, *entry[:3])
+        raw_key  = _raw_key(source, *entry[:2])
+        if l1_fresh(view_key):
+            return fetch_view(*entry, source=source), 0
+        # View basi/miss tapi raw JSON masih fresh → cukup normalize ulang.
+        # fresh=True: entry basi tidak disajikan sambil di-refresh di
+        # _refresh_pool (di luar limiter), tapi di-load di sini, di belakang wait()
+        raw_cached = l1_fresh(raw_key)
+        if not raw_cached:
+            limiter.wait()
+        data = fetch_view(*entry, source=source, fresh=True)
+        # Hitung key yang benar-benar ditulis ulang, bukan yang diperkirakan
+        written = l1_fresh(view_key) + (not raw_cached and l1_fresh(raw_key))
+        return data, written
+
+    def warm_batch(pool, source, plan):
+        # Entry yang masih fresh di Redis cukup dibaca (1 MGET), tidak ke upstream;
+        # raw JSON hanya dibaca untuk entry yang view-nya perlu dibuat ulang
+        prefetch_tiered(redis, [_view_key(source, *e[:3]) for e in plan])
+        todo = [e for e in plan if not l1_fresh(_view_key(source, *e[:3]))]
+        prefetch_tiered(redis, [_raw_key(source, *e[:2]) for e in todo])
+        return list(pool.map(lambda e: warm_one(source, e), plan))
+
+    with ThreadPoolExecutor(max_workers=WARM_CONCURRENCY, thread_name_prefix="warm") as pool:
+        for source in (sources or SOURCES):
+            plan, n_fixed, detail = _warm_plan(source, pages)
+            results = warm_batch(pool, source, plan)
+            if details:
+                # Detail anime untuk semua slug di halaman ongoing/completed
+                slugs = {a["slug"] for res, _ in results[n_fixed:] if res
+                         for a in res.get("animes", []) if a.get("slug")}
+                results += warm_batch(pool, source, [detail(slug) for slug in sorted(slugs)])
+            ok = sum(1 for res, _ in results if res is not None)
+            report[source] = {"warmed": ok, "failed": len(results) - ok,
+                              "loaded": sum(1 for _, keys in results if keys),
+                              "keys":   sum(keys for _, keys in results)}
+
+    return {
+        "ok":      True,
+        "seconds": round(time.time() - started, 2),
+        # key view + raw JSON yang benar-benar ditulis (bukan yang sudah ada di cache)
+        "keys":    sum(r["keys"] for r in report.values()),
+        "sources": report,
+    }
+
+@app.route("/api/cron/warm-cache", methods=["GET", "POST"])
+def cron_warm_cache():
+    """
+    Endpoint untuk cron-job.org — pre-populate cache Redis semua source.
+    Query: pages (default 1), sources (comma separated), details (1/0).
+    Amankan dengan CRON_SECRET di env var.
+    """
+    cron_secret = os.environ.get("CRON_SECRET", "")
+    req_secret = request.headers.get("X-Cron-Secret", "") or request.args.get("secret", "")
+    if cron_secret and req_secret != cron_secret:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    pages   = max(1, min(request.args.get("pages", 1, type=int), 10))
+    sources = [x for x in request.args.get("sources", "").split(",") if x in SOURCES] or None
+    details = request.args.get("details", "1") != "0"
+    return jsonify(warm_cache(sources, pages, details))
+
+@app.cli.command("warm-cache")
+@click.option("--pages", default=2, show_default=True, help="Jumlah halaman ongoing/completed per source.")
+@click.option("--source", "sources", multiple=True, type=click.Choice(list(SOURCES)), help="Batasi source (bisa diulang).")
+@click.option("--no-details", is_flag=True, help="Jangan warm halaman detail anime.")
+def warm_cache_command(pages, sources, no_details):
+    """Pre-populate cache Redis untuk path populer semua source."""
+    print(json.dumps(warm_cache(list(sources) or None, pages, not no_details), indent=2))
+
+
 @app.route("/debug2")
 def debug2():
     import traceback
@@ -2165,6 +3359,7 @@ def debug():
 # ═══════════════════════════════════════════════════════
 TRAKTEER_API_KEY = os.environ.get("TRAKTEER_API_KEY", "")
 TRAKTEER_BASE    = "https://api.trakteer.id/v1/public"
+http_client.configure_host(TRAKTEER_BASE, timeout=8, pool_maxsize=2)
 
 def fetch_trakteer(endpoint, params=None):
     """Fetch dari Trakteer API dengan cache Redis 5 menit."""
@@ -2182,7 +3377,7 @@ def fetch_trakteer(endpoint, params=None):
             "Accept": "application/json",
             "X-Requested-With": "XMLHttpRequest",
         }
-        r = requests.get(f"{TRAKTEER_BASE}/{endpoint}", headers=headers, params=params, timeout=8)
+        r = http_client.get(f"{TRAKTEER_BASE}/{endpoint}", headers=headers, params=params, timeout=8)
         data = r.json()
         try:
             redis.set(cache_key, json.dumps(data), ex=300)  # cache 5 menit
@@ -2219,7 +3414,7 @@ def trakteer_debug():
         ]
         for i, params in enumerate(test_params):
             try:
-                r = requests.get(f"{TRAKTEER_BASE}/transactions", headers=headers, params=params, timeout=5)
+                r = http_client.get(f"{TRAKTEER_BASE}/transactions", headers=headers, params=params, timeout=5)
                 body = r.json()
                 results[f"try_{i}_{params}"] = {
                     "status": r.status_code,
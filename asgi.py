@@ -0,0 +1,249 @@
+"""
+asgi.py
+=======
+Entry point ASGI untuk Animeku:
+
+    uvicorn asgi:app --workers 4
+
+Mode WSGI (gunicorn app:app / Vercel) tetap jalan seperti biasa; file ini
+hanya menambah cara serving kedua untuk app Flask yang sama.
+
+- Route panas (home, detail, episode/player, search, premium) punya langkah "warm"
+  async: semua fetch upstream / Supabase yang dibutuhkan view ditunggu di
+  event loop (http_client.aget + cache.acached_fetch, key cache sama persis),
+  lalu view Flask-nya dijalankan di thread pool dan tinggal membaca L1.
+  Menunggu upstream yang lambat tidak lagi menahan thread / worker, sementara
+  page cache, ETag, session dan template tetap satu jalur dengan mode WSGI.
+- GET /api/comments/<slug> dijawab langsung dari event loop.
+- Route lain diteruskan apa adanya ke Flask (WSGI di thread pool ASGI_THREADS).
+
+Kalau langkah warm gagal, view Flask tetap jalan dan fetch sendiri (sync).
+"""
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import request, session
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+
+import app as animeku
+import http_client
+from cache import get_tiered
+
+flask_app    = animeku.app
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 32))
+_wsgi_pool   = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix="asgi-wsgi")
+
+
+# ── Warm (async) per route ─────────────────────────────────────────────────────
+
+def _page_cache_hit(ttl_name):
+    key = animeku.page_cache_key(animeku.get_active_source())    # gen_tag → bisa MGET Redis
+    return get_tiered(animeku.redis, key, animeku.CACHE_TTL[ttl_name]) is not None
+
+
+async def _page_cached(ttl_name):
+    """True kalau halaman anonim ini sudah ada di page cache → tidak perlu warm."""
+    if session.get("user"):
+        return False
+    return await asyncio.to_thread(_page_cache_hit, ttl_name)
+
+
+def _request(name, **kw):
+    """Item fetch endpoint provider aktif, tanpa counter provider.* (dihitung view-nya).
+    Source sudah di-resolve _warm() di thread, jadi di sini hanya baca `g`."""
+    return animeku.get_provider(animeku.get_active_source()).request(name, **kw)
+
+
+async def warm_home():
+    if not await _page_cached("home"):
+        names = animeku.get_provider(animeku.get_active_source()).batch["home"]
+        await animeku.afetch_many(*[_request(name) for name in names])
+
+
+async def warm_detail(slug):
+    if not await _page_cached("anime"):
+        await animeku.afetch_view(*_request("detail", slug=slug))
+
+
+async def warm_episode(slug):
+    anime_slug = request.args.get("anime", "")
+    if anime_slug:
+        await animeku.afetch_many(_request("episode", slug=slug), _request("detail", slug=anime_slug))
+        return
+    data = await animeku.afetch_view(*_request("episode", slug=slug))
+    if data and data.get("anime_id"):
+        await animeku.afetch_view(*_request("detail", slug=data["anime_id"]))
+
+
+async def warm_search():
+    q = request.args.get("q", "")
+    if q:
+        await animeku.afetch_view(*_request("search", q=q))
+
+
+async def warm_api_search(keyword):
+    source = animeku.get_active_source()
+    # Index lokal / prefix cache menjawab tanpa upstream → tidak perlu warm
+    if await asyncio.to_thread(animeku.search_needs_upstream, source, keyword):
+        await animeku.afetch_view(*_request("search", q=keyword))
+
+
+async def warm_premium_status():
+    user_id = await asyncio.to_thread(animeku.premium_user_id)
+    await animeku.aprime_premium_rows([user_id])
+
+
+async def warm_premium_perks():
+    await animeku.aprime_premium_rows(animeku.perks_request_ids()[:animeku.PERKS_BATCH_MAX])
+
+
+async def comments(anime_slug):
+    r = await http_client.aget(**animeku.comments_query(anime_slug))
+    return animeku.json_response(r.json() if r.ok else [])
+
+
+# endpoint = (jenis, fungsi): "warm" → lalu view Flask, "native" → response langsung
+ROUTES = Map([
+    Rule("/home",                      endpoint=("warm", warm_home),           methods=["GET"]),
+    Rule("/anime/<slug>",              endpoint=("warm", warm_detail),         methods=["GET"]),
+    Rule("/episode/<slug>",            endpoint=("warm", warm_episode),        methods=["GET"]),
+    Rule("/api/episode/<slug>/player", endpoint=("warm", warm_episode),        methods=["GET"]),
+    Rule("/search",                    endpoint=("warm", warm_search),         methods=["GET"]),
+    Rule("/api/search/<keyword>",      endpoint=("warm", warm_api_search),     methods=["GET"]),
+    Rule("/api/premium/status",        endpoint=("warm", warm_premium_status), methods=["GET"]),
+    Rule("/api/premium/perks",         endpoint=("warm", warm_premium_perks),  methods=["GET", "POST"]),
+    Rule("/api/comments/<anime_slug>", endpoint=("native", comments),          methods=["GET"]),
+])
+
+
+# ── ASGI ↔ WSGI ────────────────────────────────────────────────────────────────
+
+def _environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD":    scope["method"],
+        "SCRIPT_NAME":       scope.get("root_path", "").encode().decode("latin1"),
+        "PATH_INFO":         scope["path"].encode().decode("latin1"),
+        "QUERY_STRING":      scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME":       server[0],
+        "SERVER_PORT":       str(server[1] or 80),
+        "SERVER_PROTOCOL":   f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR":       client[0],
+        "CONTENT_LENGTH":    str(len(body)),
+        "wsgi.version":      (1, 0),
+        "wsgi.url_scheme":   scope.get("scheme", "http"),
+        "wsgi.input":        io.BytesIO(body),
+        "wsgi.errors":       sys.stderr,
+        "wsgi.multithread":  True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once":     False,
+    }
+    for name, value in scope.get("headers", []):
+        name, value = name.decode("latin1"), value.decode("latin1")
+        if name == "content-length":
+            continue
+        key = "CONTENT_TYPE" if name == "content-type" else "HTTP_" + name.upper().replace("-", "_")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_wsgi(environ):
+    """Jalankan app Flask (sync) → (status, headers, body). Dipanggil di thread pool."""
+    started = {}
+    chunks  = []
+
+    def start_response(status, headers, exc_info=None):
+        started["status"], started["headers"] = status, headers
+        return chunks.append
+
+    result = flask_app(environ, start_response)
+    try:
+        for chunk in result:
+            chunks.append(chunk)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return int(started["status"].split(" ", 1)[0]), started["headers"], b"".join(chunks)
+
+
+async def _run_native(fn, args, environ):
+    with flask_app.request_context(environ):
+        try:
+            resp = flask_app.make_response(await fn(**args))
+        except HTTPException as e:
+            resp = e.get_response()
+        except Exception as e:
+            resp = flask_app.handle_exception(e)   # 500, sama seperti view Flask yang error
+        resp = flask_app.process_response(resp)
+        return resp.status_code, resp.headers.to_wsgi_list(), resp.get_data()
+
+
+async def _warm(fn, args, environ):
+    with flask_app.request_context(environ):
+        try:
+            # Source aktif bisa butuh Redis / Supabase (site_config) → jangan di event loop.
+            # to_thread menyalin context, hasilnya tersimpan di g untuk langkah berikutnya
+            await asyncio.to_thread(animeku.get_active_source)
+            await fn(**args)
+        except Exception as e:
+            animeku.stats.incr("asgi.warm_error")
+            print(f"[asgi] warm error {environ['PATH_INFO']}: {e!r}")
+
+
+async def _read_body(receive):
+    chunks, more = [], True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await http_client.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return   # websocket tidak dipakai
+
+    body    = await _read_body(receive)
+    environ = _environ(scope, body)
+    try:
+        (kind, fn), args = ROUTES.bind_to_environ(environ).match()
+    except HTTPException:
+        kind = None
+
+    if kind == "native":
+        animeku.stats.incr("asgi.native")
+        status, headers, payload = await _run_native(fn, args, environ)
+    else:
+        if kind == "warm":
+            animeku.stats.incr("asgi.warm")
+            await _warm(fn, args, _environ(scope, body))
+        loop = asyncio.get_running_loop()
+        status, headers, payload = await loop.run_in_executor(_wsgi_pool, _call_wsgi, environ)
+
+    await send({
+        "type":    "http.response.start",
+        "status":  status,
+        "headers": [(k.lower().encode("latin1"), v.encode("latin1")) for k, v in headers],
+    })
+    await send({"type": "http.response.body", "body": payload})
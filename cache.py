@@ -0,0 +1,667 @@
+"""
+cache.py
+========
+Cache in-process (L1) di depan Redis (L2, lihat cache_backend.py).
+
+Dipakai oleh fetch() / fetch_view() di app.py (semua provider, termasuk route
+/animasu/... yang mendelegasikan ke view app.py):
+
+    data = cached_fetch(redis, key, ttl, loader)
+
+L1 menyimpan object hasil decode (cache_codec.py), jadi cache hit di L1 tidak perlu
+round trip HTTPS ke Upstash maupun parsing ulang. Nilai dari L1 dipakai
+bersama antar request — anggap read-only.
+
+Stale-while-revalidate
+----------------------
+Tiap entry disimpan sebagai envelope {"__swr__", "data", "soft", "hard"}:
+
+    now < soft          → fresh, langsung dipakai
+    soft <= now < hard  → basi tapi langsung dipakai, 1 refresh di background
+    now >= hard         → request menunggu upstream; kalau upstream error,
+                          data basi masih dipakai sampai soft + CACHE_STALE_IF_ERROR
+
+Single-flight
+-------------
+Selain fresh hit di L1, semua jalur (GET Redis, lock, fetch upstream) untuk
+satu key hanya dijalankan sekali per proses. Request lain untuk key yang sama
+menunggu hasil yang sama lewat Future, bukan polling Redis sendiri-sendiri.
+Polling Redis hanya tersisa untuk menunggu lock yang dipegang instance lain.
+
+Async
+-----
+acached_fetch() sama dengan cached_fetch() tapi loader-nya coroutine (dipakai
+asgi.py): menunggu upstream tidak memakan thread, hanya operasi Redis yang
+dijalankan lewat asyncio.to_thread.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cache_codec
+
+# Batas total ukuran L1 per proses (pakai panjang JSON sebagai perkiraan)
+L1_MAX_BYTES = int(os.environ.get("L1_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+# TTL L1 dibatasi supaya tidak terlalu lama beda dengan isi Redis
+L1_MAX_TTL   = int(os.environ.get("L1_CACHE_MAX_TTL", 60))
+
+# Berapa lama (detik setelah soft expiry) data basi disajikan sambil di-refresh
+SWR_WINDOW      = int(os.environ.get("CACHE_SWR_WINDOW", 600))
+# Berapa lama (detik setelah soft expiry) data basi boleh disajikan saat upstream down
+STALE_IF_ERROR  = int(os.environ.get("CACHE_STALE_IF_ERROR", 86400))
+REFRESH_WORKERS = int(os.environ.get("CACHE_REFRESH_WORKERS", 4))
+# Batas waktu menunggu hasil single-flight milik thread lain
+SINGLEFLIGHT_TIMEOUT = float(os.environ.get("CACHE_SINGLEFLIGHT_TIMEOUT", 30))
+
+# Fan-out paralel untuk halaman yang butuh beberapa fetch sekaligus
+FANOUT_WORKERS  = int(os.environ.get("FANOUT_WORKERS", 8))
+FANOUT_TIMEOUT  = float(os.environ.get("FANOUT_TIMEOUT", 12))
+
+
+class Counters:
+    """Counter sederhana thread-safe, key bebas (mis. "l1.hit")."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self._data[name] = self._data.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._data)
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+class LRUCache:
+    """LRU dengan batas ukuran (bytes) dan TTL per entry. Thread-safe.
+
+    Saat penuh, entry yang sudah expired dibuang dulu, baru sisanya
+    dibuang dari yang paling lama tidak dipakai.
+    """
+
+    def __init__(self, max_bytes=L1_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes     = 0
+        self._data     = OrderedDict()   # key -> (expires_at, size, value)
+        self._lock     = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return item[2]
+
+    def set(self, key, value, ttl, size):
+        if ttl <= 0 or size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (time.monotonic() + ttl, size, value)
+            self.bytes += size
+            if self.bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _pop(self, key):
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+
+    def _evict(self):
+        now = time.monotonic()
+        for k in [k for k, item in self._data.items() if item[0] <= now]:
+            self._pop(k)
+        while self.bytes > self.max_bytes and self._data:
+            k = next(iter(self._data))
+            self._pop(k)
+            stats.incr("l1.evict")
+
+
+class SingleFlight:
+    """Gabungkan panggilan bersamaan dengan key yang sama dalam satu proses.
+
+    Thread pertama (leader) menjalankan fn(); thread lain menunggu Future
+    yang sama dan ikut dapat hasil / exception dari leader.
+    """
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._calls = {}   # key -> Future
+
+    def do(self, key, fn, timeout=SINGLEFLIGHT_TIMEOUT):
+        with self._lock:
+            fut    = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+        if not leader:
+            stats.incr("singleflight.shared")
+            return fut.result(timeout=timeout)
+
+        stats.incr("singleflight.leader")
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+l1      = LRUCache()
+stats   = Counters()
+_flight = SingleFlight()
+
+
+def get_tiered(redis, key, ttl, log_prefix="", skip_l1=False):
+    """Ambil dari L1, kalau miss ambil dari Redis (L2) lalu isi L1.
+
+    `ttl` adalah umur entry di Redis; TTL L1 dibatasi L1_MAX_TTL.
+    `skip_l1=True` langsung baca Redis (dipakai saat isi L1 sudah basi).
+
+    Return object hasil decode atau None kalau miss di kedua tier.
+    """
+    if not skip_l1:
+        data = l1.get(key)
+        if data is not None:
+            stats.incr("l1.hit")
+            return data
+        stats.incr("l1.miss")
+
+    try:
+        cached = redis.get(key)
+    except Exception as e:
+        print(f"{log_prefix}Redis get error: {e}")
+        return None
+    if not cached:
+        stats.incr("l2.miss")
+        return None
+    data, size = _decode(redis, key, cached, log_prefix)
+    if data is None:
+        return None
+    stats.incr("l2.hit")
+    # Sisa TTL di Redis tidak diketahui tanpa round trip tambahan → batasi
+    l1.set(key, data, min(ttl, L1_MAX_TTL), size)
+    return data
+
+
+def prefetch_tiered(redis, keys, log_prefix=""):
+    """Isi L1 untuk banyak key sekaligus dengan satu MGET ke Redis.
+
+    Dipanggil sebelum fan-out supaya tiap cached_fetch() berikutnya kena L1,
+    bukan GET Redis sendiri-sendiri. Return jumlah key yang ditemukan.
+    """
+    missing = [k for k in dict.fromkeys(keys) if l1.get(k) is None]
+    if not missing:
+        return 0
+    try:
+        values = redis.mget(*missing)
+    except Exception as e:
+        print(f"{log_prefix}Redis mget error: {e}")
+        return 0
+    stats.incr("l2.mget")
+    found = 0
+    for key, cached in zip(missing, values):
+        if not cached:
+            continue
+        data, size = _decode(redis, key, cached, log_prefix)
+        if data is None:
+            continue
+        found += 1
+        l1.set(key, data, L1_MAX_TTL, size)
+    return found
+
+
+def _decode(redis, key, cached, log_prefix=""):
+    """cache_codec.decode() yang tahan entry rusak: (object, size), atau
+    (None, 0) kalau gagal — entry-nya dihapus supaya loader mengisi ulang,
+    bukan dianggap hit basi sampai TTL-nya habis."""
+    try:
+        return cache_codec.decode(cached)
+    except Exception as e:
+        stats.incr("codec.error")
+        print(f"{log_prefix}Cache decode error [{key}]: {e!r}")
+        try:
+            redis.delete(key)
+        except Exception:
+            pass
+        return None, 0
+
+
+def set_tiered(redis, key, data, ttl, log_prefix=""):
+    """Simpan ke Redis (TTL penuh, lewat cache_codec) dan ke L1 (TTL dibatasi L1_MAX_TTL)."""
+    payload, size = cache_codec.encode(data)
+    stats.incr("codec.bytes_json", size)
+    stats.incr("codec.bytes_stored", len(payload))
+    try:
+        redis.set(key, payload, ex=ttl)
+    except Exception as e:
+        print(f"{log_prefix}Redis set error: {e}")
+    l1.set(key, data, min(ttl, L1_MAX_TTL), size)
+
+
+# ── Stale-while-revalidate ─────────────────────────────────────────────────────
+
+_refresh_pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+_refreshing   = set()
+_refreshing_lock = threading.Lock()
+
+
+def _wrap(data, ttl):
+    now = time.time()
+    return {"__swr__": 1, "data": data, "soft": now + ttl, "hard": now + ttl + SWR_WINDOW}
+
+
+def _unwrap(entry):
+    """Entry lama (sebelum SWR) tidak punya envelope → anggap selalu fresh."""
+    if isinstance(entry, dict) and entry.get("__swr__"):
+        return entry
+    return {"data": entry, "soft": float("inf"), "hard": float("inf")}
+
+
+def _store(redis, key, data, ttl, log_prefix):
+    entry = _wrap(data, ttl)
+    # Redis simpan sampai batas stale-if-error, bukan cuma sampai soft expiry
+    set_tiered(redis, key, entry, ttl + max(SWR_WINDOW, STALE_IF_ERROR), log_prefix)
+
+
+def _load_with_lock(redis, key, ttl, loader, log_prefix):
+    """Fetch ke upstream di bawah distributed lock (SET NX EX 10).
+
+    Return data, atau raise kalau upstream error.
+    """
+    lock_key = key + ":lock"
+    lock_acquired = False
+    try:
+        lock_acquired = redis.set(lock_key, "1", nx=True, ex=10)
+    except Exception as e:
+        print(f"{log_prefix}Redis lock error: {e}")
+
+    if lock_acquired:
+        try:
+            data = loader()
+            _store(redis, key, data, ttl, log_prefix)
+            return data
+        finally:
+            try:
+                redis.delete(lock_key)
+            except Exception:
+                pass
+
+    # Worker lain sedang fetch → tunggu max 3 detik sampai cache terisi
+    started = time.time()
+    for _ in range(6):
+        time.sleep(0.5)
+        entry = get_tiered(redis, key, ttl, log_prefix, skip_l1=True)
+        if entry is not None and _unwrap(entry)["soft"] > started:
+            return _unwrap(entry)["data"]
+    # Timeout — fallback fetch langsung (last resort)
+    return loader()
+
+
+def _refresh(redis, key, ttl, loader, log_prefix):
+    try:
+        # Instance lain mungkin sudah refresh → cek Redis langsung (lewati L1)
+        entry = get_tiered(redis, key, ttl, log_prefix, skip_l1=True)
+        if entry is not None and _unwrap(entry)["soft"] > time.time():
+            return
+        _load_with_lock(redis, key, ttl, loader, log_prefix)
+        stats.incr("swr.refresh")
+    except Exception as e:
+        stats.incr("swr.refresh_error")
+        print(f"{log_prefix}Background refresh error [{key}]: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(redis, key, ttl, loader, log_prefix):
+    """Jadwalkan max 1 refresh background per key per proses."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    _refresh_pool.submit(_refresh, redis, key, ttl, loader, log_prefix)
+
+
+def cached_fetch(redis, key, ttl, loader, log_prefix="", fresh=False):
+    """Ambil `key` dari cache (L1 → Redis), kalau perlu panggil `loader()`.
+
+    `loader` harus return data JSON-able atau raise kalau upstream gagal,
+    dan tidak boleh bergantung ke Flask request context (bisa jalan di
+    thread background). Return None kalau tidak ada data sama sekali.
+
+    `fresh=True`: entry basi tidak disajikan sama sekali, loader dipanggil
+    langsung dan kalau gagal return None. Dipakai loader view supaya view
+    tidak dinormalisasi ulang dari raw JSON yang basi; view lama tetap
+    disajikan lewat stale-if-error miliknya sendiri.
+    """
+    entry = l1.get(key)
+    if entry is not None and time.time() < _unwrap(entry)["soft"]:
+        stats.incr("l1.hit")
+        stats.incr("swr.fresh")
+        return _unwrap(entry)["data"]
+
+    # Pemanggil fresh tidak boleh menumpang leader yang menyajikan data basi
+    fkey = key + ":fresh" if fresh else key
+    try:
+        return _flight.do(fkey, lambda: _cached_fetch_slow(redis, key, ttl, loader, log_prefix, entry, fresh))
+    except Exception as e:
+        print(f"{log_prefix}Single-flight error [{key}]: {e!r}")
+        return None
+
+
+def _cached_fetch_slow(redis, key, ttl, loader, log_prefix, l1_entry, fresh=False):
+    """Jalur selain fresh L1 hit. Hanya dijalankan oleh leader single-flight."""
+    if l1_entry is None:
+        stats.incr("l1.miss")
+    else:
+        stats.incr("l1.stale")
+    # Isi L1 kosong/basi → baca Redis (instance lain mungkin sudah refresh)
+    entry = get_tiered(redis, key, ttl, log_prefix, skip_l1=True) or l1_entry
+
+    now   = time.time()
+    stale = None
+    if entry is not None:
+        entry = _unwrap(entry)
+        if now < entry["soft"]:
+            stats.incr("swr.fresh")
+            return entry["data"]
+        if now < entry["hard"] and not fresh:
+            stats.incr("swr.stale")
+            _schedule_refresh(redis, key, ttl, loader, log_prefix)
+            return entry["data"]
+        if not fresh:
+            stale = entry
+
+    try:
+        return _load_with_lock(redis, key, ttl, loader, log_prefix)
+    except Exception as e:
+        print(f"{log_prefix}API error [{key}]: {e}")
+        if stale is not None and now < stale["soft"] + STALE_IF_ERROR:
+            stats.incr("swr.stale_if_error")
+            return stale["data"]
+        return None
+
+
+def l1_fresh(key):
+    """True kalau L1 punya `key` yang belum lewat soft expiry, artinya
+    cached_fetch() akan menjawab tanpa loader."""
+    entry = l1.get(key)
+    return entry is not None and time.time() < _unwrap(entry)["soft"]
+
+
+def cached_value(redis, key, ttl, log_prefix=""):
+    """Isi cache `key` tanpa pernah memanggil loader: data (boleh basi sampai
+    hard expiry) atau None kalau belum ada. Untuk jalur request yang tidak
+    boleh menunggu upstream."""
+    entry = get_tiered(redis, key, ttl, log_prefix)
+    if entry is None:
+        return None
+    entry = _unwrap(entry)
+    return entry["data"] if time.time() < entry["hard"] else None
+
+
+# ── Async (asgi.py) ────────────────────────────────────────────────────────────
+
+_aflights       = {}      # (id(loop), key) -> asyncio.Task
+_arefresh_tasks = set()   # simpan referensi supaya task background tidak di-GC
+
+
+async def acached_fetch(redis, key, ttl, aloader, log_prefix="", fresh=False):
+    """Versi async cached_fetch(). `aloader` = fungsi async tanpa argumen.
+
+    Single-flight per event loop: coroutine lain untuk key yang sama menunggu
+    Task yang sama. Lock antar instance & SWR sama dengan jalur sync.
+    """
+    entry = l1.get(key)
+    if entry is not None and time.time() < _unwrap(entry)["soft"]:
+        stats.incr("l1.hit")
+        stats.incr("swr.fresh")
+        return _unwrap(entry)["data"]
+
+    fkey = (id(asyncio.get_running_loop()), key, fresh)
+    task = _aflights.get(fkey)
+    if task is None:
+        stats.incr("singleflight.leader")
+        task = asyncio.ensure_future(_acached_fetch_slow(redis, key, ttl, aloader, log_prefix, entry, fresh))
+        _aflights[fkey] = task
+        task.add_done_callback(lambda _: _aflights.pop(fkey, None))
+    else:
+        stats.incr("singleflight.shared")
+    try:
+        # shield: request yang dibatalkan tidak ikut membatalkan fetch milik yang lain
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"{log_prefix}Single-flight error [{key}]: {e!r}")
+        return None
+
+
+async def _acached_fetch_slow(redis, key, ttl, aloader, log_prefix, l1_entry, fresh=False):
+    stats.incr("l1.miss" if l1_entry is None else "l1.stale")
+    entry = await asyncio.to_thread(get_tiered, redis, key, ttl, log_prefix, True) or l1_entry
+
+    now   = time.time()
+    stale = None
+    if entry is not None:
+        entry = _unwrap(entry)
+        if now < entry["soft"]:
+            stats.incr("swr.fresh")
+            return entry["data"]
+        if now < entry["hard"] and not fresh:
+            stats.incr("swr.stale")
+            _aschedule_refresh(redis, key, ttl, aloader, log_prefix)
+            return entry["data"]
+        if not fresh:
+            stale = entry
+
+    try:
+        return await _aload_with_lock(redis, key, ttl, aloader, log_prefix)
+    except Exception as e:
+        print(f"{log_prefix}API error [{key}]: {e}")
+        if stale is not None and now < stale["soft"] + STALE_IF_ERROR:
+            stats.incr("swr.stale_if_error")
+            return stale["data"]
+        return None
+
+
+async def _aload_with_lock(redis, key, ttl, aloader, log_prefix):
+    lock_key = key + ":lock"
+    lock_acquired = False
+    try:
+        lock_acquired = await asyncio.to_thread(redis.set, lock_key, "1", nx=True, ex=10)
+    except Exception as e:
+        print(f"{log_prefix}Redis lock error: {e}")
+
+    if lock_acquired:
+        try:
+            data = await aloader()
+            await asyncio.to_thread(_store, redis, key, data, ttl, log_prefix)
+            return data
+        finally:
+            try:
+                await asyncio.to_thread(redis.delete, lock_key)
+            except Exception:
+                pass
+
+    started = time.time()
+    for _ in range(6):
+        await asyncio.sleep(0.5)
+        entry = await asyncio.to_thread(get_tiered, redis, key, ttl, log_prefix, True)
+        if entry is not None and _unwrap(entry)["soft"] > started:
+            return _unwrap(entry)["data"]
+    return await aloader()
+
+
+async def _arefresh(redis, key, ttl, aloader, log_prefix):
+    try:
+        entry = await asyncio.to_thread(get_tiered, redis, key, ttl, log_prefix, True)
+        if entry is not None and _unwrap(entry)["soft"] > time.time():
+            return
+        await _aload_with_lock(redis, key, ttl, aloader, log_prefix)
+        stats.incr("swr.refresh")
+    except Exception as e:
+        stats.incr("swr.refresh_error")
+        print(f"{log_prefix}Background refresh error [{key}]: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _aschedule_refresh(redis, key, ttl, aloader, log_prefix):
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    task = asyncio.ensure_future(_arefresh(redis, key, ttl, aloader, log_prefix))
+    _arefresh_tasks.add(task)
+    task.add_done_callback(_arefresh_tasks.discard)
+
+
+# ── Fan-out paralel ────────────────────────────────────────────────────────────
+
+_fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+
+
+def gather(calls, timeout=FANOUT_TIMEOUT, log_prefix=""):
+    """Jalankan beberapa callable tanpa argumen secara paralel.
+
+    Return list hasil dengan urutan yang sama. Call yang error atau lewat
+    `timeout` (total, bukan per call) hasilnya None. Jangan panggil dari
+    dalam call lain yang sedang di-gather (pool-nya dipakai bersama).
+    """
+    if len(calls) <= 1:
+        futures = None
+    else:
+        futures = [_fanout_pool.submit(c) for c in calls]
+    deadline = time.monotonic() + timeout
+    results  = []
+    for i, c in enumerate(calls):
+        try:
+            if futures is None:
+                results.append(c())
+            else:
+                results.append(futures[i].result(timeout=max(0, deadline - time.monotonic())))
+        except Exception as e:
+            stats.incr("fanout.error")
+            print(f"{log_prefix}Fan-out error: {e!r}")
+            results.append(None)
+    return results
+
+
+# ── Generasi namespace ─────────────────────────────────────────────────────────
+# Key cache menyertakan counter generasi tiap namespace (semua / source /
+# route family / slug). Invalidasi = INCR counter → key lama tidak pernah
+# dibaca lagi dan hilang sendiri saat TTL-nya habis. Tidak ada KEYS/SCAN.
+# Nilai counter di-cache per proses dan dicek ulang ke Redis tiap
+# GEN_CHECK_INTERVAL detik (default = L1_MAX_TTL): key berisi generasi, jadi
+# interval lebih pendek dari umur L1 membuat L1 hit tetap bayar MGET ke
+# Upstash. Instance lain ikut invalidasi dalam <= GEN_CHECK_INTERVAL detik,
+# sama dengan batas basi L1. Kalau Redis error, nilai terakhir yang diketahui
+# tetap dipakai (bukan 0) supaya key tidak lompat ke namespace lama.
+
+GEN_CHECK_INTERVAL = float(os.environ.get("CACHE_GEN_CHECK_INTERVAL", L1_MAX_TTL))
+GEN_LAST_KNOWN_TTL = 86400
+GEN_KEY_PREFIX     = "animeku:gen:"
+_gens = LRUCache(max_bytes=512 * 1024)   # namespace -> (nilai, waktu cek monotonic)
+
+
+def cache_namespaces(source, path, prefix=""):
+    """Namespace untuk path upstream: ["all", source, family, slug?].
+
+    Family = segmen pertama setelah `prefix` (mis. "anime", "episode",
+    "ongoing"), slug = segmen kedua kalau ada.
+    """
+    rel   = path[len(prefix):] if prefix and path.startswith(prefix) else path
+    parts = [p for p in rel.split("/") if p]
+    ns    = ["all", source, f"{source}:family:{parts[0] if parts else ''}"]
+    if len(parts) > 1:
+        ns.append(f"{source}:slug:{parts[1]}")
+    return ns
+
+
+def generations(redis, namespaces):
+    """Nilai counter tiap namespace (0 = belum pernah di-invalidate)."""
+    now = time.monotonic()
+    values, missing = {}, []
+    for ns in namespaces:
+        known = _gens.get(ns)
+        if known is not None and now - known[1] < GEN_CHECK_INTERVAL:
+            values[ns] = known[0]
+        else:
+            missing.append(ns)
+    if missing:
+        try:
+            raw = redis.mget(*[GEN_KEY_PREFIX + ns for ns in missing])
+        except Exception as e:
+            print(f"Redis gen mget error: {e}")
+            stats.incr("gen.error")
+            for ns in missing:
+                known = _gens.get(ns)
+                values[ns] = known[0] if known is not None else 0
+        else:
+            for ns, r in zip(missing, raw):
+                values[ns] = int(r) if r else 0
+                _remember_gen(ns, values[ns], now)
+    return [values[ns] for ns in namespaces]
+
+
+def _remember_gen(ns, value, checked):
+    _gens.set(ns, (value, checked), GEN_LAST_KNOWN_TTL, len(ns) + 16)
+
+
+def gen_tag(redis, namespaces):
+    """Potongan key untuk generasi saat ini, mis. "g3.0.1"."""
+    return "g" + ".".join(str(v) for v in generations(redis, namespaces))
+
+
+def bump_generation(redis, *namespaces):
+    """Invalidate namespace (satu INCR atomik per namespace). Return nilai baru."""
+    result = {}
+    for ns in namespaces:
+        result[ns] = int(redis.incr(GEN_KEY_PREFIX + ns))
+        _remember_gen(ns, result[ns], time.monotonic())
+        stats.incr("gen.bump")
+    return result
+
+
+def cache_stats():
+    """Counter hit/miss per tier + isi L1 saat ini."""
+    return {
+        "counters": stats.snapshot(),
+        "l1": {"entries": len(l1), "bytes": l1.bytes, "max_bytes": l1.max_bytes},
+    }
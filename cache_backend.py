@@ -0,0 +1,245 @@
+"""
+cache_backend.py
+================
+Backend key-value untuk cache (dipakai cache.py dan app.py).
+
+Tiga implementasi dengan interface yang sama (subset perintah Redis):
+
+- UpstashBackend — Upstash REST (default di Vercel). Tiap perintah = 1 request
+  HTTPS, jadi operasi banyak key sebaiknya lewat mget / set_many / delete_many
+  (1 request, set_many pakai pipeline).
+- RedisBackend  — Redis native lewat TCP (butuh paket `redis`, opsional).
+- MemoryBackend — dict per proses, untuk test / dev lokal tanpa Redis.
+
+Dipilih lewat env CACHE_BACKEND=upstash|redis|memory. Default: upstash kalau
+UPSTASH_REDIS_REST_URL ada; memory hanya kalau diminta eksplisit atau dev lokal
+(FLASK_DEBUG=1), selain itu error saat start. Backend redis pakai REDIS_URL.
+
+    redis = get_backend()
+    redis.mget("a", "b")                 # → [str|None, str|None]
+    redis.set_many({"a": "1"}, ex=60)
+    redis.delete_pattern("animeku:*")    # SCAN + DEL per batch, bukan KEYS
+"""
+
+import fnmatch
+import os
+import threading
+import time
+
+SCAN_COUNT = int(os.environ.get("CACHE_SCAN_COUNT", 500))
+DEL_BATCH  = 500
+
+
+class CacheBackend:
+    """Interface + implementasi default operasi batch di atas perintah dasar."""
+
+    name = "base"
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ex=None, nx=False):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+    def mget(self, *keys):
+        return [self.get(k) for k in keys]
+
+    def scan(self, cursor, match=None, count=None):
+        """Return (cursor_baru, keys). cursor 0 = selesai."""
+        raise NotImplementedError
+
+    def scan_iter(self, match=None, count=SCAN_COUNT):
+        cursor = 0
+        while True:
+            cursor, keys = self.scan(cursor, match=match, count=count)
+            yield from keys
+            cursor = int(cursor)
+            if cursor == 0:
+                break
+
+    def set_many(self, items, ex=None):
+        for k, v in items.items():
+            self.set(k, v, ex=ex)
+
+    def delete_many(self, keys):
+        """DEL per batch DEL_BATCH key. Return jumlah key yang terhapus."""
+        keys, deleted = list(keys), 0
+        for i in range(0, len(keys), DEL_BATCH):
+            deleted += self.delete(*keys[i:i + DEL_BATCH]) or 0
+        return deleted
+
+    def delete_pattern(self, match):
+        """Hapus semua key yang cocok `match` (SCAN, bukan KEYS)."""
+        batch, deleted = [], 0
+        for k in self.scan_iter(match=match):
+            batch.append(k)
+            if len(batch) >= DEL_BATCH:
+                deleted += self.delete_many(batch)
+                batch = []
+        if batch:
+            deleted += self.delete_many(batch)
+        return deleted
+
+
+class UpstashBackend(CacheBackend):
+    name = "upstash"
+
+    def __init__(self, url, token):
+        from upstash_redis import Redis
+        self._r = Redis(url=url, token=token)
+
+    def get(self, key):
+        return self._r.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        return self._r.set(key, value, ex=ex, nx=nx or None)
+
+    def delete(self, *keys):
+        return self._r.delete(*keys) if keys else 0
+
+    def incr(self, key):
+        return self._r.incr(key)
+
+    def mget(self, *keys):
+        return self._r.mget(*keys) if keys else []
+
+    def scan(self, cursor, match=None, count=None):
+        cursor, keys = self._r.scan(cursor, match=match, count=count)
+        return int(cursor), keys
+
+    def set_many(self, items, ex=None):
+        if not items:
+            return
+        pipe = self._r.pipeline()
+        for k, v in items.items():
+            pipe.set(k, v, ex=ex)
+        pipe.exec()
+
+
+class RedisBackend(CacheBackend):
+    name = "redis"
+
+    def __init__(self, url):
+        import redis
+        self._r = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key):
+        return self._r.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        return self._r.set(key, value, ex=ex, nx=nx)
+
+    def delete(self, *keys):
+        return self._r.delete(*keys) if keys else 0
+
+    def incr(self, key):
+        return self._r.incr(key)
+
+    def mget(self, *keys):
+        return self._r.mget(keys) if keys else []
+
+    def scan(self, cursor, match=None, count=None):
+        return self._r.scan(cursor, match=match, count=count)
+
+    def set_many(self, items, ex=None):
+        pipe = self._r.pipeline(transaction=False)
+        for k, v in items.items():
+            pipe.set(k, v, ex=ex)
+        pipe.execute()
+
+
+class MemoryBackend(CacheBackend):
+    """Tidak dibagi antar proses/instance — hanya untuk test & dev lokal."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data = {}   # key -> (value, expires_at | None)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.time():
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key)
+            return item[0] if item else None
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._live(key):
+                return None
+            self._data[key] = (str(value), time.time() + ex if ex else None)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for k in keys if self._live(k) and self._data.pop(k))
+
+    def incr(self, key):
+        with self._lock:
+            item  = self._live(key)
+            value = int(item[0]) + 1 if item else 1
+            self._data[key] = (str(value), item[1] if item else None)
+            return value
+
+    def scan(self, cursor, match=None, count=None):
+        # Snapshot sekali jalan: semua key dikembalikan dalam satu halaman
+        with self._lock:
+            keys = [k for k in list(self._data) if self._live(k)]
+        if match:
+            keys = [k for k in keys if fnmatch.fnmatchcase(k, match)]
+        return 0, keys
+
+
+def _dev_mode():
+    """`flask run --debug` / FLASK_DEBUG=1 → dev lokal."""
+    return os.environ.get("FLASK_DEBUG", "").lower() in ("1", "true", "yes")
+
+
+def make_backend(kind=None):
+    kind = (kind or os.environ.get("CACHE_BACKEND", "")).lower()
+    if not kind:
+        if os.environ.get("UPSTASH_REDIS_REST_URL"):
+            kind = "upstash"
+        elif _dev_mode():
+            kind = "memory"
+        else:
+            # Env Upstash hilang di deploy → tiap instance diam-diam pakai cache
+            # sendiri dan semua miss ke upstream. Lebih baik gagal saat start.
+            raise ValueError("UPSTASH_REDIS_REST_URL tidak diset. Set CACHE_BACKEND=upstash|redis, "
+                             "atau CACHE_BACKEND=memory / FLASK_DEBUG=1 untuk dev lokal")
+    if kind == "upstash":
+        return UpstashBackend(os.environ["UPSTASH_REDIS_REST_URL"],
+                              os.environ["UPSTASH_REDIS_REST_TOKEN"])
+    if kind == "redis":
+        return RedisBackend(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+    if kind == "memory":
+        print("[cache] CACHE_BACKEND=memory — cache tidak dibagi antar instance")
+        return MemoryBackend()
+    raise ValueError(f"CACHE_BACKEND tidak dikenal: {kind}")
+
+
+_backend      = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Backend bersama untuk seluruh proses (dibuat sekali)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = make_backend()
+    return _backend
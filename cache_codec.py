@@ -0,0 +1,100 @@
+"""
+cache_codec.py
+==============
+Format nilai yang disimpan ke Redis oleh cache.py.
+
+    v1:j:<json>              JSON compact (orjson kalau terpasang)
+    v1:z:<base64(zlib)>      JSON terkompres zlib
+    v1:s:<base64(zstd)>      JSON terkompres zstd (butuh paket `zstandard`)
+    {... / [...              format lama (json.dumps biasa), tetap bisa dibaca
+
+Payload >= CACHE_COMPRESS_MIN_BYTES dikompres (CACHE_COMPRESSION=zlib|zstd|none).
+Hasil kompresi di-base64 karena Upstash REST dan RedisBackend menyimpan str,
+jadi kompresi baru untung untuk payload besar (animelist, detail).
+
+msgpack tidak dipakai: hasilnya biner (harus base64 juga) dan untuk data
+upstream yang isinya hampir semua string ukurannya tidak jauh beda dari JSON.
+
+Header versi membuat instance lama & baru bisa jalan bersamaan saat rollout:
+decode() menerima semua format di atas, termasuk nilai tanpa header.
+"""
+
+import base64
+import json
+import os
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION        = os.environ.get("CACHE_COMPRESSION", "zlib").lower()
+COMPRESS_MIN_BYTES = int(os.environ.get("CACHE_COMPRESS_MIN_BYTES", 4096))
+ZLIB_LEVEL         = int(os.environ.get("CACHE_ZLIB_LEVEL", 6))
+ZSTD_LEVEL         = int(os.environ.get("CACHE_ZSTD_LEVEL", 3))
+
+HEADER = "v1:"
+
+
+def dumps(data):
+    """JSON compact sebagai bytes UTF-8."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass   # tipe yang tidak didukung orjson → json biasa
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _compress(raw, method):
+    if method == "zstd" and zstandard is not None:
+        return "s", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    if method in ("zlib", "zstd"):
+        return "z", zlib.compress(raw, ZLIB_LEVEL)
+    return None, None
+
+
+def encode(data, compression=None, min_bytes=None):
+    """Object → (str untuk Redis, ukuran JSON dalam bytes)."""
+    raw       = dumps(data)
+    method    = compression or COMPRESSION
+    min_bytes = COMPRESS_MIN_BYTES if min_bytes is None else min_bytes
+    if method != "none" and len(raw) >= min_bytes:
+        tag, packed = _compress(raw, method)
+        if packed is not None:
+            text = base64.b64encode(packed).decode("ascii")
+            # Kompresi + base64 tidak selalu lebih kecil → pakai yang terkecil
+            if len(text) + 5 < len(raw):
+                return f"{HEADER}{tag}:{text}", len(raw)
+    return f"{HEADER}j:" + raw.decode(), len(raw)
+
+
+def decode(value):
+    """Nilai dari Redis → (object, ukuran JSON dalam bytes)."""
+    if isinstance(value, bytes):
+        value = value.decode()
+    if not value.startswith(HEADER):
+        return json.loads(value), len(value)   # format lama
+    tag, body = value[3], value[5:]
+    if tag == "j":
+        return loads(body), len(body)
+    packed = base64.b64decode(body)
+    if tag == "z":
+        raw = zlib.decompress(packed)
+    elif tag == "s":
+        if zstandard is None:
+            raise ValueError("payload zstd tapi paket zstandard tidak terpasang")
+        raw = zstandard.ZstdDecompressor().decompress(packed)
+    else:
+        raise ValueError(f"codec cache tidak dikenal: {tag}")
+    return loads(raw), len(raw)
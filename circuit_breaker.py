@@ -0,0 +1,191 @@
+"""
+circuit_breaker.py
+==================
+Circuit breaker per source upstream (samehadaku / animasu / otakudesu).
+
+    r = call("animasu", lambda: http_client.get(url),
+             ok=lambda r: r.status_code < 500)   # raise CircuitOpen kalau open
+
+State:
+- closed    : semua request lewat. Hasil dicatat di jendela BREAKER_WINDOW detik.
+              Kalau minimal BREAKER_MIN_CALLS call dan rasio gagal (error atau
+              lebih lambat dari BREAKER_SLOW_SECONDS) >= BREAKER_FAILURE_RATE → open.
+- open      : semua request langsung ditolak selama BREAKER_OPEN_SECONDS.
+- half_open : maksimal BREAKER_PROBES request percobaan sekaligus. Semua sukses
+              → closed, satu gagal → open lagi.
+
+State disimpan per proses (tiap instance serverless punya breaker sendiri),
+cukup untuk berhenti menunggu timeout 10 detik berulang-ulang di instance itu.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+WINDOW        = float(os.environ.get("BREAKER_WINDOW", 30))
+MIN_CALLS     = int(os.environ.get("BREAKER_MIN_CALLS", 8))
+FAILURE_RATE  = float(os.environ.get("BREAKER_FAILURE_RATE", 0.5))
+SLOW_SECONDS  = float(os.environ.get("BREAKER_SLOW_SECONDS", 5))
+OPEN_SECONDS  = float(os.environ.get("BREAKER_OPEN_SECONDS", 30))
+PROBES        = int(os.environ.get("BREAKER_PROBES", 2))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """Request ditolak karena breaker source sedang open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name       = name
+        self.state      = CLOSED
+        self.opened_at  = 0.0
+        self._calls     = deque()      # (waktu, gagal?) dalam jendela WINDOW
+        self._probing   = 0            # probe half-open yang sedang jalan
+        self._probe_ok  = 0
+        self._lock      = threading.Lock()
+        self.counters   = {"calls": 0, "failures": 0, "slow": 0, "rejected": 0,
+                           "opened": 0, "latency_ms_total": 0.0}
+
+    def _trim(self, now):
+        while self._calls and self._calls[0][0] < now - WINDOW:
+            self._calls.popleft()
+
+    def _open(self, now):
+        self.state     = OPEN
+        self.opened_at = now
+        self._calls.clear()
+        self.counters["opened"] += 1
+        print(f"[breaker] {self.name} open")
+
+    def allow(self):
+        """True kalau request boleh dikirim ke upstream."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < OPEN_SECONDS:
+                    self.counters["rejected"] += 1
+                    return False
+                self.state, self._probing, self._probe_ok = HALF_OPEN, 0, 0
+            if self.state == HALF_OPEN:
+                if self._probing >= PROBES:
+                    self.counters["rejected"] += 1
+                    return False
+                self._probing += 1
+            return True
+
+    def record(self, ok, seconds):
+        """Catat hasil satu request. Request lambat dihitung gagal."""
+        now    = time.monotonic()
+        slow   = seconds >= SLOW_SECONDS
+        failed = not ok or slow
+        with self._lock:
+            c = self.counters
+            c["calls"]            += 1
+            c["failures"]         += not ok
+            c["slow"]             += slow
+            c["latency_ms_total"] += seconds * 1000
+            if self.state == HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+                if failed:
+                    self._open(now)
+                else:
+                    self._probe_ok += 1
+                    if self._probe_ok >= PROBES:
+                        self.state = CLOSED
+                        print(f"[breaker] {self.name} closed")
+                return
+            if self.state == OPEN:
+                return   # hasil request yang sudah jalan sebelum breaker open
+            self._calls.append((now, failed))
+            self._trim(now)
+            n = len(self._calls)
+            if n >= MIN_CALLS and sum(f for _, f in self._calls) / n >= FAILURE_RATE:
+                self._open(now)
+
+    def release(self):
+        """Lepas slot probe half-open tanpa mencatat hasil (request dibatalkan)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+
+    def healthy(self):
+        """False kalau breaker open (belum waktunya probe)."""
+        return not (self.state == OPEN and time.monotonic() - self.opened_at < OPEN_SECONDS)
+
+    def snapshot(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            n      = len(self._calls)
+            failed = sum(f for _, f in self._calls)
+            c      = dict(self.counters)
+        latency = c.pop("latency_ms_total")
+        return {
+            "state":        self.state,
+            "healthy":      self.healthy(),
+            "window_calls": n,
+            "error_rate":   round(failed / n, 3) if n else 0.0,
+            "avg_latency_ms": round(latency / c["calls"], 1) if c["calls"] else None,
+            **c,
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(name):
+    """Breaker untuk `name` (dibuat saat pertama dipakai)."""
+    br = _breakers.get(name)
+    if br is None:
+        with _breakers_lock:
+            br = _breakers.setdefault(name, CircuitBreaker(name))
+    return br
+
+
+def health():
+    """Snapshot semua breaker: {name: {state, error_rate, avg_latency_ms, ...}}."""
+    return {name: br.snapshot() for name, br in sorted(_breakers.items())}
+
+
+def call(name, fn, ok=None):
+    """Jalankan fn() lewat breaker `name`.
+
+    Raise CircuitOpen tanpa memanggil fn() kalau breaker menolak (fail fast).
+    Exception dari fn() dihitung gagal; `ok(hasil)` → False juga dihitung gagal.
+    Pembatalan (BaseException lain, mis. CancelledError) tidak dicatat, tapi
+    slot probe half-open tetap dilepas supaya breaker tidak macet.
+    """
+    br = breaker(name)
+    if not br.allow():
+        raise CircuitOpen(name)
+    t0 = time.monotonic()
+    try:
+        result = fn()
+    except Exception:
+        br.record(False, time.monotonic() - t0)
+        raise
+    except BaseException:
+        br.release()
+        raise
+    br.record(ok(result) if ok else True, time.monotonic() - t0)
+    return result
+
+
+async def acall(name, fn, ok=None):
+    """Versi async call(): `fn` fungsi async tanpa argumen."""
+    br = breaker(name)
+    if not br.allow():
+        raise CircuitOpen(name)
+    t0 = time.monotonic()
+    try:
+        result = await fn()
+    except Exception:
+        br.record(False, time.monotonic() - t0)
+        raise
+    except BaseException:
+        br.release()
+        raise
+    br.record(ok(result) if ok else True, time.monotonic() - t0)
+    return result
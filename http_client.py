@@ -0,0 +1,224 @@
+"""
+http_client.py
+==============
+HTTP client bersama untuk semua request keluar (API anime, Supabase, Trakteer).
+
+Satu requests.Session per host upstream, jadi koneksi TCP+TLS dipakai ulang
+(keep-alive) antar request dalam satu worker. Pemakaian sama seperti requests:
+
+    r = http_client.get(f"{SUPABASE_URL}/rest/v1/...", headers=..., params=...)
+
+- Kalau `timeout` tidak diisi, dipakai timeout default host tersebut.
+- GET/HEAD/OPTIONS di-retry dengan backoff untuk error koneksi & 502/503/504.
+  POST/PATCH/DELETE tidak di-retry.
+- Ukuran pool & timeout bisa diatur per host lewat configure_host().
+
+Versi async (aget/apost/arequest, dipakai asgi.py) memakai httpx.AsyncClient
+per host per event loop dengan timeout, ukuran pool, retry dan counter yang
+sama dengan versi sync.
+
+HTTP/2 tidak didukung: requests/urllib3 hanya bicara HTTP/1.1, dan keep-alive
+per host sudah menghilangkan biaya handshake yang jadi masalah utama.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULTS = {
+    "timeout":      float(os.environ.get("HTTP_TIMEOUT", 10)),
+    "pool_maxsize": int(os.environ.get("HTTP_POOL_MAXSIZE", 10)),
+    "retries":      int(os.environ.get("HTTP_RETRIES", 2)),
+    "backoff":      float(os.environ.get("HTTP_BACKOFF", 0.3)),
+}
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+_lock        = threading.Lock()
+_host_config = {}   # "https://host" -> config
+_sessions    = {}   # "https://host" -> requests.Session
+_stats       = {}   # "https://host" -> counter dict
+
+
+def _host(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _config(host):
+    return _host_config.get(host, DEFAULTS)
+
+
+def configure_host(base_url, **opts):
+    """Atur timeout / pool_maxsize / retries / backoff untuk satu host."""
+    host = _host(base_url)
+    with _lock:
+        _host_config[host] = {**DEFAULTS, **_host_config.get(host, {}), **opts}
+        old = _sessions.pop(host, None)
+    if old is not None:
+        old.close()
+
+
+def session_for(url):
+    """Session (dengan connection pool) untuk host dari `url`, dibuat sekali."""
+    host = _host(url)
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            cfg   = _config(host)
+            retry = Retry(
+                total=cfg["retries"],
+                backoff_factor=cfg["backoff"],
+                status_forcelist=(502, 503, 504),
+                allowed_methods=IDEMPOTENT_METHODS,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cfg["pool_maxsize"],
+                                  max_retries=retry)
+            s = requests.Session()
+            s.mount(host, adapter)
+            _sessions[host] = s
+    return s
+
+
+def _record(host, started, error, retries=0):
+    elapsed = (time.perf_counter() - started) * 1000
+    with _lock:
+        st = _stats.setdefault(host, {"requests": 0, "errors": 0, "retries": 0,
+                                      "latency_ms_total": 0.0, "latency_ms_max": 0.0})
+        st["requests"]         += 1
+        st["errors"]           += 1 if error else 0
+        st["retries"]          += retries
+        st["latency_ms_total"] += elapsed
+        st["latency_ms_max"]    = max(st["latency_ms_max"], elapsed)
+
+
+def request(method, url, **kwargs):
+    host = _host(url)
+    kwargs.setdefault("timeout", _config(host)["timeout"])
+    started = time.perf_counter()
+    try:
+        r = session_for(url).request(method, url, **kwargs)
+    except Exception:
+        _record(host, started, error=True)
+        raise
+    retries = getattr(getattr(r.raw, "retries", None), "history", None) or ()
+    _record(host, started, error=r.status_code >= 500, retries=len(retries))
+    return r
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return request("PATCH", url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request("DELETE", url, **kwargs)
+
+
+# ── Async (httpx) ──────────────────────────────────────────────────────────────
+
+RETRY_STATUS    = (502, 503, 504)
+_async_clients  = {}   # (host, id(loop)) -> httpx.AsyncClient
+
+
+def _async_client(host):
+    """AsyncClient untuk host ini di event loop yang sedang jalan (client tidak bisa lintas loop)."""
+    if httpx is None:
+        raise RuntimeError("http_client async butuh paket httpx")
+    key = (host, id(asyncio.get_running_loop()))
+    client = _async_clients.get(key)
+    if client is None:
+        cfg    = _config(host)
+        client = httpx.AsyncClient(
+            timeout=cfg["timeout"],
+            limits=httpx.Limits(max_connections=cfg["pool_maxsize"],
+                                max_keepalive_connections=cfg["pool_maxsize"]),
+        )
+        _async_clients[key] = client
+    return client
+
+
+async def arequest(method, url, **kwargs):
+    """Seperti request(), tapi async. GET/HEAD/OPTIONS di-retry dengan backoff."""
+    host    = _host(url)
+    cfg     = _config(host)
+    client  = _async_client(host)
+    retries = cfg["retries"] if method.upper() in IDEMPOTENT_METHODS else 0
+    kwargs.setdefault("timeout", cfg["timeout"])
+    started = time.perf_counter()
+    for attempt in range(retries + 1):
+        try:
+            r = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt < retries:
+                await asyncio.sleep(cfg["backoff"] * (2 ** attempt))
+                continue
+            _record(host, started, error=True, retries=attempt)
+            raise
+        if r.status_code in RETRY_STATUS and attempt < retries:
+            await asyncio.sleep(cfg["backoff"] * (2 ** attempt))
+            continue
+        _record(host, started, error=r.status_code >= 500, retries=attempt)
+        # Samakan dengan requests.Response yang dipakai kode lama
+        r.ok = r.status_code < 400
+        return r
+
+
+async def aget(url, **kwargs):
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url, **kwargs):
+    return await arequest("POST", url, **kwargs)
+
+
+async def aclose():
+    """Tutup semua AsyncClient milik event loop yang sedang jalan (shutdown ASGI)."""
+    loop_id = id(asyncio.get_running_loop())
+    for key in [k for k in _async_clients if k[1] == loop_id]:
+        await _async_clients.pop(key).aclose()
+
+
+def stats():
+    """Counter per host: jumlah request, error, retry, latency, dan reuse koneksi."""
+    with _lock:
+        result   = {h: dict(st) for h, st in _stats.items()}
+        sessions = dict(_sessions)
+    for host, st in result.items():
+        st["latency_ms_avg"] = round(st["latency_ms_total"] / st["requests"], 1) if st["requests"] else 0
+        st["latency_ms_total"] = round(st["latency_ms_total"], 1)
+        st["latency_ms_max"]   = round(st["latency_ms_max"], 1)
+        s = sessions.get(host)
+        if s is None:
+            continue
+        # urllib3 mencatat koneksi baru vs request per pool → sisanya reuse
+        opened = served = 0
+        try:
+            pools = s.get_adapter(host).poolmanager.pools
+            for key in pools.keys():
+                pool    = pools[key]
+                opened += pool.num_connections
+                served += pool.num_requests
+        except Exception:
+            pass
+        st["connections_opened"] = opened
+        st["connections_reused"] = max(served - opened, 0)
+    return result
@@ -0,0 +1,93 @@
+"""
+providers.py
+============
+Adapter per source upstream (samehadaku / animasu / otakudesu). Route di
+app.py tidak bercabang per source lagi; semua beda antar source ada di sini:
+
+    p   = get_provider("otakudesu")
+    req = p.request("ongoing", page=2)      # (path, params, normalize, ttl)
+    data = fetch_view(*req)
+
+Tiap adapter mendeklarasikan:
+- endpoints   : nama endpoint → path relatif prefix. Boleh berisi {slug}, {q},
+                {id} dan query string ("/search?q={q}" → params {"q": ...}).
+- normalizers : nama endpoint → normalize(raw, ...). Argumen `page` / `slug` /
+                dll. diisi otomatis dari argumen request() yang cocok.
+- cache_ttl   : TTL dasar (detik) per endpoint.
+- batch       : halaman gabungan → endpoint yang di-fetch dalam satu fan-out,
+                mis. {"home": ("home", "popular", "schedule")}.
+
+Endpoint yang tidak ada → has() False; route memakai fallback sendiri.
+"""
+
+import inspect
+from functools import partial
+from urllib.parse import parse_qsl
+
+
+class Provider:
+    def __init__(self, key, prefix, endpoints, normalizers, cache_ttl, batch=None):
+        self.key         = key
+        self.prefix      = prefix
+        self.endpoints   = endpoints
+        self.normalizers = normalizers
+        self.cache_ttl   = cache_ttl
+        self.batch       = batch or {}
+
+    def __repr__(self):
+        return f"<Provider {self.key}>"
+
+    def has(self, name):
+        return name in self.endpoints
+
+    def path(self, name, **kw):
+        """(path lengkap, params) untuk endpoint `name`."""
+        path, _, query = self.endpoints[name].partition("?")
+        params = {k: v.format(**kw) for k, v in parse_qsl(query)}
+        return self.prefix + path.format(**kw), params or None
+
+    def normalizer(self, name, **kw):
+        """Normalizer endpoint `name` dengan argumen yang dibutuhkan sudah diisi."""
+        fn = self.normalizers.get(name)
+        if fn is None:
+            return None
+        wanted = {k: v for k, v in kw.items() if k in _arg_names(fn)}
+        return partial(fn, **wanted) if wanted else fn
+
+    def ttl(self, name):
+        return self.cache_ttl.get(name, self.cache_ttl["default"])
+
+    def request(self, name, page=None, normalize=None, **kw):
+        """Item fetch_many(): (path, params, normalize, ttl).
+
+        `page` masuk ke params dan ke normalizer; `normalize` mengganti
+        normalizer bawaan endpoint (mis. view turunan dari katalog).
+        """
+        path, params = self.path(name, **kw)
+        if page is not None:
+            params = {**(params or {}), "page": page}
+            kw["page"] = page
+        return path, params, normalize or self.normalizer(name, **kw), self.ttl(name)
+
+
+def _arg_names(fn):
+    try:
+        return set(list(inspect.signature(fn).parameters)[1:])   # tanpa `raw`
+    except (TypeError, ValueError):
+        return set()
+
+
+_providers = {}
+
+
+def register(provider):
+    _providers[provider.key] = provider
+    return provider
+
+
+def get_provider(key):
+    return _providers[key]
+
+
+def all_providers():
+    return dict(_providers)
@@ -0,0 +1,131 @@
+"""
+Benchmark codec cache: ukuran payload + waktu encode/decode per route family.
+
+    python scripts/bench_cache_codec.py                    # ambil sampel dari API upstream
+    python scripts/bench_cache_codec.py --source otakudesu
+    python scripts/bench_cache_codec.py --dir sampel/      # file *.json (nama file = family)
+
+Codec yang dibandingkan: json (format lama), orjson, orjson+zlib, dan
+orjson+zstd / msgpack kalau paketnya terpasang.
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache_codec  # noqa: E402
+import http_client  # noqa: E402
+
+API_BASE = "https://www.sankavollerei.com"
+PREFIX   = {"samehadaku": "/anime/samehadaku", "animasu": "/anime/animasu", "otakudesu": "/anime"}
+# family → path relatif prefix (per source kalau beda)
+FAMILIES = {
+    "home":      {"*": "/home"},
+    "ongoing":   {"*": "/ongoing", "otakudesu": "/ongoing-anime"},
+    "schedule":  {"*": "/schedule"},
+    "genres":    {"*": "/genres", "otakudesu": "/genre"},
+    "animelist": {"*": "/animelist", "samehadaku": "/list", "otakudesu": "/unlimited"},
+    "search":    {"*": "/search/naruto", "samehadaku": "/search?q=naruto"},
+}
+
+
+def _codecs():
+    codecs = {
+        "json":        (lambda d: json.dumps(d), json.loads),
+        "orjson":      (lambda d: cache_codec.encode(d, compression="none")[0], lambda s: cache_codec.decode(s)[0]),
+        "orjson+zlib": (lambda d: cache_codec.encode(d, compression="zlib", min_bytes=0)[0],
+                        lambda s: cache_codec.decode(s)[0]),
+    }
+    if cache_codec.zstandard is not None:
+        codecs["orjson+zstd"] = (lambda d: cache_codec.encode(d, compression="zstd", min_bytes=0)[0],
+                                 lambda s: cache_codec.decode(s)[0])
+    try:
+        import msgpack
+        codecs["msgpack+b64"] = (lambda d: base64.b64encode(msgpack.packb(d)).decode(),
+                                 lambda s: msgpack.unpackb(base64.b64decode(s)))
+    except ImportError:
+        pass
+    return codecs
+
+
+def _detail_path(source, ongoing):
+    """Slug pertama dari halaman ongoing → path detail."""
+    data  = ongoing.get("data", ongoing) if isinstance(ongoing, dict) else {}
+    items = data.get("animeList") or data.get("ongoingAnimeData") or data.get("animes") or []
+    if not items:
+        return None
+    slug = items[0].get("animeId") or items[0].get("slug")
+    return f"{PREFIX[source]}/{'detail' if source == 'animasu' else 'anime'}/{slug}"
+
+
+def load_upstream(source):
+    samples = {}
+    for family, paths in FAMILIES.items():
+        path = PREFIX[source] + paths.get(source, paths["*"])
+        try:
+            r = http_client.get(API_BASE + path, timeout=20)
+            r.raise_for_status()
+            samples[family] = r.json()
+        except Exception as e:
+            print(f"  skip {family} ({path}): {e}")
+    if "ongoing" in samples:
+        path = _detail_path(source, samples["ongoing"])
+        if path:
+            try:
+                samples["detail"] = http_client.get(API_BASE + path, timeout=20).json()
+            except Exception as e:
+                print(f"  skip detail ({path}): {e}")
+    return samples
+
+
+def load_dir(path):
+    samples = {}
+    for fn in sorted(glob.glob(os.path.join(path, "*.json"))):
+        with open(fn, encoding="utf-8") as f:
+            samples[os.path.splitext(os.path.basename(fn))[0]] = json.load(f)
+    return samples
+
+
+def bench(samples, rounds):
+    codecs = _codecs()
+    print(f"{'family':<11} {'codec':<13} {'bytes':>9} {'ratio':>6} {'enc µs':>9} {'dec µs':>9}")
+    for family, data in samples.items():
+        base = None
+        for name, (enc, dec) in codecs.items():
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                blob = enc(data)
+            t1 = time.perf_counter()
+            for _ in range(rounds):
+                dec(blob)
+            t2 = time.perf_counter()
+            size = len(blob.encode() if isinstance(blob, str) else blob)
+            base = base or size
+            print(f"{family:<11} {name:<13} {size:>9} {size / base:>6.2f} "
+                  f"{(t1 - t0) / rounds * 1e6:>9.1f} {(t2 - t1) / rounds * 1e6:>9.1f}")
+        print()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--source", choices=sorted(PREFIX), default="animasu")
+    ap.add_argument("--dir", help="Folder berisi sampel *.json (offline)")
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+
+    samples = load_dir(args.dir) if args.dir else load_upstream(args.source)
+    if not samples:
+        sys.exit("Tidak ada sampel payload.")
+    print(f"orjson={'ya' if cache_codec.orjson else 'tidak'}  "
+          f"zstd={'ya' if cache_codec.zstandard else 'tidak'}  zlib level={cache_codec.ZLIB_LEVEL}\n")
+    bench(samples, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Load test: requests/detik dan latency p50/p99 untuk satu URL, atau
+perbandingan WSGI (gunicorn sync) vs ASGI (uvicorn asgi:app) dengan jumlah
+worker yang sama.
+
+    python scripts/loadtest.py --url http://127.0.0.1:8000 --paths /home /api/search/naruto
+    python scripts/loadtest.py --compare --workers 2 --concurrency 64 --upstream-delay 300
+
+--compare menjalankan sendiri (butuh gunicorn & uvicorn terpasang):
+  - upstream palsu di localhost yang menjawab setelah --upstream-delay ms,
+    supaya yang diukur perilaku saat upstream lambat, bukan jaringan;
+  - gunicorn -k sync -w N app:app  lalu  uvicorn asgi:app --workers N,
+    masing-masing dengan CACHE_BACKEND=memory dan ANIME_API_BASE ke upstream palsu.
+Path boleh berisi {n} (nomor request) supaya tiap request jadi cache miss,
+mis. /anime/a{n} atau /api/search/q{n}.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATHS = ["/anime/a{n}", "/api/search/q{n}", "/home"]
+
+
+# ── Generator beban ────────────────────────────────────────────────────────────
+
+async def run_load(base_url, paths, concurrency, duration, timeout=30):
+    latencies, errors, counter = [], 0, iter(range(10 ** 9))
+    deadline = time.perf_counter() + duration
+    limits   = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                n    = next(counter)
+                path = paths[n % len(paths)].format(n=n)
+                t0   = time.perf_counter()
+                try:
+                    r = await client.get(path)
+                    if r.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+
+    return {"requests": len(latencies), "errors": errors, "rps": len(latencies) / elapsed,
+            "p50_ms": pct(0.50), "p99_ms": pct(0.99)}
+
+
+def print_result(name, res):
+    print(f"{name:<14} {res['requests']:>8} {res['errors']:>7} {res['rps']:>9.1f} "
+          f"{res['p50_ms']:>9.1f} {res['p99_ms']:>9.1f}")
+
+
+# ── Mode --compare ─────────────────────────────────────────────────────────────
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_upstream(delay_ms):
+    """Upstream palsu: semua path dijawab JSON format samehadaku setelah delay."""
+    anime = [{"animeId": f"a{i}", "title": f"Anime {i}", "poster": "", "episodes": 12} for i in range(20)]
+    body  = json.dumps({"status": "success", "data": {"animeList": anime, "episodeList": [],
+                                                      "title": "Anime", "genreList": []},
+                        "pagination": {"hasNextPage": False}}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay_ms / 1000)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", _free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _wait_ready(port, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def compare(args):
+    upstream = start_fake_upstream(args.upstream_delay)
+    env = {**os.environ, "CACHE_BACKEND": "memory",
+           "ANIME_API_BASE": f"http://127.0.0.1:{upstream.server_port}"}
+    servers = {
+        "wsgi (sync)": lambda port: ["gunicorn", "-k", "sync", "-w", str(args.workers),
+                                     "-b", f"127.0.0.1:{port}", "--timeout", "60", "app:app"],
+        "asgi":        lambda port: ["uvicorn", "asgi:app", "--workers", str(args.workers),
+                                     "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+    }
+    print(f"workers={args.workers} concurrency={args.concurrency} duration={args.duration}s "
+          f"upstream_delay={args.upstream_delay}ms paths={args.paths}\n")
+    print(f"{'server':<14} {'requests':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, cmd in servers.items():
+        port = _free_port()
+        proc = subprocess.Popen(cmd(port), cwd=ROOT, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not _wait_ready(port):
+                print(f"{name:<14} gagal start ({' '.join(cmd(port))})")
+                continue
+            res = asyncio.run(run_load(f"http://127.0.0.1:{port}", args.paths,
+                                       args.concurrency, args.duration))
+            print_result(name, res)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+    upstream.shutdown()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="Server yang sudah jalan (tanpa --compare)")
+    ap.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--duration", type=float, default=15)
+    ap.add_argument("--compare", action="store_true", help="Bandingkan gunicorn sync vs uvicorn asgi")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--upstream-delay", type=int, default=300, help="Delay upstream palsu (ms)")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(args)
+    elif args.url:
+        print(f"{'server':<14} {'requests':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        print_result(args.url, asyncio.run(run_load(args.url, args.paths, args.concurrency, args.duration)))
+    else:
+        sys.exit("Isi --url atau pakai --compare")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+search_index.py
+===============
+Index pencarian judul anime in-process, dibangun dari katalog animelist.
+
+    idx = SearchIndex()
+    idx.add([{"slug": "one-piece", "title": "One Piece"}, ...])
+    idx.search("one pi")        # → [{"slug": "one-piece", "title": "One Piece"}]
+    idx.search("naurto")        # typo → tetap ketemu "Naruto"
+    idx.match("naurto")         # → (hasil, True, False): True = ada token yang cocok lewat typo
+
+- Judul dipecah jadi token (lowercase, tanpa aksen/tanda baca).
+- Token query dicocokkan ke vocabulary: sama persis, prefix (search-as-you-type),
+  atau — kalau keduanya tidak ada — typo (edit distance <= 1, <= 2 untuk token
+  >= 7 huruf). Kandidat typo disaring lewat jumlah trigram yang sama, jadi
+  tidak membandingkan semua kata.
+- Semua token query harus cocok (AND). Skor: persis > prefix > typo, lalu
+  judul yang diawali query, lalu judul yang lebih pendek.
+- Ekspansi prefix dibatasi MAX_EXPAND kata. Token diproses dari yang terpanjang;
+  token pendek ("one p") dicocokkan langsung ke judul kandidat token
+  sebelumnya, jadi batas itu hanya memotong hasil kalau tidak ada kandidat.
+
+add()/remove() bisa dipanggil berkali-kali → update incremental tanpa bangun
+ulang seluruh index. Tidak thread-safe untuk tulis: ubah hasil copy() lalu
+tukar object-nya, pembaca object lama tetap aman.
+"""
+
+import bisect
+import re
+import unicodedata
+
+_TOKEN_RE   = re.compile(r"[a-z0-9]+")
+MAX_EXPAND  = 200    # batas kata vocabulary per token query (prefix/typo)
+SCORE_EXACT, SCORE_PREFIX, SCORE_TYPO = 3, 2, 1
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return text.lower()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _trigrams(word):
+    w = f"${word}$"
+    return {w[i:i + 3] for i in range(len(w) - 2)}
+
+
+def _max_typos(token):
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 7 else 2
+
+
+def _distance(a, b, limit):
+    """Edit distance (Damerau, huruf tertukar = 1) dengan batas; > limit → limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class SearchIndex:
+    def __init__(self):
+        self.docs      = {}    # slug -> entry dict
+        self._postings = {}    # token -> set(slug)
+        self._vocab    = None  # token terurut (untuk prefix lewat bisect), dibuat saat search
+        self._grams    = {}    # trigram -> set(token)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def copy(self):
+        """Salinan yang bisa diubah tanpa mengganggu pembaca object lama."""
+        other = SearchIndex()
+        other.docs      = dict(self.docs)
+        other._postings = {t: set(s) for t, s in self._postings.items()}
+        other._grams    = {g: set(w) for g, w in self._grams.items()}
+        other._vocab    = self._vocab
+        return other
+
+    # ── Tulis ──────────────────────────────────────────────────────────────
+
+    def add(self, entries):
+        """Tambah / update entry ({"slug", "title", ...}). Return jumlah yang berubah."""
+        changed = 0
+        for e in entries:
+            slug = e.get("slug")
+            if not slug or not e.get("title"):
+                continue
+            old = self.docs.get(slug)
+            if old == e:
+                continue
+            if old is not None:
+                self._unindex(slug, old)
+            self.docs[slug] = e
+            for tok in set(tokenize(e["title"])):
+                posting = self._postings.get(tok)
+                if posting is None:
+                    posting = self._postings[tok] = set()
+                    self._vocab = None
+                    for g in _trigrams(tok):
+                        self._grams.setdefault(g, set()).add(tok)
+                posting.add(slug)
+            changed += 1
+        return changed
+
+    def remove(self, slugs):
+        removed = 0
+        for slug in slugs:
+            e = self.docs.pop(slug, None)
+            if e is not None:
+                self._unindex(slug, e)
+                removed += 1
+        return removed
+
+    def _unindex(self, slug, entry):
+        for tok in set(tokenize(entry["title"])):
+            posting = self._postings.get(tok)
+            if posting is None:
+                continue
+            posting.discard(slug)
+            if not posting:
+                del self._postings[tok]
+                self._vocab = None
+                for g in _trigrams(tok):
+                    words = self._grams.get(g)
+                    if words is not None:
+                        words.discard(tok)
+                        if not words:
+                            del self._grams[g]
+
+    # ── Baca ───────────────────────────────────────────────────────────────
+
+    def _expand(self, token):
+        """(kata vocabulary yang cocok dengan token query → skor terbaik per kata,
+        True kalau ekspansi prefix terpotong MAX_EXPAND)."""
+        vocab = self._vocab
+        if vocab is None:
+            vocab = self._vocab = sorted(self._postings)
+        matches = {}
+        if token in self._postings:
+            matches[token] = SCORE_EXACT
+        i = bisect.bisect_left(vocab, token)
+        while i < len(vocab) and len(matches) < MAX_EXPAND:
+            word = vocab[i]
+            if not word.startswith(token):
+                break
+            matches.setdefault(word, SCORE_PREFIX)
+            i += 1
+        truncated = (len(matches) >= MAX_EXPAND and i < len(vocab)
+                     and vocab[i].startswith(token))
+
+        typos = _max_typos(token)
+        if typos and not matches:
+            grams = _trigrams(token)
+            seen  = {}
+            for g in grams:
+                for word in self._grams.get(g, ()):
+                    seen[word] = seen.get(word, 0) + 1
+            # Tiap edit merusak max 3 trigram (+1 untuk "$" akhir kalau prefix)
+            need = len(grams) - 1 - 3 * typos
+            cands = sorted((w for w, n in seen.items() if n >= need), key=lambda w: -seen[w])
+            for word in cands[:MAX_EXPAND * 2]:
+                # Bandingkan juga dengan prefix kata (query yang sedang diketik)
+                if (_distance(token, word, typos) <= typos or
+                        _distance(token, word[:len(token)], typos) <= typos):
+                    matches[word] = SCORE_TYPO
+                    if len(matches) >= MAX_EXPAND:
+                        break
+        return matches, truncated
+
+    def _expand_within(self, token, slugs):
+        """Skor token query per judul kandidat, tanpa batas MAX_EXPAND."""
+        scores = {}
+        for slug in slugs:
+            for word in tokenize(self.docs[slug]["title"]):
+                if word == token:
+                    scores[slug] = SCORE_EXACT
+                    break
+                if word.startswith(token):
+                    scores[slug] = SCORE_PREFIX
+        return scores
+
+    def search(self, query, limit=20):
+        return self.match(query, limit)[0]
+
+    def match(self, query, limit=20):
+        """(hasil, fuzzy, truncated). fuzzy True kalau ada token query yang hanya
+        cocok lewat typo, truncated True kalau ekspansi prefix terpotong
+        MAX_EXPAND — dua-duanya berarti bisa saja ada judul lain yang cocok."""
+        tokens = tokenize(query)
+        if not tokens:
+            return [], False, False
+        scores, fuzzy, truncated = None, False, False
+        # Token terpanjang dulu: paling selektif, token pendek cukup dicek ke kandidatnya
+        for tok in sorted(dict.fromkeys(tokens), key=len, reverse=True):
+            expanded, cut = self._expand(tok)
+            if cut and scores is not None:
+                tok_scores = self._expand_within(tok, scores)
+            else:
+                tok_scores = {}
+                truncated  = truncated or cut
+                fuzzy      = fuzzy or SCORE_TYPO in expanded.values()
+                for word, score in expanded.items():
+                    for slug in self._postings[word]:
+                        if tok_scores.get(slug, 0) < score:
+                            tok_scores[slug] = score
+            if scores is None:
+                scores = tok_scores
+            else:
+                scores = {s: scores[s] + sc for s, sc in tok_scores.items() if s in scores}
+            if not scores:
+                return [], fuzzy, truncated
+
+        q = normalize(query).strip()
+
+        def rank(slug):
+            title = normalize(self.docs[slug]["title"])
+            return (-scores[slug], not title.startswith(q), len(title), title)
+
+        return [self.docs[s] for s in sorted(scores, key=rank)[:limit]], fuzzy, truncated
@@ -31,28 +31,88 @@ document.addEventListener('keydown', e => {
   if ((e.ctrlKey || e.metaKey) && e.key === 'k') { e.preventDefault(); searchBar?.classList.add('open'); searchInput?.focus(); }
 });
 
-let searchTimer;
+// Debounce + batalkan request lama (AbortController) + cache hasil di memori.
+// Hasil yang `complete` dipakai ulang untuk query yang lebih panjang
+// ("naru" → "naruto") tanpa request baru. Statistik: window.animekuSearchStats
+const SEARCH_DEBOUNCE = 250;
+const SEARCH_CACHE_MAX = 50;
+const searchCache = new Map();   // query (normalized) → {animes, complete}
+const searchStats = window.animekuSearchStats = { inputs: 0, requests: 0, cacheHits: 0, prefixHits: 0, aborted: 0 };
+let searchTimer, searchAbort, searchLastQuery = '';
+
+const normQuery = s => s.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().trim();
+// Sama dengan search_index.tokenize: tiap token query harus jadi prefix salah satu token judul
+const tokenize  = s => normQuery(s).match(/[a-z0-9]+/g) || [];
+const titleMatches = (tokens, title) => {
+  const words = tokenize(title);
+  return tokens.every(t => words.some(w => w.startsWith(t)));
+};
+
+function searchFromCache(q) {
+  if (searchCache.has(q)) { searchStats.cacheHits++; return searchCache.get(q); }
+  for (let n = q.length - 1; n >= 2; n--) {
+    const prev = searchCache.get(q.slice(0, n));
+    if (!prev) continue;
+    if (!prev.complete) return null;
+    const tokens = tokenize(q);
+    if (!tokens.length) return null;
+    const animes = prev.animes.filter(a => titleMatches(tokens, a.title || ''));
+    if (!animes.length) return null;   // mungkin typo → tanya server
+    searchStats.prefixHits++;
+    return { animes, complete: true };
+  }
+  return null;
+}
+
+function searchRemember(q, data) {
+  searchCache.delete(q);
+  searchCache.set(q, data);
+  if (searchCache.size > SEARCH_CACHE_MAX) searchCache.delete(searchCache.keys().next().value);
+}
+
+function renderSearch(list) {
+  if (!list.length) { searchResults.innerHTML = '<div style="padding:12px;color:var(--text3);font-size:13px">Tidak ditemukan</div>'; return; }
+  searchResults.innerHTML = list.slice(0, 6).map(a => `
+    <a href="/anime/${a.slug}" class="search-result-item" onclick="searchBar.classList.remove('open')">
+      <img src="${a.poster||''}" alt="${a.title}" onerror="this.style.display='none'">
+      <div class="search-result-info">
+        <div class="title">${a.title}</div>
+        <div class="meta">${a.type||''} ${a.episode ? '· '+a.episode : ''}</div>
+      </div>
+    </a>`).join('');
+}
+
 searchInput?.addEventListener('input', e => {
-  const q = e.target.value.trim();
+  const raw = e.target.value.trim();
+  const q   = normQuery(raw);
   clearTimeout(searchTimer);
-  if (q.length < 2) { searchResults.innerHTML = ''; return; }
+  searchStats.inputs++;
+  if (q.length < 2) { searchAbort?.abort(); searchLastQuery = ''; searchResults.innerHTML = ''; return; }
+  if (q === searchLastQuery) return;
+
+  const cached = searchFromCache(q);
+  if (cached) { searchAbort?.abort(); searchLastQuery = q; renderSearch(cached.animes); return; }
+
   searchTimer = setTimeout(async () => {
+    if (searchAbort) { searchAbort.abort(); searchStats.aborted++; }
+    const ctrl = searchAbort = new AbortController();
+    searchLastQuery = q;
     searchResults.innerHTML = '<div style="padding:12px;color:var(--text3);font-size:13px">Mencari...</div>';
     try {
-      const res   = await fetch(`/api/search/${encodeURIComponent(q)}`);
+      searchStats.requests++;
+      const res   = await fetch(`/api/search/${encodeURIComponent(raw)}`, { signal: ctrl.signal });
       const data  = await res.json();
       const list  = data?.animes || data?.anime_list || [];
-      if (!list.length) { searchResults.innerHTML = '<div style="padding:12px;color:var(--text3);font-size:13px">Tidak ditemukan</div>'; return; }
-      searchResults.innerHTML = list.slice(0, 6).map(a => `
-        <a href="/anime/${a.slug}" class="search-result-item" onclick="searchBar.classList.remove('open')">
-          <img src="${a.poster||''}" alt="${a.title}" onerror="this.style.display='none'">
-          <div class="search-result-info">
-            <div class="title">${a.title}</div>
-            <div class="meta">${a.type||''} ${a.episode ? '· '+a.episode : ''}</div>
-          </div>
-        </a>`).join('');
-    } catch { searchResults.innerHTML = '<div style="padding:12px;color:var(--text3);font-size:13px">Gagal memuat</div>'; }
-  }, 400);
+      searchRemember(q, { animes: list, complete: !!data?.complete });
+      if (ctrl === searchAbort) renderSearch(list);
+    } catch (err) {
+      if (err.name === 'AbortError') return;
+      searchLastQuery = '';
+      searchResults.innerHTML = '<div style="padding:12px;color:var(--text3);font-size:13px">Gagal memuat</div>';
+    } finally {
+      if (ctrl === searchAbort) searchAbort = null;
+    }
+  }, SEARCH_DEBOUNCE);
 });
 
 // ── Active nav link ─────────────────────────────
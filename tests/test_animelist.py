@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture
+def client(client):
+    client.set_cookie("active_source", "samehadaku")
+    return client
+
+
+def test_letter_summary(client):
+    body = client.get("/api/animelist").get_json()
+    assert [(l["letter"], l["count"]) for l in body["letters"]] == [("A", 3), ("B", 2)]
+    assert body["version"]
+
+
+def test_known_letter(client):
+    r = client.get("/api/animelist?letter=a")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["letter"] == "A" and len(body["animes"]) == 3
+    assert body["version"] == client.get("/api/animelist").get_json()["version"]
+
+
+def test_unknown_letter_is_404(client):
+    assert client.get("/api/animelist?letter=Q").status_code == 404
+    assert client.get("/api/animelist?letter=%3Cx%3E").status_code == 404
+
+
+def test_page_carries_catalogue_version(client):
+    version = client.get("/api/animelist").get_json()["version"]
+    html = client.get("/animelist").get_data(as_text=True)
+    assert f'data-version="{version}"' in html
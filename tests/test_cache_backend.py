@@ -0,0 +1,91 @@
+import pytest
+
+import cache_backend
+from cache_backend import MemoryBackend, make_backend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_backend.time, "time", lambda: now[0])
+    return now
+
+
+def test_get_set_delete():
+    r = MemoryBackend()
+    assert r.get("a") is None
+    assert r.set("a", 1) is True
+    assert r.get("a") == "1"
+    assert r.delete("a", "missing") == 1
+    assert r.get("a") is None
+
+
+def test_expiry(clock):
+    r = MemoryBackend()
+    r.set("a", "x", ex=10)
+    clock[0] += 9
+    assert r.get("a") == "x"
+    clock[0] += 1
+    assert r.get("a") is None
+
+
+def test_set_nx():
+    r = MemoryBackend()
+    assert r.set("lock", "1", nx=True)
+    assert r.set("lock", "2", nx=True) is None
+    assert r.get("lock") == "1"
+
+
+def test_incr_keeps_ttl(clock):
+    r = MemoryBackend()
+    assert r.incr("n") == 1
+    r.set("t", 5, ex=10)
+    assert r.incr("t") == 6
+    clock[0] += 10
+    assert r.get("t") is None
+
+
+def test_batch_operations():
+    r = MemoryBackend()
+    r.set_many({"a": "1", "b": "2"}, ex=60)
+    assert r.mget("a", "x", "b") == ["1", None, "2"]
+    assert r.delete_many(["a", "b", "x"]) == 2
+
+
+def test_delete_pattern(monkeypatch):
+    monkeypatch.setattr(cache_backend, "DEL_BATCH", 2)
+    r = MemoryBackend()
+    for i in range(5):
+        r.set(f"animeku:x:{i}", i)
+    r.set("other", 1)
+    assert r.delete_pattern("animeku:*") == 5
+    assert list(r.scan_iter()) == ["other"]
+
+
+@pytest.fixture
+def env(monkeypatch):
+    for k in ("CACHE_BACKEND", "UPSTASH_REDIS_REST_URL", "UPSTASH_REDIS_REST_TOKEN", "FLASK_DEBUG"):
+        monkeypatch.delenv(k, raising=False)
+    return monkeypatch
+
+
+def test_make_backend_without_config_raises(env):
+    with pytest.raises(ValueError, match="UPSTASH_REDIS_REST_URL"):
+        make_backend()
+
+
+@pytest.mark.parametrize("var, value", [("CACHE_BACKEND", "memory"), ("FLASK_DEBUG", "1")])
+def test_make_backend_memory_when_explicit_or_dev(env, var, value):
+    env.setenv(var, value)
+    assert isinstance(make_backend(), MemoryBackend)
+
+
+def test_make_backend_upstash_from_env(env):
+    env.setenv("UPSTASH_REDIS_REST_URL", "https://example.upstash.io")
+    env.setenv("UPSTASH_REDIS_REST_TOKEN", "t")
+    assert make_backend().name == "upstash"
+
+
+def test_make_backend_unknown(env):
+    with pytest.raises(ValueError):
+        make_backend("mongo")
@@ -0,0 +1,69 @@
+import json
+import zlib
+
+import pytest
+
+import cache
+import cache_codec
+from cache_backend import MemoryBackend
+
+DATA = {"title": "Naruto", "episodes": [{"slug": f"naruto-episode-{i}"} for i in range(200)]}
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_roundtrip(compression):
+    text, size = cache_codec.encode(DATA, compression=compression, min_bytes=10)
+    assert text.startswith("v1:j:" if compression == "none" else "v1:z:")
+    assert cache_codec.decode(text) == (DATA, size)
+
+
+def test_small_payload_not_compressed():
+    text, _ = cache_codec.encode({"a": 1}, compression="zlib", min_bytes=4096)
+    assert text == 'v1:j:{"a":1}'
+
+
+def test_decode_legacy_json_without_header():
+    assert cache_codec.decode(json.dumps(DATA))[0] == DATA
+    assert cache_codec.decode(b'{"a":1}')[0] == {"a": 1}
+
+
+@pytest.mark.parametrize("value", ["v1:x:abc", "v1:z:not-base64!", "v1:j:{broken", "garbage"])
+def test_decode_corrupt_raises(value):
+    with pytest.raises(Exception):
+        cache_codec.decode(value)
+
+
+def test_decode_zstd_without_package(monkeypatch):
+    monkeypatch.setattr(cache_codec, "zstandard", None)
+    import base64
+    value = "v1:s:" + base64.b64encode(zlib.compress(b"{}")).decode()
+    with pytest.raises(ValueError):
+        cache_codec.decode(value)
+
+
+def test_get_tiered_treats_corrupt_entry_as_miss():
+    redis = MemoryBackend()
+    redis.set("k", "v1:q:???")
+    before = cache.stats.snapshot().get("codec.error", 0)
+    assert cache.get_tiered(redis, "k", 60, skip_l1=True) is None
+    assert redis.get("k") is None
+    assert cache.stats.snapshot()["codec.error"] == before + 1
+
+
+def test_prefetch_tiered_skips_corrupt_entry():
+    redis = MemoryBackend()
+    good, _ = cache_codec.encode({"ok": True})
+    redis.set("good", good)
+    redis.set("bad", "v1:j:{")
+    cache.l1.clear()
+    assert cache.prefetch_tiered(redis, ["good", "bad"]) == 1
+    assert cache.l1.get("good") == {"ok": True}
+    assert redis.get("bad") is None
+
+
+def test_cached_fetch_reloads_over_corrupt_entry():
+    redis = MemoryBackend()
+    redis.set("c", "v1:z:AAAA")
+    cache.l1.clear()
+    assert cache.cached_fetch(redis, "c", 60, lambda: {"fresh": 1}) == {"fresh": 1}
+    assert cache_codec.decode(redis.get("c"))[0]["data"] == {"fresh": 1}
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+import circuit_breaker as cb
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(cb.time, "monotonic", c)
+    monkeypatch.setattr(cb, "MIN_CALLS", 4)
+    monkeypatch.setattr(cb, "FAILURE_RATE", 0.5)
+    monkeypatch.setattr(cb, "OPEN_SECONDS", 30)
+    monkeypatch.setattr(cb, "PROBES", 2)
+    return c
+
+
+def trip(br):
+    for ok in (True, True, False, False):
+        assert br.allow()
+        br.record(ok, 0.1)
+
+
+def test_opens_at_failure_rate(clock):
+    br = cb.CircuitBreaker("x")
+    trip(br)
+    assert br.state == cb.OPEN and not br.healthy()
+    assert not br.allow()
+    assert br.snapshot()["rejected"] == 1
+
+
+def test_below_min_calls_stays_closed(clock):
+    br = cb.CircuitBreaker("x")
+    for _ in range(3):
+        br.record(False, 0.1)
+    assert br.state == cb.CLOSED
+
+
+def test_slow_calls_count_as_failures(clock, monkeypatch):
+    monkeypatch.setattr(cb, "SLOW_SECONDS", 1)
+    br = cb.CircuitBreaker("x")
+    for _ in range(4):
+        br.record(True, 2)
+    assert br.state == cb.OPEN
+    assert br.snapshot()["slow"] == 4
+
+
+def test_old_calls_leave_window(clock, monkeypatch):
+    monkeypatch.setattr(cb, "WINDOW", 10)
+    br = cb.CircuitBreaker("x")
+    br.record(False, 0.1)
+    br.record(False, 0.1)
+    clock.now += 11
+    br.record(False, 0.1)
+    br.record(True, 0.1)
+    assert br.state == cb.CLOSED
+
+
+def test_half_open_probes_close(clock):
+    br = cb.CircuitBreaker("x")
+    trip(br)
+    clock.now += 31
+    assert br.healthy()
+    assert br.allow() and br.allow()
+    assert not br.allow()                 # maksimal PROBES sekaligus
+    assert br.state == cb.HALF_OPEN
+    br.record(True, 0.1)
+    br.record(True, 0.1)
+    assert br.state == cb.CLOSED
+
+
+def test_failed_probe_reopens(clock):
+    br = cb.CircuitBreaker("x")
+    trip(br)
+    clock.now += 31
+    assert br.allow()
+    br.record(False, 0.1)
+    assert br.state == cb.OPEN and not br.allow()
+
+
+def test_call_fails_fast_when_open(clock, monkeypatch):
+    monkeypatch.setattr(cb, "_breakers", {})
+    trip(cb.breaker("src"))
+    called = []
+    with pytest.raises(cb.CircuitOpen):
+        cb.call("src", lambda: called.append(1))
+    assert called == []
+
+
+def test_call_records_exceptions_and_ok(clock, monkeypatch):
+    monkeypatch.setattr(cb, "_breakers", {})
+    with pytest.raises(ValueError):
+        cb.call("src", lambda: (_ for _ in ()).throw(ValueError("x")))
+    cb.call("src", lambda: 500, ok=lambda r: r < 500)
+    snap = cb.breaker("src").snapshot()
+    assert (snap["calls"], snap["failures"]) == (2, 2)
+
+
+def test_cancelled_probe_releases_slot(clock, monkeypatch):
+    monkeypatch.setattr(cb, "_breakers", {})
+    trip(cb.breaker("src"))
+    clock.now += 31
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def run():
+        tasks = [asyncio.create_task(cb.acall("src", hang)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    asyncio.run(run())
+
+    br = cb.breaker("src")
+    assert br.state == cb.HALF_OPEN and br.snapshot()["calls"] == 4     # pembatalan tidak dicatat
+    assert cb.call("src", lambda: 1) == 1 and cb.call("src", lambda: 2) == 2
+    assert br.state == cb.CLOSED
@@ -0,0 +1,73 @@
+def eps(slugs, names):
+    return [{"slug": s, "name": n} for s, n in zip(slugs, names)]
+
+
+def round_trip(animeku, items):
+    index = animeku.compact_episodes(items)
+    assert index["count"] == len(items)
+    assert animeku.episode_slice(index, 0, index["count"]) == items
+    return index
+
+
+def test_templated_list(animeku):
+    items = eps([f"one-piece-episode-{n}" for n in range(1100, 1090, -1)],
+                [f"Episode {n}" for n in range(1100, 1090, -1)])
+    index = round_trip(animeku, items)
+    assert index["slug"] == "one-piece-episode-{n}"
+    assert index["name"] == "Episode {n}"
+    assert index["n"][:2] == [1100, 1099]
+
+
+def test_template_escapes_braces(animeku):
+    items = eps([f"x-{n}" for n in (2, 1)], [f"{{Spesial}} {n}" for n in (2, 1)])
+    index = round_trip(animeku, items)
+    assert isinstance(index["name"], str)
+
+
+def test_zero_padded_numbers_fall_back_to_lists(animeku):
+    items = eps([f"bleach-episode-{n:02d}" for n in (10, 9, 8)], ["Episode 10", "Episode 09", "Episode 08"])
+    index = round_trip(animeku, items)
+    assert isinstance(index["slug"], list) and isinstance(index["name"], list)
+    assert "n" not in index
+
+
+def test_mixed_names_keep_slug_template(animeku):
+    items = eps(["ep-3", "ep-2", "ep-1"], ["Final", "Episode 2", "Pilot"])
+    index = round_trip(animeku, items)
+    assert index["slug"] == "ep-{n}" and isinstance(index["name"], list)
+
+
+def test_empty_list(animeku):
+    index = round_trip(animeku, [])
+    assert index == {"count": 0, "slug": [], "name": []}
+    assert animeku.episode_position(index, "x") == -1
+
+
+def test_position_and_slice_bounds(animeku):
+    index = animeku.compact_episodes(eps([f"e-{n}" for n in (3, 2, 1)], ["a", "b", "c"]))
+    assert animeku.episode_position(index, "e-1") == 2
+    assert animeku.episode_slice(index, -5, 99) == animeku.episode_slice(index, 0, 3)
+
+
+# ── /api/anime/<slug>/episodes ────────────────────────────────────────────────
+
+def test_episode_chunk_uses_explicit_source(client, animeku):
+    client.set_cookie("active_source", "samehadaku")
+    r = client.get("/api/anime/a1/episodes?source=animasu&offset=10&limit=5")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["total"] == 12 and body["offset"] == 10
+    assert [e["slug"] for e in body["episodes"]] == ["ep-2", "ep-1"]
+    assert all("/animasu/" in p for _, p in animeku.upstream_calls)
+
+
+def test_episode_page_passes_source_to_sidebar_api(client):
+    html = client.get("/animasu/episode/ep-3?anime=a1").get_data(as_text=True)
+    assert 'const EP_SOURCE     = "animasu";' in html
+    assert 'const EP_ANIME_SLUG = "a1";' in html
+
+
+def test_episode_page_escapes_anime_slug(client):
+    html = client.get("/episode/ep-3?anime=%3C/script%3E").get_data(as_text=True)
+    assert "</script>\";" not in html
+    assert "\\u003c/script\\u003e" in html
@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.fixture
+def down(animeku, monkeypatch):
+    """down(pred): path upstream yang cocok `pred` gagal (HTTP 500)."""
+    monkeypatch.setattr(animeku, "SOURCE_FAILOVER", True)
+    real = animeku.upstream
+
+    def set_down(pred):
+        def upstream(path, params=None):
+            if pred(path):
+                raise RuntimeError("down")
+            return real(path, params)
+        monkeypatch.setattr(animeku, "upstream", upstream)
+    return set_down
+
+
+@pytest.fixture
+def client(client):
+    client.set_cookie("active_source", "samehadaku")
+    return client
+
+
+def test_secondary_miss_does_not_fail_over(client, down):
+    down(lambda p: p == "/anime/samehadaku/popular")
+    r = client.get("/home")
+    assert r.status_code == 200
+    assert "X-Source-Failover" not in r.headers
+    assert client.get_cookie("failover_source") is None
+
+
+def test_primary_miss_fails_over_and_pins_links(client, animeku, down):
+    down(lambda p: p.startswith("/anime/samehadaku/"))
+    r = client.get("/ongoing")
+    assert r.headers["X-Source-Failover"] == "samehadaku->animasu"
+    assert r.headers["Cache-Control"].startswith("private")
+    assert client.get_cookie("failover_source").value == "animasu"
+
+    # Link detail di halaman hasil failover dibuka dengan source yang sama
+    seen = len(animeku.upstream_calls)
+    assert client.get("/anime/a1").status_code == 200
+    assert ("sync", "/anime/animasu/detail/a1") in animeku.upstream_calls[seen:]
+
+
+def test_switching_source_clears_failover_cookie(client, down):
+    down(lambda p: p.startswith("/anime/samehadaku/"))
+    client.get("/ongoing")
+    client.post("/api/source/switch", json={"source": "otakudesu"})
+    assert client.get_cookie("failover_source") is None
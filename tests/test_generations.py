@@ -0,0 +1,59 @@
+import pytest
+
+import cache
+from cache_backend import MemoryBackend
+
+
+class CountingBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.mgets = 0
+        self.down  = False
+
+    def mget(self, *keys):
+        self.mgets += 1
+        if self.down:
+            raise ConnectionError("redis down")
+        return super().mget(*keys)
+
+
+@pytest.fixture
+def redis():
+    cache._gens.clear()
+    return CountingBackend()
+
+
+NS = ["all", "samehadaku", "samehadaku:family:anime"]
+
+
+def test_default_interval_matches_l1_ttl():
+    assert cache.GEN_CHECK_INTERVAL >= cache.L1_MAX_TTL
+
+
+def test_generations_cached_within_interval(redis):
+    assert cache.gen_tag(redis, NS) == "g0.0.0"
+    assert cache.gen_tag(redis, NS) == "g0.0.0"
+    assert redis.mgets == 1
+
+
+def test_generations_rechecked_after_interval(redis, monkeypatch):
+    cache.gen_tag(redis, NS)
+    redis.incr(cache.GEN_KEY_PREFIX + "samehadaku")    # bump dari instance lain
+    assert cache.gen_tag(redis, NS) == "g0.0.0"
+    monkeypatch.setattr(cache, "GEN_CHECK_INTERVAL", 0)
+    assert cache.gen_tag(redis, NS) == "g0.1.0"
+    assert redis.mgets == 2
+
+
+def test_local_bump_is_immediate(redis):
+    cache.gen_tag(redis, NS)
+    cache.bump_generation(redis, "all")
+    assert cache.gen_tag(redis, NS) == "g1.0.0"
+    assert redis.mgets == 1
+
+
+def test_redis_error_keeps_last_known_generation(redis, monkeypatch):
+    cache.bump_generation(redis, "all", "samehadaku")
+    monkeypatch.setattr(cache, "GEN_CHECK_INTERVAL", 0)
+    redis.down = True
+    assert cache.gen_tag(redis, NS) == "g1.1.0"     # namespace tanpa nilai lama → 0
@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.fixture
+def client(client):
+    client.set_cookie("active_source", "samehadaku")
+    return client
+
+
+def page_stats(animeku):
+    snap = animeku.stats.snapshot()
+    return snap.get("page.hit", 0), snap.get("page.miss", 0)
+
+
+def test_tracking_args_share_entry(client, animeku):
+    client.get("/ongoing?page=2")
+    hits, misses = page_stats(animeku)
+    r = client.get("/ongoing?utm_source=x&page=2&fbclid=abc&x=1")
+    assert r.status_code == 200
+    assert page_stats(animeku) == (hits + 1, misses)
+
+
+def test_args_read_by_view_get_own_entry(client, animeku):
+    client.get("/ongoing?page=2")
+    hits, misses = page_stats(animeku)
+    client.get("/ongoing?page=3")
+    client.get("/animelist?letter=A")
+    assert page_stats(animeku) == (hits, misses + 2)
@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.fixture
+def client(client, animeku, monkeypatch):
+    client.set_cookie("active_source", "samehadaku")
+    # prefetch dijalankan langsung (bukan di thread pool) supaya bisa dicek
+    monkeypatch.setattr(animeku, "prefetch", lambda key, load, ttl: load())
+    return client
+
+
+def server_calls(animeku):
+    return [p for _, p in animeku.upstream_calls if "/server/" in p]
+
+
+def test_player_does_not_resolve_server_on_request_path(client, animeku, monkeypatch):
+    monkeypatch.setattr(animeku, "prefetch_episode", lambda source, slug: None)
+    body = client.get("/api/episode/ep-3/player?anime=a1").get_json()
+    assert body["default_url"] == ""
+    assert (body["prev"], body["next"]) == ("ep-2", "ep-4")
+    assert server_calls(animeku) == []
+
+
+def test_prefetched_next_episode_has_default_url(client, animeku):
+    client.get("/api/episode/ep-3/player?anime=a1")
+    assert server_calls(animeku) == ["/anime/samehadaku/server/sid"]     # prefetch ep-4
+
+    body = client.get("/api/episode/ep-4/player?anime=a1").get_json()
+    assert body["default_url"] == "https://v/s"
+    assert len(server_calls(animeku)) == 1     # dibaca dari cache, tidak fetch lagi
+
+
+def test_direct_stream_url(client, animeku):
+    body = client.get("/api/episode/ep-3/player?source=animasu").get_json()
+    assert body["default_url"] == "https://v/1"
+
+
+def test_episode_page_loads_player_endpoint(client):
+    html = client.get("/episode/ep-3?anime=a1").get_data(as_text=True)
+    assert "const PLAYER_API = `/api/episode/${encodeURIComponent(\"ep-3\")}/player?`" in html
+    assert "initPlayer();" in html
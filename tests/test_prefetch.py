@@ -0,0 +1,61 @@
+import pytest
+
+
+@pytest.fixture
+def scheduled(animeku, monkeypatch):
+    """Key yang dijadwalkan prefetch() (tanpa benar-benar jalan di background)."""
+    keys = []
+    monkeypatch.setattr(animeku, "prefetch", lambda key, load, ttl: keys.append(key))
+    return keys
+
+
+def page_key(animeku, page):
+    req = animeku.get_provider("samehadaku").request("ongoing", page=page)
+    return animeku._view_key("samehadaku", *req[:3])
+
+
+@pytest.fixture
+def client(client):
+    client.set_cookie("active_source", "samehadaku")
+    return client
+
+
+def test_list_page_prefetches_next(client, animeku, scheduled):
+    assert client.get("/ongoing?page=1").status_code == 200
+    assert scheduled == [page_key(animeku, 2)]
+
+
+@pytest.mark.parametrize("headers", [{"Sec-Purpose": "prefetch"}, {"Purpose": "prefetch"},
+                                     {"Sec-Purpose": "prefetch;prerender"}])
+def test_browser_prefetch_does_not_chain(client, animeku, scheduled, headers):
+    assert client.get("/ongoing?page=1", headers=headers).status_code == 200
+    assert scheduled == []
+
+
+def test_browser_prefetch_is_not_a_hit(client, animeku, scheduled):
+    key = page_key(animeku, 2)
+    animeku._prefetched.set(key, True, 60, len(key))
+    hits = animeku.stats.snapshot().get("prefetch.hit", 0)
+
+    client.get("/ongoing?page=2", headers={"Sec-Purpose": "prefetch"})
+    assert animeku._prefetched.get(key)
+    assert animeku.stats.snapshot().get("prefetch.hit", 0) == hits
+
+
+def test_user_request_counts_prefetch_hit(client, animeku, scheduled):
+    key = page_key(animeku, 2)
+    animeku._prefetched.set(key, True, 60, len(key))
+    hits = animeku.stats.snapshot().get("prefetch.hit", 0)
+
+    client.get("/ongoing?page=2")
+    assert not animeku._prefetched.get(key)
+    assert animeku.stats.snapshot()["prefetch.hit"] == hits + 1
+
+
+def test_browser_prefetch_of_episode_does_not_chain(client, animeku, monkeypatch):
+    chained = []
+    monkeypatch.setattr(animeku, "prefetch_episode", lambda source, slug: chained.append(slug))
+    client.get("/episode/ep-3?anime=a1", headers={"Sec-Purpose": "prefetch"})
+    assert chained == []
+    client.get("/episode/ep-3?anime=a1")
+    assert chained == ["ep-4"]
@@ -0,0 +1,88 @@
+from providers import Provider
+
+
+def norm_list(raw, page=1):
+    return {"items": raw["data"], "page": page}
+
+
+def norm_detail(raw, slug):
+    return {"slug": slug, **raw}
+
+
+def norm_plain(raw):
+    return raw
+
+
+P = Provider(
+    "demo", "/anime/demo",
+    endpoints={"ongoing": "/ongoing", "detail": "/anime/{slug}", "search": "/search?q={q}",
+               "home": "/home"},
+    normalizers={"ongoing": norm_list, "detail": norm_detail, "home": norm_plain},
+    cache_ttl={"default": 300, "detail": 3600},
+)
+
+
+def test_request_formats_path_and_ttl():
+    path, params, norm, ttl = P.request("detail", slug="naruto")
+    assert (path, params, ttl) == ("/anime/demo/anime/naruto", None, 3600)
+    assert norm({"title": "N"}) == {"slug": "naruto", "title": "N"}
+
+
+def test_request_query_template_becomes_params():
+    path, params, norm, ttl = P.request("search", q="one piece")
+    assert path == "/anime/demo/search"
+    assert params == {"q": "one piece"}
+    assert norm is None and ttl == 300
+
+
+def test_request_page_goes_to_params_and_normalizer():
+    path, params, norm, _ = P.request("ongoing", page=3)
+    assert params == {"page": 3}
+    assert norm({"data": [1]}) == {"items": [1], "page": 3}
+
+
+def test_request_normalizer_without_extra_args_is_not_wrapped():
+    assert P.request("home", page=2)[2] is norm_plain
+
+
+def test_request_normalize_override():
+    custom = lambda raw: "x"   # noqa: E731
+    assert P.request("ongoing", page=1, normalize=custom)[2] is custom
+
+
+def test_has():
+    assert P.has("detail") and not P.has("server")
+
+
+# ── Blueprint /animasu ────────────────────────────────────────────────────────
+
+def test_animasu_animelist_uses_pinned_letter_api(client):
+    client.set_cookie("active_source", "otakudesu")
+    r = client.get("/animasu/animelist")
+    assert r.status_code == 200
+    assert b'data-api="/animasu/api/animelist"' in r.data
+
+
+def test_animasu_letter_api_ignores_cookie_source(client, animeku):
+    client.set_cookie("active_source", "otakudesu")
+    r = client.get("/animasu/api/animelist?letter=B")
+    assert r.status_code == 200
+    assert [a["title"] for a in r.get_json()["animes"]] == ["Bleach", "Boruto"]
+    assert all("/animasu/" in p for _, p in animeku.upstream_calls)
+
+
+def test_pinned_source_does_not_fail_over(client, animeku, monkeypatch):
+    monkeypatch.setattr(animeku, "SOURCE_FAILOVER", True)
+    real = animeku.upstream
+
+    def upstream(path, params=None):
+        if "/animasu/" in path:
+            raise RuntimeError("down")
+        return real(path, params)
+    monkeypatch.setattr(animeku, "upstream", upstream)
+
+    client.set_cookie("active_source", "animasu")
+    assert "X-Source-Failover" in client.get("/ongoing").headers
+    r = client.get("/animasu/ongoing")
+    assert "X-Source-Failover" not in r.headers
+    assert b"Anime 0" not in r.data          # bukan daftar dari source lain
@@ -0,0 +1,143 @@
+import pytest
+
+from search_index import SearchIndex, tokenize
+
+DOCS = [
+    {"slug": "naruto", "title": "Naruto"},
+    {"slug": "naruto-shippuden", "title": "Naruto Shippuden"},
+    {"slug": "one-piece", "title": "One Piece"},
+    {"slug": "pokemon", "title": "Pokémon: The Series"},
+]
+
+
+@pytest.fixture
+def idx():
+    i = SearchIndex()
+    i.add(DOCS)
+    return i
+
+
+def slugs(hits):
+    return [h["slug"] for h in hits]
+
+
+def test_tokenize_strips_accents_and_punctuation():
+    assert tokenize("Pokémon: The Series!") == ["pokemon", "the", "series"]
+
+
+def test_exact_ranks_before_longer_titles(idx):
+    assert slugs(idx.search("naruto")) == ["naruto", "naruto-shippuden"]
+
+
+def test_prefix_while_typing(idx):
+    hits, fuzzy, truncated = idx.match("one pi")
+    assert slugs(hits) == ["one-piece"] and not fuzzy and not truncated
+
+
+def test_typo_is_fuzzy(idx):
+    hits, fuzzy, _ = idx.match("naurto")
+    assert "naruto" in slugs(hits) and fuzzy
+
+
+def test_all_tokens_must_match(idx):
+    assert idx.search("naruto piece") == []
+    assert idx.match("") == ([], False, False)
+
+
+def test_short_tokens_get_no_typo_tolerance(idx):
+    assert idx.search("oen") == []
+
+
+def test_update_and_remove(idx):
+    assert idx.add([{"slug": "naruto", "title": "Naruto"}]) == 0     # tidak berubah
+    assert idx.add([{"slug": "one-piece", "title": "One Piece Film"}]) == 1
+    assert slugs(idx.search("film")) == ["one-piece"]
+    assert idx.remove(["one-piece", "missing"]) == 1
+    assert idx.search("piece") == [] and len(idx) == 3
+
+
+def test_copy_does_not_touch_original(idx):
+    other = idx.copy()
+    other.remove(["naruto"])
+    other.add([{"slug": "bleach", "title": "Bleach"}])
+    assert slugs(idx.search("naruto"))[0] == "naruto"
+    assert idx.search("bleach") == []
+
+
+def test_limit(idx):
+    assert len(idx.search("naruto", limit=1)) == 1
+
+
+@pytest.fixture
+def big(idx, monkeypatch):
+    """Vocabulary dengan lebih dari MAX_EXPAND kata berawalan "p"."""
+    monkeypatch.setattr("search_index.MAX_EXPAND", 5)
+    idx.add([{"slug": f"x{i}", "title": f"Paa{chr(97 + i)}"} for i in range(8)])
+    idx.add([{"slug": "one-paaa", "title": "One Paaa"}, {"slug": "opm", "title": "One Punch Man"}])
+    return idx
+
+
+def test_short_token_checked_against_candidates(big):
+    hits, _, truncated = big.match("one p")
+    assert sorted(slugs(hits)) == ["one-paaa", "one-piece", "opm"] and not truncated
+
+
+def test_truncated_prefix_is_reported(big):
+    hits, _, truncated = big.match("p")
+    assert truncated and "opm" not in slugs(hits)
+
+
+# ── Index di app: poster & complete ───────────────────────────────────────────
+
+@pytest.fixture
+def app_index(animeku, client, monkeypatch):
+    monkeypatch.setattr(animeku, "_search_indexes", {})
+    client.set_cookie("active_source", "samehadaku")
+    real = animeku.upstream
+
+    def upstream(path, params=None):
+        body = real(path, params)
+        if path.endswith("/list"):       # katalog samehadaku tanpa poster
+            for grp in body["data"]["list"]:
+                grp["animeList"] = [{k: v for k, v in a.items() if k != "poster"} for a in grp["animeList"]]
+        return body
+    monkeypatch.setattr(animeku, "upstream", upstream)
+    return animeku
+
+
+def test_rebuild_fills_posters_from_cached_lists(app_index, client):
+    client.get("/ongoing")                                   # view list (dengan poster) masuk cache
+    assert app_index.rebuild_search_index("samehadaku")["ok"]
+    docs = app_index.search_index_for("samehadaku").docs
+    assert docs["a1"]["poster"] == "p1.jpg"
+
+
+def test_rebuild_keeps_previous_posters(app_index, client):
+    client.get("/ongoing")
+    app_index.rebuild_search_index("samehadaku")
+    app_index.l1.clear()
+    app_index.redis.delete_pattern("animeku:samehadaku:view:*")   # list view sudah hilang dari cache
+    assert app_index.rebuild_search_index("samehadaku")["changed"] is False
+
+
+def test_complete_only_for_exact_or_prefix(app_index, client):
+    app_index.rebuild_search_index("samehadaku")
+    body = client.get("/api/search/anim").get_json()
+    assert len(body["animes"]) == 5 and body["complete"] is True
+    body = client.get("/api/search/anmie").get_json()
+    assert len(body["animes"]) == 5 and body["complete"] is False
+
+
+# ── Filter prefix cache ───────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("query, expected", [
+    ("piece o", ["one-piece"]),                     # urutan kata bebas
+    ("naruto shipp", ["naruto-shippuden"]),
+    ("re zer", ["re-zero"]),                        # tanda baca diabaikan
+    ("ece", []),                                    # bukan prefix token → tidak cocok
+])
+def test_prefix_cache_filter_uses_token_prefixes(animeku, query, expected):
+    cached = DOCS + [{"slug": "re-zero", "title": "Re:Zero kara Hajimeru"}]
+    animeku._search_prefix.clear()
+    animeku._search_prefix.set(f"samehadaku:{query[:2]}", cached, 60, 1)
+    assert slugs(animeku._search_prefix_hits("samehadaku", query)) == expected
@@ -0,0 +1,74 @@
+import pytest
+
+import cache
+from cache_backend import MemoryBackend
+
+
+class InlinePool:
+    """Pengganti _refresh_pool: refresh background langsung dijalankan."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def inline_refresh(monkeypatch):
+    monkeypatch.setattr(cache, "_refresh_pool", InlinePool())
+
+
+def expire(redis, key):
+    """Jadikan entry basi (lewat soft expiry, belum lewat hard expiry)."""
+    data = cache._unwrap(cache.l1.get(key))["data"]
+    cache.set_tiered(redis, key, cache._wrap(data, -1), 60)
+
+
+def titles(view):
+    return [a["title"] for a in view["animes"]]
+
+
+def test_view_refresh_reads_fresh_raw(animeku, inline_refresh):
+    upstream = animeku.upstream
+    path, params, normalize, ttl = animeku.get_provider("samehadaku").request("ongoing", page=1)
+    view_key = animeku._view_key("samehadaku", path, params, normalize)
+    raw_key  = animeku._raw_key("samehadaku", path, params)
+    assert titles(animeku.fetch_view(path, params, normalize, ttl, source="samehadaku"))[0] == "Anime 0"
+
+    def renamed(p, q=None):
+        body = upstream(p, q)
+        body["data"]["animeList"][0]["title"] = "Baru"
+        return body
+    animeku.upstream = renamed
+    expire(animeku.redis, view_key)
+    expire(animeku.redis, raw_key)
+
+    # request ini dapat view basi, refresh-nya harus fetch raw ulang
+    assert titles(animeku.fetch_view(path, params, normalize, ttl, source="samehadaku"))[0] == "Anime 0"
+    assert titles(animeku.fetch_view(path, params, normalize, ttl, source="samehadaku"))[0] == "Baru"
+    assert cache.l1_fresh(raw_key)
+
+
+def test_fresh_fetch_never_returns_stale(inline_refresh):
+    redis = MemoryBackend()
+    cache.l1.clear()
+    cache.cached_fetch(redis, "k", 60, lambda: {"v": 1})
+    expire(redis, "k")
+
+    def down():
+        raise ConnectionError("upstream down")
+    assert cache.cached_fetch(redis, "k", 60, down, fresh=True) is None
+    assert cache.cached_fetch(redis, "k", 60, down) == {"v": 1}
+
+
+def test_view_keeps_stale_copy_when_raw_reload_fails(animeku, inline_refresh):
+    path, params, normalize, ttl = animeku.get_provider("samehadaku").request("ongoing", page=1)
+    view_key = animeku._view_key("samehadaku", path, params, normalize)
+    animeku.fetch_view(path, params, normalize, ttl, source="samehadaku")
+    expire(animeku.redis, view_key)
+    expire(animeku.redis, animeku._raw_key("samehadaku", path, params))
+
+    def down(p, q=None):
+        raise ConnectionError("upstream down")
+    animeku.upstream = down
+    view = animeku.fetch_view(path, params, normalize, ttl, source="samehadaku")
+    assert titles(view)[0] == "Anime 0"
+    assert not cache.l1_fresh(view_key)     # view basi tidak disimpan ulang sebagai fresh
@@ -0,0 +1,91 @@
+import pytest
+
+import cache
+
+
+@pytest.fixture
+def waits(animeku, monkeypatch):
+    """Jumlah limiter.wait() per warm_cache()."""
+    count = []
+
+    class Limiter:
+        def __init__(self, rate):
+            pass
+
+        def wait(self):
+            count.append(1)
+    monkeypatch.setattr(animeku, "_RateLimiter", Limiter)
+    return count
+
+
+def expire_all(animeku):
+    """Semua entry cache lewat soft expiry tapi belum hard → SWR mau refresh di background."""
+    for key, (_, _, entry) in list(cache.l1._data.items()):
+        entry = cache._unwrap(entry)
+        if entry["soft"] != float("inf"):
+            cache.set_tiered(animeku.redis, key, cache._wrap(entry["data"], -1), 60)
+
+
+def http_calls(animeku):
+    return [c for c in animeku.upstream_calls if c[0] == "sync"]
+
+
+def test_first_run_limits_every_upstream_load(animeku, waits):
+    report = animeku.warm_cache(["samehadaku"], pages=1)
+    src    = report["sources"]["samehadaku"]
+    assert src["failed"] == 0
+    assert len(waits) == len(http_calls(animeku)) == src["loaded"]
+    assert report["keys"] == src["keys"] == 2 * src["loaded"]
+
+
+def test_cached_entries_skip_limiter_and_count_no_keys(animeku, waits):
+    animeku.warm_cache(["samehadaku"], pages=1)
+    waits.clear()
+    animeku.upstream_calls.clear()
+    animeku.l1.clear()          # instance lain: hanya Redis yang terisi
+
+    report = animeku.warm_cache(["samehadaku"], pages=1)
+    src    = report["sources"]["samehadaku"]
+    assert src["warmed"] > 0
+    assert waits == [] and http_calls(animeku) == []
+    assert (report["keys"], src["loaded"]) == (0, 0)
+
+
+def test_view_rebuilt_from_cached_raw_is_not_limited(animeku, waits, monkeypatch):
+    animeku.warm_cache(["samehadaku"], pages=1, details=False)
+    waits.clear()
+    # Normalizer berubah → view key baru, raw JSON masih ada di cache
+    monkeypatch.setattr(animeku, "NORMALIZER_VERSION", animeku.NORMALIZER_VERSION + 1)
+    animeku.l1.clear()
+
+    src = animeku.warm_cache(["samehadaku"], pages=1, details=False)["sources"]["samehadaku"]
+    assert waits == []
+    assert src["keys"] == src["loaded"] == src["warmed"]
+
+
+def test_stale_entries_reload_behind_limiter(animeku, waits, monkeypatch):
+    animeku.warm_cache(["samehadaku"], pages=1, details=False)
+    waits.clear()
+    animeku.upstream_calls.clear()
+    expire_all(animeku)
+    background = []
+    monkeypatch.setattr(cache, "_schedule_refresh", lambda *a: background.append(a[1]))
+
+    report = animeku.warm_cache(["samehadaku"], pages=1, details=False)
+    src    = report["sources"]["samehadaku"]
+    assert background == []
+    assert len(waits) == len(http_calls(animeku)) == src["loaded"] > 0
+    assert src["keys"] == 2 * src["loaded"]
+
+
+def test_failed_reload_counts_no_keys(animeku, waits, monkeypatch):
+    animeku.warm_cache(["samehadaku"], pages=1, details=False)
+    expire_all(animeku)
+
+    def down(path, params=None):
+        raise ConnectionError("upstream down")
+    animeku.upstream = down
+
+    src = animeku.warm_cache(["samehadaku"], pages=1, details=False)["sources"]["samehadaku"]
+    assert src["warmed"] == 0 and src["failed"] > 0
+    assert (src["keys"], src["loaded"]) == (0, 0)